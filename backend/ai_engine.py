@@ -2,14 +2,13 @@ import os
 import requests
 import json
 from dotenv import load_dotenv
-from recommendation_engine import RecommendationEngine
+from engine_registry import loaded_engine
 
 # Load environment variables
 load_dotenv()
 OPENROUTER_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 
-# Initialize the engine once
-rec_engine = RecommendationEngine()
+# The recommendation engine is shared with routes.py, see engine_registry
 
 def get_ai_response(message: str, context: str = "") -> str:
     """
@@ -37,8 +36,9 @@ def get_ai_response(message: str, context: str = "") -> str:
     elif any(k in msg_lower for k in ["business", "startup", "entrepreneur", "shop"]):
         user_profile["occupation"] = "business"
 
-    # Get local data
-    local_results = rec_engine.get_recommendations(user_profile)
+    # Get local data (none while the engine is still loading at startup)
+    engine = loaded_engine()
+    local_results = engine.get_recommendations(user_profile) if engine is not None else {}
     schemes = local_results.get("schemes", [])[:3] # Top 3
     
     # Format context for AI
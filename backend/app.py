@@ -1,23 +1,33 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.staticfiles import StaticFiles
 from routes import router
 
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import pandas as pd
 import os
+import random
 import requests
 
 # Import our new modules
 from ai_engine import get_ai_response
 from whatsapp_twilio import handle_twilio_message
+from keyword_matcher import get_matcher
+from catalog_store import read_catalog_csv
+from engine_registry import start_engine
 
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Build the recommendation engine off the request path; routes answer 503 until it's ready
+    start_engine()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # Mount uploads directory to serve images
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -44,7 +54,7 @@ CSV_PATH = os.path.join(os.path.dirname(__file__), '../scheme/schemes.csv')
 
 def load_schemes():
     try:
-        return pd.read_csv(CSV_PATH)
+        return read_catalog_csv(CSV_PATH, normalize_columns=False)
     except Exception as e:
         print(f"Error loading CSV: {e}")
         return None
@@ -69,7 +79,7 @@ def get_relevant_schemes(df, user_data):
     AI-based scheme recommendation logic.
     Filters and ranks schemes based on user profile.
     """
-    schemes_list = df.to_dict(orient='records')
+    schemes_list = df.records()
     scored_schemes = []
     
     # Parse user data
@@ -92,41 +102,51 @@ def get_relevant_schemes(df, user_data):
     business_keywords = ['business', 'startup', 'entrepreneur', 'loan', 'mudra', 'vendor']
     low_income_keywords = ['poor', 'bpl', 'rural', 'housing', 'awas', 'ration']
     
+    # One automaton for every keyword group; each scheme text is scanned once
+    matcher = get_matcher(
+        farmer_keywords + student_keywords + senior_keywords + women_keywords +
+        health_keywords + skill_keywords + business_keywords + low_income_keywords
+    )
+    
     for scheme in schemes_list:
         score = 0
         name = scheme.get('scheme_name', '').lower()
         desc = scheme.get('description', '').lower()
         scheme_text = name + " " + desc
+        found = matcher.find(scheme_text)
+        
+        def matches(keywords):
+            return not found.isdisjoint(keywords)
         
         # Age-based scoring
         if age > 0:
-            if age < 25 and any(kw in scheme_text for kw in student_keywords):
+            if age < 25 and matches(student_keywords):
                 score += 3
-            if age >= 60 and any(kw in scheme_text for kw in senior_keywords):
+            if age >= 60 and matches(senior_keywords):
                 score += 3
-            if age >= 18 and age <= 35 and any(kw in scheme_text for kw in skill_keywords):
+            if age >= 18 and age <= 35 and matches(skill_keywords):
                 score += 2
         
         # Occupation-based scoring
         if 'farmer' in occupation or 'agriculture' in occupation:
-            if any(kw in scheme_text for kw in farmer_keywords):
+            if matches(farmer_keywords):
                 score += 3
         if 'student' in occupation:
-            if any(kw in scheme_text for kw in student_keywords):
+            if matches(student_keywords):
                 score += 3
         if 'business' in occupation or 'entrepreneur' in occupation:
-            if any(kw in scheme_text for kw in business_keywords):
+            if matches(business_keywords):
                 score += 3
         
         # Income-based scoring
         if 'low' in income or 'poor' in income or any(x in income for x in ['0', '1', '2', '3', '4', '5']):
-            if any(kw in scheme_text for kw in low_income_keywords):
+            if matches(low_income_keywords):
                 score += 2
         
         # General relevance - always include some health and skill schemes
-        if any(kw in scheme_text for kw in health_keywords):
+        if matches(health_keywords):
             score += 1
-        if any(kw in scheme_text for kw in skill_keywords):
+        if matches(skill_keywords):
             score += 1
             
         scored_schemes.append((score, scheme))
@@ -137,7 +157,7 @@ def get_relevant_schemes(df, user_data):
     
     # If no high-scoring schemes, return random mix
     if all(s[0] == 0 for s in scored_schemes[:6]):
-        return df.sample(n=min(6, len(df))).to_dict(orient='records')
+        return random.sample(schemes_list, min(6, len(schemes_list)))
     
     return top_schemes
 
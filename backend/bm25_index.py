@@ -0,0 +1,150 @@
+import re
+from collections import Counter
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of (lowercased) texts, stored as a sparse
+    term x row matrix in CSR form: for each token, the rows it occurs in and
+    its precomputed BM25 weight there.
+
+    Rare tokens count for more than common ones, and a hit in a short text
+    for more than one in a long text. Scoring a weighted keyword list is one
+    sparse dot product: the postings of the query tokens, scaled by their
+    query weight and summed per row with bincount.
+
+    Same score / score_many interface as KeywordIndex, so the engine can
+    rank with either.
+    """
+
+    def __init__(self, texts, k1=BM25_K1, b=BM25_B):
+        texts = list(texts)
+        self.size = len(texts)
+        vocabulary = {}
+        token_ids, rows, tfs = [], [], []
+        lengths = np.zeros(self.size)
+        for row, text in enumerate(texts):
+            counts = Counter(TOKEN_RE.findall(text))
+            lengths[row] = sum(counts.values())
+            for token, tf in counts.items():
+                token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                rows.append(row)
+                tfs.append(tf)
+
+        token_ids = np.array(token_ids, dtype=np.int64)
+        order = np.argsort(token_ids, kind="stable")
+        token_ids = token_ids[order]
+        rows = np.array(rows, dtype=np.int32)[order]
+        tfs = np.array(tfs, dtype=np.float64)[order]
+
+        df = np.bincount(token_ids, minlength=len(vocabulary))
+        idf = np.log1p((self.size - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * lengths[rows] / avg_length)
+
+        ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=ptr[1:])
+        self._setup(
+            list(vocabulary), ptr, rows, idf[token_ids] * tfs * (k1 + 1) / (tfs + norm), self.size, avg_length, k1, b
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays, name, tokens, size, k1=BM25_K1, b=BM25_B):
+        """Rebuild from the arrays written by to_arrays (e.g. mapped from a snapshot)."""
+        index = cls.__new__(cls)
+        index._setup(
+            list(tokens), arrays[f"{name}.ptr"], arrays[f"{name}.rows"], arrays[f"{name}.weights"], size,
+            float(arrays[f"{name}.avg_length"][0]), k1, b
+        )
+        return index
+
+    def to_arrays(self, arrays, name):
+        """Add this index's arrays to `arrays`; returns its tokens to store alongside."""
+        arrays[f"{name}.ptr"] = self.ptr
+        arrays[f"{name}.rows"] = self.rows
+        arrays[f"{name}.weights"] = self.weights
+        arrays[f"{name}.avg_length"] = np.array([self.avg_length])
+        return self.tokens
+
+    def _setup(self, tokens, ptr, rows, weights, size, avg_length, k1, b):
+        self.size = size
+        self.avg_length = avg_length
+        self.k1 = k1
+        self.b = b
+        self.tokens = tokens
+        self.vocabulary = {token: i for i, token in enumerate(tokens)}
+        self.ptr = ptr
+        self.rows = rows
+        self.weights = weights
+
+    def _query(self, weights):
+        query = Counter()
+        for term, weight in weights.items():
+            if weight:
+                # A multi-word keyword scores as the sum of its words
+                for token in TOKEN_RE.findall(term):
+                    query[token] += weight
+        return query
+
+    def score(self, weights: dict):
+        """weights: {term: weight}. Returns float64 scores, one per row."""
+        query = self._query(weights)
+        rows, values = [], []
+        for token, weight in query.items():
+            i = self.vocabulary.get(token)
+            if i is not None:
+                start, stop = self.ptr[i], self.ptr[i + 1]
+                rows.append(self.rows[start:stop])
+                values.append(self.weights[start:stop] * weight)
+        if not rows:
+            return np.zeros(self.size)
+        return np.bincount(np.concatenate(rows), np.concatenate(values), minlength=self.size)
+
+    def text_weights(self, text):
+        """{token: tf weight} of a text outside the index, normalized with the index's average length."""
+        counts = Counter(TOKEN_RE.findall(text))
+        norm = self.k1 * (1 - self.b + self.b * sum(counts.values()) / self.avg_length)
+        return {token: tf * (self.k1 + 1) / (tf + norm) for token, tf in counts.items()}
+
+    def score_postings(self, postings, count, weights: dict):
+        """
+        score() for `count` texts outside the index (e.g. rows added since
+        it was built), from their postings {token: (rows, tf weights)} built
+        with text_weights, using the index's document frequencies.
+        """
+        scores = np.zeros(count)
+        for token, weight in self._query(weights).items():
+            found = postings.get(token)
+            if found is not None:
+                i = self.vocabulary.get(token)
+                df = self.ptr[i + 1] - self.ptr[i] if i is not None else 0
+                idf = np.log1p((self.size - df + 0.5) / (df + 0.5))
+                scores[found[0]] += idf * found[1] * weight
+        return scores
+
+    def score_many(self, weights_list):
+        """
+        Scores for several weight dicts, shape (profiles, rows). Kept float64
+        (unlike KeywordIndex's whole-number float32) so batch scores match
+        score() exactly.
+        """
+        scores = np.zeros((len(weights_list), self.size))
+        for i, weights in enumerate(weights_list):
+            scores[i] = self.score(weights)
+        return scores
+
+def text_postings(text_weights):
+    """{token: (rows, tf weights)} for a sequence of text_weights dicts, one per row."""
+    postings = {}
+    for row, weights in enumerate(text_weights):
+        for token, weight in weights.items():
+            rows, values = postings.setdefault(token, ([], []))
+            rows.append(row)
+            values.append(weight)
+    return {token: (np.array(rows, dtype=np.int64), np.array(values)) for token, (rows, values) in postings.items()}
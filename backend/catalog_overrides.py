@@ -0,0 +1,53 @@
+from datetime import datetime
+
+class MongoOverrideStore:
+    """
+    Admin catalog changes, one document per changed row:
+    {key, status: "active" | "retired", record, updated_at, updated_by}.
+
+    The catalog CSVs stay the source of truth for every other row; the
+    engine folds these changes into the rows it loads, so they survive
+    restarts and reach every worker.
+    """
+
+    def __init__(self, collections: dict):
+        """collections: {catalog name: pymongo collection}"""
+        self.collections = collections
+
+    def load(self) -> dict:
+        """{catalog: {key: record, or None if retired}}, oldest change first."""
+        overrides = {}
+        for name, collection in self.collections.items():
+            entries = {}
+            for doc in collection.find({"key": {"$exists": True}}, {"_id": 0}).sort("updated_at", 1):
+                entries[doc["key"]] = doc.get("record") if doc.get("status") == "active" else None
+            overrides[name] = entries
+        return overrides
+
+    def save(self, catalog, key, record, user=None):
+        """Upsert the change for one row; record None retires it."""
+        self.collections[catalog].update_one(
+            {"key": key},
+            {"$set": {
+                "key": key,
+                "status": "active" if record is not None else "retired",
+                "record": record,
+                "updated_at": datetime.utcnow(),
+                "updated_by": user
+            }},
+            upsert=True
+        )
+
+    def stamp(self):
+        """Cheap change marker: (document count, latest update) per catalog."""
+        stamp = []
+        for name, collection in self.collections.items():
+            latest = collection.find_one({"key": {"$exists": True}}, {"updated_at": 1}, sort=[("updated_at", -1)])
+            stamp.append((name, collection.count_documents({"key": {"$exists": True}}),
+                          latest["updated_at"] if latest else None))
+        return tuple(stamp)
+
+def mongo_override_store():
+    """Store backed by the schemes and jobs collections of the app database."""
+    from database import schemes_collection, jobs_collection
+    return MongoOverrideStore({"schemes": schemes_collection, "jobs": jobs_collection})
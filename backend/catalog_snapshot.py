@@ -0,0 +1,191 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import numpy as np
+from catalog_store import CatalogFrame
+
+# Binary catalog snapshot: MAGIC, uint64 header length, JSON header, then
+# raw arrays at 64-byte aligned offsets. Loading maps the file and wraps each
+# array with np.frombuffer, so nothing is parsed or copied up front and all
+# workers on a node share the same pages.
+MAGIC = b"CATSNAP\0"
+FORMAT_VERSION = 2
+ALIGN = 64
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_snapshot(path, arrays: dict, meta: dict):
+    """Write arrays + JSON meta to path atomically (temp file, then rename)."""
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+
+    header = json.dumps({"format_version": FORMAT_VERSION, "meta": meta, "arrays": layout}).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, arr in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+def read_snapshot(path):
+    """(meta, arrays) with every array a read-only view on the mapped file."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a catalog snapshot")
+    (header_len,) = struct.unpack_from("<Q", mm, len(MAGIC))
+    header_start = len(MAGIC) + 8
+    header = json.loads(mm[header_start:header_start + header_len])
+    if header["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"{path} has snapshot format {header['format_version']}, expected {FORMAT_VERSION}")
+    data_start = -(-(header_start + header_len) // ALIGN) * ALIGN
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            mm, dtype=dtype, count=count, offset=data_start + spec["offset"]
+        ).reshape(spec["shape"])
+    return header["meta"], arrays
+
+# --- Strings ---
+
+def pack_strings(values, as_bytes=False):
+    """(uint8 blob, int64 offsets) for a list of str (or bytes); None packs as empty."""
+    encoded = [v if as_bytes else ("" if v is None else v).encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+class StringColumn:
+    """
+    Read-only list of str backed by a UTF-8 blob and offsets, decoding each
+    value only when it is read. missing marks cells that are None.
+    """
+
+    __slots__ = ("blob", "offsets", "missing")
+
+    def __init__(self, blob, offsets, missing=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.missing = missing
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if self.missing is not None and self.missing[i]:
+            return None
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        buf = memoryview(self.blob)
+        offsets = self.offsets.tolist()
+        missing = self.missing
+        for i in range(len(offsets) - 1):
+            if missing is not None and missing[i]:
+                yield None
+            else:
+                yield str(buf[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def rows_containing(self, term):
+        """
+        int64 rows whose value contains term, found by searching the blob
+        itself: no value is decoded. A UTF-8 substring match is a str
+        substring match; a match running into the next value is skipped.
+        """
+        if not term:
+            return np.arange(len(self), dtype=np.int64)
+        pattern = re.compile(re.escape(term.encode("utf-8")))
+        buf = memoryview(self.blob)
+        offsets = self.offsets
+        rows = []
+        pos = 0
+        while True:
+            match = pattern.search(buf, pos)
+            if match is None:
+                break
+            row = int(np.searchsorted(offsets, match.start(), "right")) - 1
+            end = int(offsets[row + 1])
+            if match.end() <= end:
+                rows.append(row)
+            # One hit per row is enough: carry on from the next value
+            pos = end
+        return np.array(rows, dtype=np.int64)
+
+class BytesColumn(StringColumn):
+    """Like StringColumn but returns the raw bytes (e.g. JSON fragments)."""
+
+    __slots__ = ()
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def __iter__(self):
+        buf = memoryview(self.blob)
+        offsets = self.offsets.tolist()
+        return (bytes(buf[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1))
+
+def put_strings(arrays, name, values, as_bytes=False):
+    arrays[f"{name}.blob"], arrays[f"{name}.offsets"] = pack_strings(values, as_bytes)
+
+def get_strings(arrays, name, as_bytes=False):
+    cls = BytesColumn if as_bytes else StringColumn
+    return cls(arrays[f"{name}.blob"], arrays[f"{name}.offsets"])
+
+# --- Frames ---
+
+def put_frame(arrays, name, frame: CatalogFrame):
+    """Store a CatalogFrame's columns; returns the JSON meta needed to rebuild it."""
+    columns = []
+    for j, col_name in enumerate(frame.columns):
+        key = f"{name}.col{j}"
+        col = frame.data[col_name]
+        if isinstance(col, np.ndarray):
+            arrays[key] = col
+            kind = "array"
+        else:
+            values = list(col)
+            missing = np.array([v is None for v in values], dtype=np.uint8)
+            if all(v is None or isinstance(v, bool) for v in values):
+                # -1 missing, 0 False, 1 True
+                arrays[key] = np.array([-1 if v is None else int(v) for v in values], dtype=np.int8)
+                kind = "bool"
+            else:
+                put_strings(arrays, key, values)
+                arrays[f"{key}.missing"] = missing
+                kind = "str"
+        columns.append({"name": col_name, "kind": kind})
+    return {"columns": columns, "size": len(frame)}
+
+def get_frame(arrays, name, meta) -> CatalogFrame:
+    data = {}
+    for j, spec in enumerate(meta["columns"]):
+        key = f"{name}.col{j}"
+        if spec["kind"] == "array":
+            data[spec["name"]] = arrays[key]
+        elif spec["kind"] == "bool":
+            data[spec["name"]] = [None if v < 0 else bool(v) for v in arrays[key].tolist()]
+        else:
+            data[spec["name"]] = StringColumn(arrays[f"{key}.blob"], arrays[f"{key}.offsets"], arrays[f"{key}.missing"])
+    return CatalogFrame([spec["name"] for spec in meta["columns"]], data, meta["size"])
@@ -0,0 +1,186 @@
+import csv
+import math
+import re
+import sys
+import numpy as np
+
+# Cell values pandas.read_csv treats as missing by default
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null"
+])
+BOOL_VALUES = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
+INT_RE = re.compile(r"[+-]?\d+\Z")
+FLOAT_RE = re.compile(r"[+-]?(\d+\.?\d*([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?|inf|infinity)\Z", re.IGNORECASE)
+
+# Strings up to this length are interned, which dedupes repeated values such
+# as types, domains and skill lists across rows
+INTERN_MAX_LEN = 64
+
+class CatalogFrame:
+    """
+    Column-oriented, read-only table used on the serving path in place of a
+    pandas DataFrame.
+
+    Whole-number columns are int64 arrays, other numeric columns float64
+    arrays with NaN for missing cells (the dtypes read_csv would pick), and
+    text columns are lists of interned strings with None for missing cells.
+    """
+
+    __slots__ = ("columns", "data", "size")
+
+    def __init__(self, columns, data, size):
+        self.columns = list(columns)
+        self.data = data
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def add_column(self, name, values):
+        self.columns.append(name)
+        self.data[name] = values
+
+    def raw(self, name, i):
+        """Cell value as a Python object, None for missing."""
+        v = self.data[name][i]
+        if isinstance(v, np.generic):
+            v = v.item()
+        if isinstance(v, float) and math.isnan(v):
+            return None
+        return v
+
+    def value(self, name, i):
+        """JSON-ready cell value, "" for missing."""
+        v = self.raw(name, i)
+        return "" if v is None else v
+
+    def values(self, name):
+        """Whole column as a list of Python objects, None for missing."""
+        col = self.data[name]
+        if isinstance(col, np.ndarray):
+            values = col.tolist()
+            if col.dtype.kind == "f":
+                values = [None if v != v else v for v in values]
+            return values
+        return col
+
+    def record(self, i, exclude=()):
+        return {name: self.value(name, i) for name in self.columns if name not in exclude}
+
+    def records(self, exclude=()):
+        names = [name for name in self.columns if name not in exclude]
+        columns = [self.values(name) for name in names]
+        return [
+            {name: ("" if v is None else v) for name, v in zip(names, row)}
+            for row in zip(*columns)
+        ] if names else [{} for _ in range(self.size)]
+
+    def text(self, name, missing=""):
+        """Column as a list of str, with `missing` for missing cells."""
+        return [missing if v is None else str(v) for v in self.values(name)]
+
+    def kind(self, name):
+        """"int", "float", "bool" or "str": what a cell of the column holds."""
+        col = self.data[name]
+        if isinstance(col, np.ndarray):
+            return "int" if col.dtype.kind in "iu" else "float"
+        first = next((v for v in col if v is not None), None)
+        return "bool" if isinstance(first, bool) else "str"
+
+    def with_rows(self, drop=(), records=()):
+        """
+        New frame without the rows in drop, followed by records (column ->
+        value dicts, typed with coerce_cell). Like read_catalog_csv, an int
+        column that gets a missing cell becomes float.
+        """
+        keep = np.ones(self.size, dtype=bool)
+        keep[list(drop)] = False
+        kept = np.flatnonzero(keep)
+        data = {}
+        for name in self.columns:
+            col = self.data[name]
+            added = [r.get(name) for r in records]
+            if isinstance(col, np.ndarray):
+                if col.dtype.kind in "iu" and None in added:
+                    col = col.astype(np.float64)
+                added = np.array([np.nan if v is None else v for v in added], dtype=col.dtype)
+                data[name] = np.concatenate([col[kept], added])
+            else:
+                data[name] = [col[i] for i in kept.tolist()] + added
+        return CatalogFrame(self.columns, data, len(kept) + len(records))
+
+def coerce_cell(kind, value):
+    """
+    value as a cell of a column of that kind (see CatalogFrame.kind), as
+    read_catalog_csv would have typed it. Raises ValueError if it can't be.
+    """
+    if isinstance(value, str) and (value in NA_VALUES or not value.strip()):
+        return None
+    if value is None:
+        return None
+    if kind in ("int", "float") and isinstance(value, str):
+        value = value.strip()
+    if kind == "int":
+        if isinstance(value, str) and INT_RE.match(value):
+            return int(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and float(value).is_integer():
+            return int(value)
+        raise ValueError("expects a whole number")
+    if kind == "float":
+        if isinstance(value, str) and FLOAT_RE.match(value):
+            return float(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        raise ValueError("expects a number")
+    if kind == "bool":
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value in BOOL_VALUES:
+            return BOOL_VALUES[value]
+        raise ValueError("expects true or false")
+    if isinstance(value, (dict, list)):
+        raise ValueError("expects text")
+    value = str(value)
+    return sys.intern(value) if len(value) <= INTERN_MAX_LEN else value
+
+def _typed_column(raw):
+    present = [v for v in raw if v is not None]
+    if present:
+        try:
+            if all(INT_RE.match(v) for v in present):
+                if len(present) == len(raw):
+                    return np.array([int(v) for v in raw], dtype=np.int64)
+                # Like pandas, an int column with gaps becomes float
+                return np.array([float(v) if v is not None else np.nan for v in raw], dtype=np.float64)
+            if all(FLOAT_RE.match(v) for v in present):
+                return np.array([float(v) if v is not None else np.nan for v in raw], dtype=np.float64)
+        except OverflowError:
+            pass
+        if all(v in BOOL_VALUES for v in present):
+            return [BOOL_VALUES[v] if v is not None else None for v in raw]
+    return [
+        (sys.intern(v) if len(v) <= INTERN_MAX_LEN else v) if v is not None else None
+        for v in raw
+    ]
+
+def read_catalog_csv(path, normalize_columns=True) -> CatalogFrame:
+    """
+    Parse a catalog CSV with the standard library, using read_csv's default
+    missing-value and dtype rules so records come out the same as before.
+    normalize_columns lower-cases and strips the header names.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if normalize_columns:
+            header = [c.lower().strip() for c in header]
+        width = len(header)
+        # Skip blank lines, pad short rows
+        rows = [
+            row if len(row) == width else (row + [""] * width)[:width]
+            for row in reader if row and row != [""]
+        ]
+    raw = [[None if v in NA_VALUES else v for v in col] for col in zip(*rows)] if rows else [[] for _ in header]
+    return CatalogFrame(header, {name: _typed_column(col) for name, col in zip(header, raw)}, len(rows))
@@ -0,0 +1,25 @@
+"""
+Offline step: compile data/schemes.csv and data/job.csv into data/catalog.snap.
+
+The recommendation engine maps the snapshot at startup instead of parsing the
+CSVs and rebuilding its indexes, and falls back to the CSVs whenever the
+snapshot does not match them. Run again after editing either CSV.
+The admin changes stored at compile time are folded in; ones stored later are
+replayed on top as delta rows at startup. Recompiling folds them in too.
+With RECOMMEND_RANKING=bm25 the BM25 indexes are compiled in as well.
+
+Usage: python compile_catalog.py [data_dir]
+"""
+import sys
+import time
+from catalog_overrides import mongo_override_store
+from recommendation_engine import RecommendationEngine
+
+if __name__ == "__main__":
+    data_path = sys.argv[1] if len(sys.argv) > 1 else None
+    start = time.perf_counter()
+    engine = RecommendationEngine(data_path, watch_interval=0, use_snapshot=False, store=mongo_override_store())
+    if engine.loaded_from is None:
+        sys.exit("Catalog failed to load, snapshot not written")
+    engine.write_snapshot()
+    print(f"Wrote {engine.snapshot_path} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,62 @@
+import threading
+from catalog_overrides import mongo_override_store
+from memory_size import deep_sizeof
+from recommendation_engine import RecommendationEngine
+
+# One engine per process, shared by routes, chat and WhatsApp
+_engine = None
+_loader = None
+_lock = threading.Lock()
+
+def _build():
+    global _engine
+    try:
+        # Admin catalog changes are kept in Mongo and folded in on load
+        _engine = RecommendationEngine(store=mongo_override_store())
+    except Exception as e:
+        print(f"Could not start the recommendation engine: {e}")
+
+def start_engine():
+    """Build the process-wide engine on a background thread, once; returns at once."""
+    global _loader
+    with _lock:
+        if _loader is None or (_engine is None and not _loader.is_alive()):
+            # A failed build is retried by the next caller
+            _loader = threading.Thread(target=_build, name="engine-loader", daemon=True)
+            _loader.start()
+        return _loader
+
+def loaded_engine():
+    """The process-wide engine, or None while it is still loading."""
+    if _engine is None:
+        start_engine()
+    return _engine
+
+def get_engine() -> RecommendationEngine:
+    """The process-wide engine, waiting for it to load if needed."""
+    if _engine is None:
+        start_engine().join()
+        if _engine is None:
+            raise RuntimeError("Recommendation engine failed to start")
+    return _engine
+
+def engine_info() -> dict:
+    """Load time and memory footprint of the shared engine, if it exists yet."""
+    engine = _engine
+    if engine is None:
+        return {"loaded": False}
+    data = engine.data
+    return {
+        "loaded": True,
+        "load_seconds": round(engine.load_seconds, 4) if engine.load_seconds is not None else None,
+        # Sized once per load, the catalog doesn't change after it
+        "catalog_bytes": engine.catalog_bytes,
+        # Part of catalog_bytes mapped from the snapshot file, shared between workers
+        "mapped_bytes": engine.mapped_bytes,
+        # Caches that grow with traffic, each read under its own lock
+        "keyword_columns": {
+            name: table.base.index.stats()
+            for name, table in (("schemes", data.schemes), ("jobs", data.jobs)) if table is not None
+        },
+        "result_cache_bytes": engine.result_cache.nbytes(deep_sizeof)
+    }
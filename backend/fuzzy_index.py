@@ -0,0 +1,89 @@
+class SymSpellIndex:
+    """
+    Spelling correction against a fixed vocabulary, SymSpell style.
+
+    Every word's prefix is indexed under each string obtained by deleting up
+    to max_distance characters from it. A lookup generates the same deletes
+    for the query, so candidates come from a handful of dict hits instead of
+    a scan over the vocabulary, and only those few are checked with a
+    bounded edit distance. Lookup cost depends on the query length, not on
+    how large the vocabulary grows.
+    """
+
+    def __init__(self, words: dict, max_distance=2, prefix_length=7):
+        """words: {word: frequency}; more frequent words win ties."""
+        self.words = words
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = {}
+        for word in words:
+            for variant in _deletes(word[:prefix_length], max_distance):
+                self.deletes.setdefault(variant, []).append(word)
+
+    def allowed_distance(self, term):
+        # Short terms get fewer edits, or "go" would become "js"
+        if len(term) <= 3:
+            return 0
+        return min(self.max_distance, 1 if len(term) <= 5 else 2)
+
+    def lookup(self, term, max_distance=None, unique=False):
+        """
+        Closest vocabulary word within the allowed distance (capped at
+        max_distance, if given), or None. With unique, None as well when
+        several words are equally close, instead of taking the most frequent.
+        """
+        if term in self.words:
+            return term
+        allowed = self.allowed_distance(term)
+        max_distance = allowed if max_distance is None else min(allowed, max_distance)
+        if not max_distance:
+            return None
+
+        candidates = set()
+        for variant in _deletes(term[:self.prefix_length], max_distance):
+            candidates.update(self.deletes.get(variant, ()))
+
+        found = {}
+        for word in candidates:
+            if abs(len(word) - len(term)) > max_distance:
+                continue
+            distance = edit_distance(term, word, max_distance)
+            if distance <= max_distance:
+                found[word] = distance
+        if not found:
+            return None
+        nearest = min(found.values())
+        closest = [w for w, d in found.items() if d == nearest]
+        if unique and len(closest) > 1:
+            return None
+        return min(closest, key=lambda w: (-self.words[w], w))
+
+def _deletes(word, max_distance):
+    """word plus every string made by deleting up to max_distance characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - found
+        found |= frontier
+    return found
+
+def edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions), or max_distance + 1 as soon as it must exceed it.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
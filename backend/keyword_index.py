@@ -0,0 +1,154 @@
+import os
+import threading
+import numpy as np
+from keyword_matcher import get_matcher
+
+# Below this many new terms a per-term `in` scan (done in C) beats walking
+# every text through the Python Aho-Corasick automaton
+MATCHER_MIN_TERMS = 32
+
+# Bytes of free-form term columns each index keeps (one byte per row per
+# term), so the number of cached terms shrinks as the catalog grows
+EXTRA_COLUMN_BYTES = int(float(os.getenv("KEYWORD_COLUMN_CACHE_MB", "64")) * 2**20)
+
+class KeywordIndex:
+    """
+    Keyword hit matrix over a fixed list of (lowercased) texts.
+
+    Each known term owns a boolean column marking the rows whose text contains
+    it as a substring, so scoring a weighted keyword list is a single
+    matrix-vector product instead of a Python loop over every row.
+    """
+
+    def __init__(self, texts, vocabulary=(), max_extra_bytes=EXTRA_COLUMN_BYTES, pinned=None):
+        # Texts mapped from a snapshot (catalog_snapshot.StringColumn) stay
+        # encoded: columns are built by searching their blob
+        self.texts = texts if hasattr(texts, "rows_containing") else list(texts)
+        self.size = len(self.texts)
+        self.max_extra_bytes = max_extra_bytes
+        # Columns for the fixed vocabulary are built once and never evicted
+        self._pinned = {}
+        # Free-form terms (skills, interests) are built on first use
+        self._extra = {}
+        self._extra_bytes = 0
+        self._lock = threading.Lock()
+        if pinned is not None:
+            # Columns already built elsewhere, e.g. mapped from a snapshot
+            self._pinned.update(pinned)
+        else:
+            self._pinned.update(self._build_columns(list(dict.fromkeys(vocabulary))))
+
+    def pinned_matrix(self):
+        """(vocabulary terms, bool matrix of shape (terms, rows)) for the fixed vocabulary."""
+        terms = list(self._pinned)
+        return terms, self.hits(terms)
+
+    def _build_columns(self, terms):
+        if hasattr(self.texts, "rows_containing"):
+            columns = {}
+            for term in terms:
+                col = np.zeros(self.size, dtype=bool)
+                col[self.texts.rows_containing(term)] = True
+                columns[term] = col
+            return columns
+        if len(terms) < MATCHER_MIN_TERMS:
+            return {
+                term: np.fromiter((term in text for text in self.texts), dtype=bool, count=self.size)
+                for term in terms
+            }
+        # One pass over every text finds all of the terms at once
+        matcher = get_matcher(terms)
+        rows = {term: [] for term in terms}
+        for i, text in enumerate(self.texts):
+            for term in matcher.find(text):
+                rows[term].append(i)
+        columns = {}
+        for term, idx in rows.items():
+            col = np.zeros(self.size, dtype=bool)
+            col[idx] = True
+            columns[term] = col
+        return columns
+
+    def columns(self, terms):
+        """Column for each term, building any unseen ones in a single batch."""
+        found = {}
+        missing = []
+        with self._lock:
+            for term in terms:
+                col = self._pinned.get(term)
+                if col is None:
+                    col = self._extra.pop(term, None)
+                    if col is not None:
+                        self._extra[term] = col
+                if col is None:
+                    missing.append(term)
+                else:
+                    found[term] = col
+        if missing:
+            built = self._build_columns(list(dict.fromkeys(missing)))
+            found.update(built)
+            with self._lock:
+                for term, col in built.items():
+                    if col.nbytes > self.max_extra_bytes or term in self._extra:
+                        continue
+                    while self._extra_bytes + col.nbytes > self.max_extra_bytes:
+                        # Drop the least recently used free-form term
+                        self._extra_bytes -= self._extra.pop(next(iter(self._extra))).nbytes
+                    self._extra[term] = col
+                    self._extra_bytes += col.nbytes
+        return [found[t] for t in terms]
+
+    def hits(self, terms):
+        """Boolean matrix of shape (len(terms), rows)."""
+        if not terms:
+            return np.zeros((0, self.size), dtype=bool)
+        return np.vstack(self.columns(terms))
+
+    def any_hit(self, terms):
+        return self.hits(terms).any(axis=0)
+
+    def score(self, weights: dict):
+        """weights: {term: weight}. Returns float64 scores, one per row."""
+        terms = [t for t, w in weights.items() if w]
+        if not terms:
+            return np.zeros(self.size)
+        w = np.array([weights[t] for t in terms], dtype=np.float64)
+        return w @ self.hits(terms)
+
+    def score_many(self, weights_list):
+        """
+        Scores for several weight dicts at once: one (profiles x terms) by
+        (terms x rows) matrix product. Returns float32 of shape (profiles, rows).
+        """
+        terms = list(dict.fromkeys(t for weights in weights_list for t, w in weights.items() if w))
+        if not terms:
+            return np.zeros((len(weights_list), self.size), dtype=np.float32)
+        position = {t: j for j, t in enumerate(terms)}
+        w = np.zeros((len(weights_list), len(terms)), dtype=np.float32)
+        for i, weights in enumerate(weights_list):
+            for t, weight in weights.items():
+                if weight:
+                    w[i, position[t]] = weight
+        return w @ self.hits(terms)
+
+    def stats(self) -> dict:
+        """Size of the free-form term column cache."""
+        with self._lock:
+            return {
+                "cached_terms": len(self._extra),
+                "cached_bytes": self._extra_bytes,
+                "max_bytes": self.max_extra_bytes
+            }
+
+def keyword_weights(*weighted_lists):
+    """
+    Merge (keywords, weight) pairs into {term: total_weight}.
+
+    Repeated keywords add up, matching the old per-keyword loop which counted
+    a keyword once for every time it appeared in the list.
+    """
+    weights = {}
+    for keywords, weight in weighted_lists:
+        for kw in keywords:
+            weights[kw] = weights.get(kw, 0) + weight
+    return weights
@@ -0,0 +1,81 @@
+from collections import deque
+from functools import lru_cache
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of keywords.
+
+    find() walks the text once and returns every keyword that occurs in it
+    as a substring, the same answer as running `kw in text` per keyword.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(keywords))
+        # Empty keyword is "in" every string
+        self._always = frozenset(kw for kw in self.keywords if kw == "")
+
+        # 1. Trie of all keywords
+        goto = [{}]
+        outputs = [set()]
+        for kw in self.keywords:
+            if not kw:
+                continue
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(kw)
+
+        # 2. Failure links (BFS), folded into a full transition table so the
+        # scan loop never has to follow a failure chain
+        fail = [0] * len(goto)
+        delta = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                outputs[nxt] |= outputs[fail[nxt]]
+            # Missing edges fall back to the failure state's transitions
+            if state:
+                for ch, nxt in delta[fail[state]].items():
+                    delta[state].setdefault(ch, nxt)
+
+        self._delta = delta
+        self._outputs = [frozenset(o) if o else None for o in outputs]
+
+    def find(self, text: str) -> set:
+        """All keywords that occur in text."""
+        found = set(self._always)
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            out = outputs[state]
+            if out is not None:
+                found |= out
+        return found
+
+    def count(self, text: str, keywords) -> int:
+        """Number of entries in keywords (repeats included) found in text."""
+        found = self.find(text)
+        return sum(1 for kw in keywords if kw in found)
+
+@lru_cache(maxsize=256)
+def _compile(keywords: tuple) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+def get_matcher(keywords) -> KeywordMatcher:
+    """Compiled matcher for a keyword set, built once and cached."""
+    return _compile(tuple(sorted(set(keywords))))
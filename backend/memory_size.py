@@ -0,0 +1,60 @@
+import mmap
+import sys
+import numpy as np
+
+def deep_sizeof(obj, seen=None, mapped=None) -> int:
+    """
+    Approximate bytes held by obj and everything it references. Shared
+    objects (interned strings, cached columns) are only counted once.
+    Arrays over a memory-mapped file aren't counted; pass a dict as mapped
+    to collect their bytes instead (see footprint()).
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        size = sys.getsizeof(obj)
+        if obj.base is None:
+            # Owns its buffer, which getsizeof already includes
+            return size
+        root = obj.base
+        while isinstance(root, np.ndarray) and root.base is not None:
+            root = root.base
+        if isinstance(root, memoryview):
+            root = root.obj
+        if isinstance(root, mmap.mmap):
+            if mapped is not None:
+                mapped[id(obj)] = obj.nbytes
+            return size
+        # A view: the buffer it shares is counted once, with its owner
+        return size + deep_sizeof(root, seen, mapped)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_sizeof(k, seen, mapped) + deep_sizeof(v, seen, mapped) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(v, seen, mapped) for v in obj)
+    if callable(obj) and hasattr(obj, "cache_info"):
+        # lru_cache wrappers: contents aren't reachable, count the wrapper only
+        return size
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen, mapped)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen, mapped)
+    return size
+
+def footprint(obj):
+    """
+    (bytes, mapped_bytes) of obj: bytes counts everything it holds, so it
+    means the same whether the data was parsed or mapped from a file;
+    mapped_bytes is the part that lives in mapped file pages.
+    """
+    mapped = {}
+    heap = deep_sizeof(obj, mapped=mapped)
+    mapped_bytes = sum(mapped.values())
+    return heap + mapped_bytes, mapped_bytes
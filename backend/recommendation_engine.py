@@ -1,45 +1,1132 @@
-import pandas as pd
+import numpy as np
+import base64
+import hashlib
+import itertools
+import json
 import os
+import threading
+import time
+import uuid
+import catalog_snapshot
+from bm25_index import BM25_B, BM25_K1, BM25Index, text_postings
+from catalog_store import coerce_cell, read_catalog_csv
+from keyword_index import KeywordIndex, keyword_weights
+from memory_size import footprint
+from sharded_scoring import ShardPool
+from skill_index import ROLE_COLUMNS, SkillGapIndex
+from ttl_cache import TTLCache
+
+# Max schemes / jobs returned per request
+RESULT_LIMIT = 50
+
+# Batch scoring: max profiles per chunk, and max cells in one chunk's score matrix
+BATCH_CHUNK_SIZE = 256
+BATCH_MAX_CELLS = 4_000_000
+
+# How rows are scored: "keyword" (weighted substring hits) or "bm25"
+RANKING_MODES = ("keyword", "bm25")
+RANKING_MODE = os.getenv("RECOMMEND_RANKING", "keyword")
+
+# Ranking cache: max cached profiles, and seconds an entry lives
+RESULT_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "2048"))
+RESULT_CACHE_TTL = float(os.getenv("RECOMMEND_CACHE_TTL", "600"))
+
+# Scheme keywords for each occupation bucket
+SCHEME_OCCUPATION_KEYWORDS = {
+    "student": ["scholarship", "education", "student", "learning", "skill", "training"],
+    "unemployed": ["employment", "loan", "skill", "pension", "livelihood", "guarantee"],
+    "employed": ["housing", "insurance", "pension", "tech", "finance"],
+    "farmer": ["farmer", "agriculture", "kisan", "crop", "loan", "irrigation", "rural"],
+    "business": ["business", "loan", "msme", "startup", "credit", "entrepreneur"],
+    "retired": ["pension", "senior", "health", "security"],
+    # Default generic keywords if occupation is unknown/other
+    "other": ["citizen", "welfare", "scheme", "financial", "support"],
+}
+
+# Extra job keywords for students / freshers
+STUDENT_JOB_KEYWORDS = ["internship", "fresher", "entry", "scholarship", "training"]
+STUDENT_BOOST_KEYWORDS = ["fresher", "intern", "entry", "training"]
+
+# heuristic to identify popular/general portals if no specific match
+# broadly known portals often have low IDs in this dataset (1-10) or specific names
+MAJOR_PORTALS = ["naukri", "indeed", "linkedin", "monster", "glassdoor", "shine"]
+
+def occupation_bucket(occupation: str) -> str:
+    if "student" in occupation or "graduating" in occupation:
+        return "student"
+    elif "unemployed" in occupation:
+        return "unemployed"
+    elif "employed" in occupation:
+        return "employed"
+    elif "farmer" in occupation or "agriculture" in occupation:
+        return "farmer"
+    elif "business" in occupation:
+        return "business"
+    elif "retired" in occupation:
+        return "retired"
+    return "other"
+
+def profile_key(user_profile: dict):
+    """
+    Canonical form of a profile, holding everything scoring depends on and
+    nothing else: (occupation bucket, is_student, skills, interests), with
+    skills and interests sorted and deduplicated. Used as the cache key.
+    """
+    occupation = user_profile.get("occupation", "").lower()
+    skills = tuple(sorted({s.strip().lower() for s in user_profile.get("skills", "").split(",") if s.strip()}))
+    interests = tuple(sorted({i.strip().lower() for i in user_profile.get("interest", "").split(",") if i.strip()}))
+    is_student = "student" in occupation or "graduating" in occupation or "fresher" in occupation
+    return (occupation_bucket(occupation), is_student, skills, interests)
+
+def profile_terms(key):
+    """
+    Keyword weights a canonical profile is scored with:
+    (scheme weights, job weights, is_student).
+    """
+    bucket, is_student, skills, interests = key
+
+    # Keywords for occupation, occupation match has high weight
+    occ_keywords = SCHEME_OCCUPATION_KEYWORDS[bucket]
+    scheme_weights = keyword_weights((occ_keywords, 2), (interests, 1))
+
+    # Job keywords: Skills + Interests + Occupation
+    job_keywords = list(skills + interests)
+    if is_student:
+         job_keywords += STUDENT_JOB_KEYWORDS
+
+    return scheme_weights, keyword_weights((job_keywords, 1)), is_student
+
+def job_boosts(job_index):
+    """(student boost, major portal boost) score vectors for the job rows."""
+    # 2. Occupation Context Boost
+    # If student, boost portals with 'fresher', 'intern', 'entry' in description
+    student_boost = 2 * job_index.any_hit(STUDENT_BOOST_KEYWORDS)
+
+    # 3. Popularity/Fallback Boost
+    # If keywords provided but no match found yet, we still want to show meaningful results.
+    # Give a small base score to major portals so they appear if nothing else matches specific skills.
+    portal_boost = 0.5 * job_index.any_hit(MAJOR_PORTALS)
+    return student_boost, portal_boost
+
+def _as_score(value):
+    # Keep whole scores as ints so the JSON looks the same as before
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+def top_k(scores, k, candidates=None):
+    """
+    Indices of the k highest scores, best first, ties broken by row order.
+    Uses argpartition so only the winners are ever sorted.
+    """
+    idx = np.arange(len(scores)) if candidates is None else candidates
+    vals = scores[idx]
+    if len(idx) > k > 0:
+        kth = vals[np.argpartition(-vals, k - 1)[k - 1]]
+        # Everything above the k-th score wins; rows tied with it are taken
+        # in row order, which is what a stable full sort would keep
+        above = vals > kth
+        tied = np.flatnonzero(vals == kth)[:k - int(above.sum())]
+        keep = np.concatenate([np.flatnonzero(above), tied])
+        idx, vals = idx[keep], vals[keep]
+    order = np.lexsort((idx, -vals))[:k]
+    return idx[order]
+
+def _live_rows(table, scores):
+    """Candidate rows for top_k: all of them (None) unless some are retired."""
+    return np.flatnonzero(np.isfinite(scores)) if table.retired else None
+
+# Same encoding FastAPI's JSONResponse uses
+_json_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+def encode_json(obj) -> bytes:
+    return _json_encoder.encode(obj).encode("utf-8")
+
+def encode_fragments(records):
+    """
+    Each record encoded as JSON with the closing brace left off, so a
+    response can append "match_score" and close the object by concatenation.
+    """
+    fragments = []
+    for record in records:
+        body = encode_json(record)[:-1]
+        fragments.append(body + b"," if record else body)
+    return fragments
+
+def _close_fragment(fragment):
+    """A fragment closed as the record alone, without match_score."""
+    return fragment[:-1] + b"}" if fragment.endswith(b",") else fragment + b"}"
+
+def _join_fragments(fragments, order, scores):
+    return b",".join(
+        fragments[i] + b'"match_score":' + encode_json(_as_score(score)) + b"}" for i, score in zip(order, scores)
+    )
+
+def _join_projected(table, order, scores, fields):
+    """Rows holding only `fields` (those the catalog has, plus match_score)."""
+    columns = [f for f in fields if f in table.columns]
+    with_score = "match_score" in fields
+    records = []
+    for i, score in zip(order, scores):
+        record = {f: table.value(f, i) for f in columns}
+        if with_score:
+            record["match_score"] = _as_score(score)
+        records.append(encode_json(record))
+    return b",".join(records)
+
+class CursorError(ValueError):
+    """A continuation token that is malformed, or from another profile or catalog."""
+
+    def __init__(self, message, stale=False):
+        super().__init__(message)
+        # True when the catalog changed since the token was issued
+        self.stale = stale
+
+def _profile_digest(key):
+    return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:16]
+
+def encode_cursor(catalog_id, key, offset):
+    """Opaque token for the page starting at `offset` of this profile's ranking."""
+    raw = json.dumps([catalog_id, _profile_digest(key), offset], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor, catalog_id, key):
+    """Offset a token points at, checked against the catalog and profile it must belong to."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        token_catalog, digest, offset = json.loads(raw)
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+    if not isinstance(offset, int) or offset < 0:
+        raise CursorError("Invalid cursor")
+    if digest != _profile_digest(key):
+        raise CursorError("Cursor belongs to a different profile")
+    if token_catalog != catalog_id:
+        raise CursorError("Catalog changed since this cursor was issued, start again", stale=True)
+    return offset
+
+# Job scoring across this many worker processes (0 or 1 scores in-process),
+# used only for job catalogs of at least SHARD_MIN_ROWS rows
+SHARD_WORKERS = int(os.getenv("RECOMMEND_SHARD_WORKERS", "0"))
+SHARD_MIN_ROWS = int(os.getenv("RECOMMEND_SHARD_MIN_ROWS", "200000"))
+
+# Catalog files watched for changes, relative to data_path
+SCHEMES_FILE = "schemes.csv"
+JOBS_FILE = "job.csv"
+
+# Compiled snapshot of both catalogs (see compile_catalog.py), relative to data_path
+SNAPSHOT_FILE = "catalog.snap"
+
+# Seconds between checks for changed catalog files (0 disables the watcher)
+WATCH_INTERVAL = float(os.getenv("CATALOG_WATCH_INTERVAL", "5"))
+
+# Seconds the override store is left alone after a failed read, doubling
+# on each further failure up to the max, so a down store costs one timeout
+# per backoff instead of one per reload check
+STORE_RETRY_SECONDS = float(os.getenv("CATALOG_STORE_RETRY", "5"))
+STORE_RETRY_MAX_SECONDS = float(os.getenv("CATALOG_STORE_RETRY_MAX", "300"))
+
+# Text searched for keywords, and the fixed keyword vocabulary, of each catalog
+SCHEME_TEXT_COLUMNS = ['scheme_name', 'description', 'scheme_type']
+SCHEME_VOCABULARY = [kw for kws in SCHEME_OCCUPATION_KEYWORDS.values() for kw in kws]
+JOB_TEXT_COLUMNS = ['name', 'description', 'type']
+JOB_VOCABULARY = STUDENT_JOB_KEYWORDS + STUDENT_BOOST_KEYWORDS + MAJOR_PORTALS
+
+# Column identifying a row to the admin catalog API
+SCHEME_KEY_COLUMN = 'scheme_id'
+JOB_KEY_COLUMN = 'id'
+
+# Catalogs the admin API can change: name -> (text columns, key column)
+CATALOG_TABLES = {
+    "schemes": (SCHEME_TEXT_COLUMNS, SCHEME_KEY_COLUMN),
+    "jobs": (JOB_TEXT_COLUMNS, JOB_KEY_COLUMN),
+}
+
+class OverrideError(ValueError):
+    """An admin catalog change that can't be applied, with the HTTP status to report."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+class CatalogTable:
+    """One catalog CSV plus everything derived from it."""
+
+    __slots__ = ("frame", "index", "fragments", "bm25", "_key_rows", "_boosts")
+
+    @classmethod
+    def from_arrays(cls, arrays, name, meta):
+        """Rebuild a table from the arrays written by to_arrays."""
+        table = cls.__new__(cls)
+        table.frame = catalog_snapshot.get_frame(arrays, name, meta["frame"])
+        matrix = arrays[f"{name}.pinned"]
+        table.index = KeywordIndex(
+            catalog_snapshot.get_strings(arrays, f"{name}.text"),
+            pinned={term: matrix[j] for j, term in enumerate(meta["vocabulary"])}
+        )
+        table.fragments = catalog_snapshot.get_strings(arrays, f"{name}.fragments", as_bytes=True)
+        table.bm25 = None
+        table._key_rows = None
+        table._boosts = None
+        if f"{name}.bm25.ptr" in arrays:
+            table.bm25 = BM25Index.from_arrays(
+                arrays, f"{name}.bm25", catalog_snapshot.get_strings(arrays, f"{name}.bm25.tokens"), len(table.frame)
+            )
+        return table
+
+    def to_arrays(self, arrays, name):
+        """Add this table's arrays to `arrays`; returns the JSON meta to store alongside."""
+        terms, matrix = self.index.pinned_matrix()
+        arrays[f"{name}.pinned"] = matrix
+        catalog_snapshot.put_strings(arrays, f"{name}.text", self.index.texts)
+        catalog_snapshot.put_strings(arrays, f"{name}.fragments", self.fragments, as_bytes=True)
+        if self.bm25 is not None:
+            catalog_snapshot.put_strings(arrays, f"{name}.bm25.tokens", self.bm25.to_arrays(arrays, f"{name}.bm25"))
+        return {"frame": catalog_snapshot.put_frame(arrays, name, self.frame), "vocabulary": terms}
+
+    def __init__(self, frame, text_columns, vocabulary):
+        # Ensure description exists
+        if 'description' not in frame.columns:
+            frame.add_column('description', [None] * len(frame))
+        combined_text = [
+            " ".join(parts).lower() for parts in zip(*(frame.text(c) for c in text_columns))
+        ]
+        self.frame = frame
+        # Precompute the row x keyword hit matrix for the fixed vocabulary
+        self.index = KeywordIndex(combined_text, vocabulary=vocabulary)
+        # Each JSON-ready row (no NaN) encoded once
+        self.fragments = encode_fragments(frame.records())
+        # Built on load when the engine ranks with BM25
+        self.bm25 = None
+        self._key_rows = None
+        self._boosts = None
+
+    def ranker(self, mode):
+        """Index the rows are scored with: the BM25 index or the keyword hit index."""
+        return self.bm25 if mode == "bm25" else self.index
+
+    def job_boosts(self):
+        """job_boosts() for these rows, built once."""
+        if self._boosts is None:
+            self._boosts = job_boosts(self.index)
+        return self._boosts
+
+    def row_for_key(self, key_column, key: str):
+        """Row whose key column equals key (compared as text), or None."""
+        if self._key_rows is None:
+            self._key_rows = key_rows(self.frame, key_column)
+        return self._key_rows.get(key)
+
+    def record(self, i, score):
+        record = self.frame.record(i)
+        record['match_score'] = _as_score(score)
+        return record
+
+def _key_text(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def key_rows(frame, key_column):
+    """{key as text: row} for a frame's key column (the last row wins a repeated key)."""
+    values = frame.values(key_column) if key_column in frame.columns else []
+    # A whole-number float (int column with gaps) is keyed as the int
+    return {_key_text(v): row for row, v in enumerate(values) if v is not None}
+
+def normalize_record(frame, key_column, key, record: dict, strict=True):
+    """
+    record as a full row of the frame's columns (None for missing), each
+    value typed like the column it goes in, with the key column set to
+    key. Unknown columns and values that don't fit their column raise
+    OverrideError when strict; otherwise they are dropped.
+    """
+    clean = {str(k).lower().strip(): v for k, v in record.items()}
+    unknown = sorted(set(clean) - set(frame.columns))
+    if unknown and strict:
+        raise OverrideError(f"Unknown columns: {', '.join(unknown)}")
+    if key_column in frame.columns:
+        clean[key_column] = key
+    row = {}
+    for column in frame.columns:
+        try:
+            row[column] = coerce_cell(frame.kind(column), clean.get(column))
+        except ValueError as e:
+            if strict or column == key_column:
+                raise OverrideError(f"{'Key' if column == key_column else 'Column ' + column} {e}")
+            print(f"Dropping stored value of {column} for row {key}: {e}")
+            row[column] = None
+    return row
+
+def canonical_key(frame, key_column, key):
+    """
+    key as text of the value the key column holds for it ("007" -> "7" in
+    a numeric column), so one row has one key however it is typed. Raises
+    OverrideError if key doesn't fit the column.
+    """
+    key = str(key).strip()
+    if key_column not in frame.columns:
+        return key
+    try:
+        value = coerce_cell(frame.kind(key_column), key)
+    except ValueError as e:
+        raise OverrideError(f"Key {e}")
+    if value is None:
+        raise OverrideError("Key is empty")
+    return _key_text(value)
+
+def canonical_entries(frame, key_column, entries):
+    """
+    Stored changes ({key: record or None}) under canonical keys. Changes
+    saved under other spellings of one key collapse into the latest; keys
+    that can't be in the column are skipped.
+    """
+    clean = {}
+    for key, record in entries.items():
+        try:
+            key = canonical_key(frame, key_column, key)
+        except OverrideError as e:
+            print(f"Skipping stored change to row {key}: {e}")
+            continue
+        clean.pop(key, None)
+        clean[key] = record
+    return clean
+
+def fold_overrides(frame, entries, key_column):
+    """
+    frame with admin changes ({key: record or None}) applied as if they
+    were CSV rows: every changed row dropped, the records appended in
+    change order.
+    """
+    if not entries:
+        return frame
+    rows = key_rows(frame, key_column)
+    records = []
+    for key, record in entries.items():
+        if record is not None:
+            try:
+                records.append(normalize_record(frame, key_column, key, record, strict=False))
+            except OverrideError as e:
+                print(f"Skipping stored change to row {key}: {e}")
+    return frame.with_rows([rows[key] for key in entries if key in rows], records)
+
+class DeltaRow:
+    """A row added, or re-added by an update, through the admin API since the last load."""
+
+    __slots__ = ("key", "record", "text", "fragment", "bm25_weights")
+
+    def __init__(self, key, record, text, bm25_weights=None):
+        self.key = key
+        self.record = record
+        self.text = text
+        self.fragment = encode_fragments([record])[0]
+        # The text's BM25 term weights, when the catalog ranks with BM25
+        self.bm25_weights = bm25_weights
+
+class _Fragments:
+    """Base fragments followed by the delta rows' ones, indexable like a list."""
+
+    __slots__ = ("base", "rows", "size")
+
+    def __init__(self, base, rows):
+        self.base = base
+        self.rows = rows
+        self.size = len(base)
+
+    def __getitem__(self, i):
+        return self.base[i] if i < self.size else self.rows[i - self.size].fragment
+
+class LiveTable:
+    """
+    A catalog as served: the CatalogTable built on load (the CSV rows with
+    the stored admin changes folded in), plus the changes made since. A
+    change retires the row holding its key and, unless it retires the key,
+    appends the new row after all the others, so row numbers never move.
+
+    Immutable like CatalogData; with_override returns a new table that
+    shares the base and its indexes and only parses the changed row.
+    Retired rows score -inf and are never returned.
+    """
+
+    __slots__ = ("base", "text_columns", "key_column", "retired", "rows", "keys", "size", "base_size",
+                 "fragments", "_retired_rows", "_delta_index", "_delta_postings", "_delta_boosts", "_inventory")
+
+    def __init__(self, base, text_columns, key_column, retired=frozenset(), rows=(), keys=None, retired_rows=None):
+        self.base = base
+        self.text_columns = text_columns
+        self.key_column = key_column
+        self.retired = retired
+        self.rows = rows
+        # Key -> row of the live delta rows
+        self.keys = keys if keys is not None else {}
+        self.base_size = len(base.frame)
+        self.size = self.base_size + len(rows)
+        self.fragments = _Fragments(base.fragments, rows) if rows else base.fragments
+        self._retired_rows = retired_rows if retired_rows is not None else np.zeros(0, dtype=np.int64)
+        # Indexes over the delta rows' texts, built on first use
+        self._delta_index = None
+        self._delta_postings = None
+        self._delta_boosts = None
+        # Every live row as one JSON array, built on first use
+        self._inventory = None
+
+    @property
+    def columns(self):
+        return self.base.frame.columns
+
+    @property
+    def has_delta(self):
+        return bool(self.retired or self.rows)
+
+    # --- Admin changes ---
+
+    def locate(self, key):
+        """Live row holding key, or None."""
+        row = self.keys.get(key)
+        if row is None:
+            row = self.base.row_for_key(self.key_column, key)
+        return row if row is not None and row not in self.retired else None
+
+    def has_key(self, key):
+        return self.locate(key) is not None
+
+    def canonical_key(self, key):
+        """canonical_key against this catalog's key column."""
+        return canonical_key(self.base.frame, self.key_column, key)
+
+    def next_key(self):
+        """Key for a new row: one past the largest numeric key, else a random one."""
+        col = self.base.frame.data.get(self.key_column)
+        if isinstance(col, np.ndarray) and col.dtype.kind in "iuf":
+            keys = [int(np.nanmax(col))] if len(col) and not np.isnan(col).all() else []
+            keys += [int(key) for key in self.keys if key.lstrip("-").isdigit()]
+            return str(max(keys, default=0) + 1)
+        return uuid.uuid4().hex[:12]
+
+    def normalize(self, key, record: dict, strict=True):
+        """normalize_record against this catalog's columns."""
+        return normalize_record(self.base.frame, self.key_column, key, record, strict)
+
+    def with_override(self, key, record):
+        """New table with the row holding key retired, and record appended unless it is None."""
+        retired, retired_rows = self.retired, self._retired_rows
+        row = self.locate(key)
+        if row is not None:
+            retired = retired | {row}
+            retired_rows = np.append(retired_rows, row)
+        keys = dict(self.keys)
+        keys.pop(key, None)
+        rows = self.rows
+        if record is not None:
+            output = {c: ("" if v is None else v) for c, v in record.items()}
+            text = " ".join("" if record.get(c) is None else str(record[c]) for c in self.text_columns).lower()
+            bm25 = self.base.bm25.text_weights(text) if self.base.bm25 is not None else None
+            keys[key] = self.size
+            rows = rows + (DeltaRow(key, output, text, bm25),)
+        return LiveTable(self.base, self.text_columns, self.key_column, retired, rows, keys, retired_rows)
+
+    def inventory_json(self):
+        """The live rows as a JSON array in row order: base rows not retired, then the delta rows."""
+        if self._inventory is None:
+            retired = self.retired
+            fragments = itertools.chain(self.base.fragments, (r.fragment for r in self.rows))
+            self._inventory = b"[" + b",".join(
+                _close_fragment(fragment) for i, fragment in enumerate(fragments) if i not in retired
+            ) + b"]"
+        return self._inventory
+
+    # --- Scoring ---
+
+    def _delta_keywords(self):
+        """KeywordIndex over the delta rows' texts."""
+        if self._delta_index is None:
+            self._delta_index = KeywordIndex([r.text for r in self.rows])
+        return self._delta_index
+
+    def _delta_score(self, mode, weights):
+        if mode == "bm25":
+            if self._delta_postings is None:
+                self._delta_postings = text_postings(r.bm25_weights for r in self.rows)
+            return self.base.bm25.score_postings(self._delta_postings, len(self.rows), weights)
+        return self._delta_keywords().score(weights)
+
+    def delta_score(self, mode, weights: dict):
+        """Scores of the delta rows only (retired ones -inf)."""
+        scores = self._delta_score(mode, weights)
+        if self.retired:
+            retired = self._retired_rows[self._retired_rows >= self.base_size] - self.base_size
+            scores[retired] = -np.inf
+        return scores
+
+    def score(self, mode, weights: dict):
+        scores = self.base.ranker(mode).score(weights)
+        if self.rows:
+            scores = np.concatenate([scores, self._delta_score(mode, weights)])
+        if self.retired:
+            scores[self._retired_rows] = -np.inf
+        return scores
+
+    def score_many(self, mode, weights_list):
+        scores = self.base.ranker(mode).score_many(weights_list)
+        if self.rows:
+            if mode == "bm25":
+                extra = np.array([self._delta_score(mode, w) for w in weights_list], dtype=scores.dtype)
+                extra = extra.reshape(len(weights_list), len(self.rows))
+            else:
+                extra = self._delta_keywords().score_many(weights_list)
+            scores = np.hstack([scores, extra])
+        if self.retired:
+            scores[:, self._retired_rows] = -np.inf
+        return scores
+
+    def delta_boosts(self):
+        """job_boosts() for the delta rows, built once per table."""
+        if self._delta_boosts is None:
+            self._delta_boosts = job_boosts(self._delta_keywords())
+        return self._delta_boosts
+
+    def add_job_boosts(self, scores, is_student):
+        """
+        Add job_boosts() to job scores in place: the portal boost to every
+        row, the student boost to students' scores. scores is one vector
+        (is_student a bool) or one row per profile (is_student a bool array).
+        """
+        parts = [(slice(0, self.base_size), self.base.job_boosts())]
+        if self.rows:
+            parts.append((slice(self.base_size, self.size), self.delta_boosts()))
+        for columns, (student_boost, portal_boost) in parts:
+            if np.ndim(is_student):
+                scores[is_student, columns] += student_boost
+            elif is_student:
+                scores[columns] += student_boost
+            scores[..., columns] += portal_boost
+
+    # --- Output ---
+
+    def record(self, i, score):
+        if i < self.base_size:
+            return self.base.record(i, score)
+        record = dict(self.rows[i - self.base_size].record)
+        record['match_score'] = _as_score(score)
+        return record
+
+    def value(self, name, i):
+        if i < self.base_size:
+            return self.base.frame.value(name, i)
+        return self.rows[i - self.base_size].record.get(name, "")
+
+def live_table(name, base):
+    """LiveTable serving a freshly loaded CatalogTable (None stays None)."""
+    if base is None:
+        return None
+    text_columns, key_column = CATALOG_TABLES[name]
+    return LiveTable(base, text_columns, key_column)
+
+class CatalogData:
+    """
+    Immutable view of the whole catalog. A reload builds a new one and swaps
+    it in with a single assignment, so readers never see a half-built state.
+    """
+
+    def __init__(self, schemes=None, jobs=None, stamp=None, version=0, skill_gap=None,
+                 base_skill_gap=None, overrides_id=0):
+        # LiveTables (loaded rows + admin changes since)
+        self.schemes = schemes
+        self.jobs = jobs
+        self.version = version
+        # Role token -> job rows index used by the skill gap analysis, and
+        # the one built on load that later changes are applied to
+        self.skill_gap = skill_gap
+        self.base_skill_gap = base_skill_gap if base_skill_gap is not None else skill_gap
+        # File (name, mtime_ns, size) tuples this data was built from
+        self.stamp = stamp
+        # Same in every worker serving the same files and overrides, unlike version
+        self.catalog_id = hashlib.sha256(repr((stamp, digest_text(overrides_id))).encode("utf-8")).hexdigest()[:16]
+        # ShardPool scoring the base job rows across processes, when enabled
+        self.job_shards = None
+
+    def replace(self, schemes, jobs, skill_gap, version, overrides_id):
+        """Same base catalog (and shard workers) with other live tables."""
+        data = CatalogData(schemes, jobs, self.stamp, version, skill_gap, self.base_skill_gap, overrides_id)
+        data.job_shards = self.job_shards
+        return data
+
+def override_hash(catalog, key, record):
+    encoded = json.dumps([catalog, key, record], sort_keys=True, default=str).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(encoded).digest()[:8], "big")
+
+def overrides_digest(overrides):
+    """
+    Id of an overrides mapping: the sum of its entries' hashes, so it
+    doesn't depend on how the mapping was reached and one change updates
+    it in O(1). Part of the catalog id cursors carry.
+    """
+    return sum(override_hash(c, k, r) for c, entries in overrides.items() for k, r in entries.items()) % 2**64
+
+def override_changes(old, new):
+    """
+    (catalog, key, record) for each entry of new that old lacks or holds
+    differently, in new's order; None if an entry of old is gone from new,
+    since a change deleted from the store can't be undone on top of tables
+    that already include it.
+    """
+    if any(key not in new.get(name, {}) for name, entries in old.items() for key in entries):
+        return None
+    return [
+        (name, key, record)
+        for name, entries in new.items()
+        for key, record in entries.items()
+        if key not in old.get(name, {}) or old[name][key] != record
+    ]
+
+def digest_text(digest):
+    # "" without overrides, so catalog ids stay what they were before them
+    return f"{digest:016x}" if digest else ""
 
 class RecommendationEngine:
-    def __init__(self):
+    def __init__(self, data_path=None, watch_interval=WATCH_INTERVAL, use_snapshot=True, shard_workers=SHARD_WORKERS,
+                 ranking=RANKING_MODE, store=None):
+        if ranking not in RANKING_MODES:
+            raise ValueError(f"Unknown ranking mode {ranking!r}, expected one of {RANKING_MODES}")
+        self.ranking = ranking
         self.base_path = os.path.dirname(os.path.abspath(__file__))
-        self.data_path = os.path.join(self.base_path, "data")
-        self.schemes_df = None
-        self.jobs_df = None
+        self.data_path = data_path or os.path.join(self.base_path, "data")
+        self.snapshot_path = os.path.join(self.data_path, SNAPSHOT_FILE)
+        self.use_snapshot = use_snapshot
+        self.shard_workers = shard_workers
+        self.data = CatalogData()
+        # Admin catalog changes: persisted in store (see catalog_overrides.py),
+        # mirrored here as {catalog: {key: row or None if retired}}
+        self.store = store
+        self.overrides = {}
+        self.overrides_stamp = None
+        # Store reads are skipped until this time.monotonic() after a failure
+        self._store_retry_at = 0.0
+        self._store_backoff = 0.0
+        # overrides_digest of self.overrides, and of the ones folded into the tables on load
+        self.overrides_id = 0
+        # The part of overrides folded into the loaded base tables; the rest
+        # are delta rows on top
+        self.base_overrides = {}
+        # Bumped on every successful (re)load or admin change
+        self.version = 0
+        # Wall time of the last successful (re)load, and whether it came from "snapshot" or "csv"
+        self.load_seconds = None
+        self.loaded_from = None
+        # Approximate bytes held by the loaded catalog tables and indexes, and
+        # how many of them are pages mapped from the snapshot file
+        self.catalog_bytes = None
+        self.mapped_bytes = None
+        # Rankings keyed on (catalog version, canonical profile)
+        self.result_cache = TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+        self._reload_lock = threading.Lock()
+        self._stop_watching = threading.Event()
         self.load_data()
+        if watch_interval:
+            self.start_watcher(watch_interval)
+
+    def _file_stamp(self):
+        stamp = []
+        for name in (SCHEMES_FILE, JOBS_FILE):
+            try:
+                st = os.stat(os.path.join(self.data_path, name))
+                stamp.append((name, st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append((name, None, None))
+        return tuple(stamp)
+
+    def snapshot_key(self):
+        """
+        What a snapshot must have been compiled from to be usable: the sha256
+        of each catalog file (None if absent) and a digest of the columns and
+        vocabularies the indexes are built with. Admin changes don't make it
+        stale, see load_data.
+        """
+        key = {}
+        for name in (SCHEMES_FILE, JOBS_FILE):
+            path = os.path.join(self.data_path, name)
+            key[name] = catalog_snapshot.file_sha256(path) if os.path.exists(path) else None
+        layout = [SCHEME_TEXT_COLUMNS, SCHEME_VOCABULARY, JOB_TEXT_COLUMNS, JOB_VOCABULARY, ROLE_COLUMNS, BM25_K1, BM25_B]
+        key["layout"] = hashlib.sha256(json.dumps(layout).encode("utf-8")).hexdigest()
+        return key
+
+    def _read_catalog(self, name, file_name, overrides):
+        """A catalog CSV with its stored admin changes folded in, None if the file is missing."""
+        path = os.path.join(self.data_path, file_name)
+        if not os.path.exists(path):
+            return None
+        frame = read_catalog_csv(path)
+        if 'description' not in frame.columns:
+            frame.add_column('description', [None] * len(frame))
+        key_column = CATALOG_TABLES[name][1]
+        return fold_overrides(frame, canonical_entries(frame, key_column, overrides.get(name, {})), key_column)
+
+    def _load_csv(self, overrides):
+        schemes = None
+        frame = self._read_catalog("schemes", SCHEMES_FILE, overrides)
+        if frame is not None:
+            schemes = CatalogTable(frame, SCHEME_TEXT_COLUMNS, SCHEME_VOCABULARY)
+
+        jobs = None
+        frame = self._read_catalog("jobs", JOBS_FILE, overrides)
+        if frame is not None:
+            jobs = CatalogTable(frame, JOB_TEXT_COLUMNS, JOB_VOCABULARY)
+
+        return schemes, jobs, SkillGapIndex(jobs.frame) if jobs is not None else None
+
+    def _load_snapshot(self):
+        """
+        (schemes, jobs, skill_gap, overrides folded into them) mapped from
+        the compiled snapshot, or None if it is missing or stale.
+        """
+        if not self.use_snapshot or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            meta, arrays = catalog_snapshot.read_snapshot(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring catalog snapshot: {e}")
+            return None
+        if meta.get("key") != self.snapshot_key():
+            print("Catalog snapshot is stale, loading CSVs (run compile_catalog.py to refresh it)")
+            return None
+
+        tables = meta["tables"]
+        schemes = CatalogTable.from_arrays(arrays, "schemes", tables["schemes"]) if "schemes" in tables else None
+        jobs = CatalogTable.from_arrays(arrays, "jobs", tables["jobs"]) if "jobs" in tables else None
+        skill_gap = None
+        if jobs is not None:
+            skill_gap = SkillGapIndex.from_arrays(
+                arrays, "skill_gap",
+                catalog_snapshot.get_strings(arrays, "skill_gap.tokens"),
+                catalog_snapshot.get_strings(arrays, "skill_gap.skills")
+            )
+        return schemes, jobs, skill_gap, meta.get("overrides", {})
+
+    def write_snapshot(self, path=None):
+        """Compile the live catalog into a snapshot file the next start can map."""
+        data = self.data
+        arrays = {}
+        tables = {}
+        # The tables as loaded: CSV rows plus the admin changes folded in on
+        # load, recorded so a start can replay only the ones stored since
+        for name, table in (("schemes", data.schemes), ("jobs", data.jobs)):
+            if table is not None:
+                tables[name] = table.base.to_arrays(arrays, name)
+        if data.base_skill_gap is not None:
+            tokens, skills = data.base_skill_gap.to_arrays(arrays, "skill_gap")
+            catalog_snapshot.put_strings(arrays, "skill_gap.tokens", tokens)
+            catalog_snapshot.put_strings(arrays, "skill_gap.skills", skills)
+        folded = json.loads(json.dumps(self.base_overrides, default=str))
+        catalog_snapshot.write_snapshot(
+            path or self.snapshot_path, arrays, {"key": self.snapshot_key(), "tables": tables, "overrides": folded}
+        )
 
     def load_data(self):
+        """
+        Read the admin changes from the store, then map the compiled
+        snapshot if it was built from the current CSVs and replay the
+        changes stored since it was compiled as delta rows; otherwise parse
+        the CSVs, fold the changes in and rebuild every derived structure.
+        Either way the result is built off to the side and swapped in; on
+        failure the previous data stays live.
+        """
+        with self._reload_lock:
+            # Stamp first: a file changing mid-parse is picked up by the next check
+            stamp = self._file_stamp()
+            start = time.perf_counter()
+            try:
+                overrides, overrides_stamp = self._load_overrides()
+                changes = None
+                loaded = self._load_snapshot()
+                if loaded is not None:
+                    schemes, jobs, skill_gap, folded = loaded
+                    overrides = self._canonical(overrides, schemes, jobs)
+                    changes = override_changes(self._canonical(folded, schemes, jobs), overrides)
+                    if changes is None:
+                        print("Admin changes were removed since the catalog snapshot was compiled, loading CSVs")
+                loaded_from = "snapshot"
+                if changes is None:
+                    schemes, jobs, skill_gap = self._load_csv(overrides)
+                    overrides = self._canonical(overrides, schemes, jobs)
+                    folded, changes, loaded_from = overrides, [], "csv"
+                if self.ranking == "bm25":
+                    for table in (schemes, jobs):
+                        if table is not None and table.bm25 is None:
+                            table.bm25 = BM25Index(table.index.texts)
+                folded_id = overrides_digest(folded)
+                data = CatalogData(
+                    live_table("schemes", schemes), live_table("jobs", jobs), stamp, self.version + 1,
+                    skill_gap, overrides_id=folded_id
+                )
+                data, overrides, overrides_id = self._replay(data, folded, folded_id, changes)
+            except Exception as e:
+                print(f"Error loading data: {e}")
+                return False
+
+            # Sized before anything serves from it: the tables are immutable
+            # from here on, except for caches that report their own size
+            catalog_bytes, mapped_bytes = footprint((schemes, jobs, skill_gap))
+
+            # Shard workers score with the keyword index
+            if (self.ranking == "keyword" and self.shard_workers > 1
+                    and jobs is not None and jobs.index.size >= SHARD_MIN_ROWS):
+                try:
+                    data.job_shards = ShardPool(jobs.index, self.shard_workers)
+                except Exception as e:
+                    print(f"Could not start job shard workers, scoring in-process: {e}")
+
+            old_data = self.data
+            self.data = data
+            self.overrides = overrides
+            self.overrides_stamp = overrides_stamp
+            self.overrides_id = overrides_id
+            self.base_overrides = folded
+            self.version = data.version
+            self.load_seconds = time.perf_counter() - start
+            self.loaded_from = loaded_from
+            self.catalog_bytes = catalog_bytes
+            self.mapped_bytes = mapped_bytes
+            # Cached rankings belong to the old catalog
+            self.result_cache.clear()
+            if old_data.job_shards is not None:
+                # Requests still holding the old data fall back to in-process scoring
+                old_data.job_shards.close()
+            return True
+
+    def reload_if_changed(self):
+        """
+        Reload when a catalog file's mtime or size differs from the live
+        data; re-apply the admin changes when another worker saved some.
+        """
+        if self._file_stamp() != self.data.stamp:
+            print("Catalog files changed, reloading...")
+            return self.load_data()
+        if self._store_ready():
+            try:
+                stamp = self.store.stamp()
+            except Exception as e:
+                self._store_failed(e)
+                return False
+            self._store_backoff = 0.0
+            if stamp != self.overrides_stamp:
+                return self.refresh_overrides()
+        return False
+
+    # --- Admin catalog changes ---
+
+    def _store_ready(self):
+        """Whether to read the override store now: there is one and it isn't backing off."""
+        return self.store is not None and time.monotonic() >= self._store_retry_at
+
+    def _store_failed(self, error):
+        self._store_backoff = min(max(self._store_backoff * 2, STORE_RETRY_SECONDS), STORE_RETRY_MAX_SECONDS)
+        self._store_retry_at = time.monotonic() + self._store_backoff
+        print(f"Could not read catalog overrides, keeping the current ones, retrying in {self._store_backoff:.0f}s: {error}")
+
+    def _load_overrides(self):
+        """(overrides, store stamp) from the store; the current ones if it can't be read or is backing off."""
+        if self.store is None:
+            return self.overrides, None
+        if not self._store_ready():
+            return self.overrides, self.overrides_stamp
         try:
-            schemes_path = os.path.join(self.data_path, "schemes.csv")
-            jobs_path = os.path.join(self.data_path, "job.csv")
-            
-            if os.path.exists(schemes_path):
-                self.schemes_df = pd.read_csv(schemes_path)
-                # Normalize columns
-                self.schemes_df.columns = [c.lower().strip() for c in self.schemes_df.columns]
-                # Ensure description exists
-                if 'description' not in self.schemes_df.columns:
-                    self.schemes_df['description'] = ""
-                self.schemes_df['combined_text'] = (
-                    self.schemes_df['scheme_name'].fillna('') + " " + 
-                    self.schemes_df['description'].fillna('') + " " + 
-                    self.schemes_df['scheme_type'].fillna('')
-                ).str.lower()
-            
-            if os.path.exists(jobs_path):
-                self.jobs_df = pd.read_csv(jobs_path)
-                self.jobs_df.columns = [c.lower().strip() for c in self.jobs_df.columns]
-                if 'description' not in self.jobs_df.columns:
-                    self.jobs_df['description'] = ""
-                self.jobs_df['combined_text'] = (
-                    self.jobs_df['name'].fillna('') + " " + 
-                    self.jobs_df['description'].fillna('') + " " + 
-                    self.jobs_df['type'].fillna('')
-                ).str.lower()
-                
+            # Stamp first: a change saved meanwhile is picked up by the next check
+            stamp = self.store.stamp()
+            overrides = self.store.load()
         except Exception as e:
-            print(f"Error loading data: {e}")
+            self._store_failed(e)
+            return self.overrides, self.overrides_stamp
+        self._store_backoff = 0.0
+        return overrides, stamp
+
+    def refresh_overrides(self):
+        """
+        Apply the admin changes other workers saved since this one last
+        read the store, one row at a time like its own changes. A change
+        that can't be replayed that way (a row's change deleted from the
+        store) reloads the catalog instead.
+        """
+        with self._reload_lock:
+            overrides, stamp = self._load_overrides()
+            data = self.data
+            overrides = self._canonical(overrides, data.schemes and data.schemes.base, data.jobs and data.jobs.base)
+            changes = override_changes(self.overrides, overrides)
+            if changes is not None:
+                try:
+                    data, overrides, overrides_id = self._replay(self.data, self.overrides, self.overrides_id, changes)
+                except Exception as e:
+                    print(f"Error applying catalog overrides: {e}")
+                    return False
+                if changes:
+                    self.overrides, self.overrides_id = overrides, overrides_id
+                    self._swap(data)
+                self.overrides_stamp = stamp
+                return bool(changes)
+        return self.load_data()
+
+    @staticmethod
+    def _canonical(overrides, schemes, jobs):
+        """overrides with canonical keys (canonical_entries) for the loaded base tables."""
+        result = dict(overrides)
+        for name, table in (("schemes", schemes), ("jobs", jobs)):
+            if table is not None and name in overrides:
+                result[name] = canonical_entries(table.frame, CATALOG_TABLES[name][1], overrides[name])
+        return result
+
+    def _swap(self, data):
+        self.data = data
+        self.version = data.version
+        # Cached rankings belong to the old catalog
+        self.result_cache.clear()
+
+    def _live_table(self, catalog):
+        if catalog not in CATALOG_TABLES:
+            raise OverrideError(f"Unknown catalog {catalog!r}, expected one of {tuple(CATALOG_TABLES)}", 404)
+        table = getattr(self.data, catalog)
+        if table is None:
+            raise OverrideError(f"The {catalog} catalog is not loaded", 503)
+        return table
+
+    def _apply(self, catalog, key, record, user):
+        """Persist one change and apply it. Caller holds _reload_lock."""
+        if self.store is not None:
+            try:
+                self.store.save(catalog, key, record, user)
+            except Exception as e:
+                print(f"Could not save catalog change: {e}")
+                raise OverrideError("Catalog store unavailable, change not saved", 503)
+        self._change(catalog, key, record)
+
+    def _change(self, catalog, key, record):
+        """
+        Swap in tables with one change applied: the row holding key retired
+        and record (unless None) appended. Caller holds _reload_lock.
+        """
+        data, self.overrides, self.overrides_id = self._with_change(
+            self.data, self.overrides, self.overrides_id, catalog, key, record, record
+        )
+        self._swap(data)
+
+    @staticmethod
+    def _with_change(data, overrides, overrides_id, catalog, key, record, row):
+        """
+        (data, overrides, overrides_id) with one change applied off to the
+        side: record stored as the catalog's change to key, and in its table
+        the row holding key retired and row (record as a full row, None to
+        retire) appended. A catalog that isn't loaded only has the change
+        recorded.
+        """
+        # Latest change last, so a replay applies them in order
+        entries = dict(overrides.get(catalog, {}))
+        if key in entries:
+            overrides_id -= override_hash(catalog, key, entries.pop(key))
+        entries[key] = record
+        overrides = {**overrides, catalog: entries}
+        overrides_id = (overrides_id + override_hash(catalog, key, record)) % 2**64
+
+        schemes, jobs, skill_gap = data.schemes, data.jobs, data.skill_gap
+        if catalog == "schemes" and schemes is not None:
+            schemes = schemes.with_override(key, row)
+        elif catalog == "jobs" and jobs is not None:
+            skill_gap = skill_gap.derive(jobs.locate(key), row)
+            jobs = jobs.with_override(key, row)
+        return data.replace(schemes, jobs, skill_gap, data.version + 1, overrides_id), overrides, overrides_id
+
+    def _replay(self, data, overrides, overrides_id, changes):
+        """
+        _with_change for each stored (catalog, key, record), typed leniently
+        like a CSV row: values that don't fit their column are dropped.
+        """
+        for catalog, key, record in changes:
+            table = getattr(data, catalog) if catalog in CATALOG_TABLES else None
+            row = table.normalize(key, record, strict=False) if table is not None and record is not None else None
+            data, overrides, overrides_id = self._with_change(data, overrides, overrides_id, catalog, key, record, row)
+        return data, overrides, overrides_id
+
+    def add_record(self, catalog, record: dict, user=None):
+        """
+        Add a row to "schemes" or "jobs". Its key column is taken from the
+        record if set (typed like the column, so "007" is key 7), else
+        assigned. Returns (key, stored row). Raises OverrideError (409 if
+        the key is taken).
+        """
+        with self._reload_lock:
+            table = self._live_table(catalog)
+            given = {str(k).lower().strip(): v for k, v in record.items()}.get(table.key_column)
+            key = table.canonical_key(given) if given not in (None, "") else table.next_key()
+            if table.has_key(key):
+                raise OverrideError(f"{catalog} row {key} already exists", 409)
+            row = table.normalize(key, record)
+            self._apply(catalog, key, row, user)
+            return key, row
+
+    def inventory(self, catalog) -> bytes:
+        """Every live row of "schemes" or "jobs", admin changes included, as a JSON array."""
+        return self._live_table(catalog).inventory_json()
+
+    def update_record(self, catalog, key, record: dict, user=None):
+        """Replace the row with this key by record. Returns (canonical key, stored row)."""
+        with self._reload_lock:
+            table = self._live_table(catalog)
+            key = table.canonical_key(key)
+            if not table.has_key(key):
+                raise OverrideError(f"No {catalog} row {key}", 404)
+            row = table.normalize(key, record)
+            self._apply(catalog, key, row, user)
+            return key, row
+
+    def retire_record(self, catalog, key, user=None):
+        """Stop recommending the row with this key. Returns the canonical key."""
+        with self._reload_lock:
+            table = self._live_table(catalog)
+            key = table.canonical_key(key)
+            if not table.has_key(key):
+                raise OverrideError(f"No {catalog} row {key}", 404)
+            self._apply(catalog, key, None, user)
+            return key
+
+    def start_watcher(self, interval):
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    print(f"Catalog watcher error: {e}")
+
+        threading.Thread(target=watch, name="catalog-watcher", daemon=True).start()
+
+    def stop_watcher(self):
+        self._stop_watching.set()
+
+    def close(self):
+        """Stop the watcher and any shard workers."""
+        self.stop_watcher()
+        if self.data.job_shards is not None:
+            self.data.job_shards.close()
+
+    def stats(self) -> dict:
+        skill_gap = self.data.skill_gap
+        shards = self.data.job_shards
+        return {
+            "catalog_version": self.version,
+            "load_seconds": round(self.load_seconds, 4) if self.load_seconds is not None else None,
+            "loaded_from": self.loaded_from,
+            "ranking": self.ranking,
+            # Shard workers, channels and channel wait, None when scoring in-process
+            "job_shards": shards.stats() if shards is not None else None,
+            "overrides": {
+                name: {
+                    "changed": sum(r is not None for r in entries.values()),
+                    "retired": sum(r is None for r in entries.values())
+                }
+                for name, entries in self.overrides.items()
+            },
+            # Rows appended by admin changes since the last load
+            "delta_rows": {
+                name: len(table.rows) for name, table in (("schemes", self.data.schemes), ("jobs", self.data.jobs))
+                if table is not None
+            },
+            "result_cache": self.result_cache.stats(),
+            "skill_gap_cache": skill_gap.analyze.cache_info()._asdict() if skill_gap is not None else None
+        }
 
     def get_recommendations(self, user_profile: dict):
         """
@@ -50,221 +1137,182 @@ class RecommendationEngine:
             "location": str
         }
         """
-        if self.schemes_df is None or self.jobs_df is None:
+        # Hold one snapshot for the whole request, a reload may swap it meanwhile
+        data = self.data
+        if data.schemes is None or data.jobs is None:
             return {"schemes": [], "jobs": []}
 
-        occupation = user_profile.get("occupation", "").lower()
-        skills = [s.strip().lower() for s in user_profile.get("skills", "").split(",") if s.strip()]
-        interests = [i.strip().lower() for i in user_profile.get("interest", "").split(",") if i.strip()]
-        
+        (scheme_order, scheme_scores), (job_order, job_scores) = self._rank(data, user_profile)
+        return {
+            "schemes": [data.schemes.record(i, score) for i, score in zip(scheme_order, scheme_scores)],
+            "jobs": [data.jobs.record(i, score) for i, score in zip(job_order, job_scores)]
+        }
+
+    def get_recommendations_json(self, user_profile: dict) -> bytes:
+        """
+        Same result as get_recommendations, already encoded as JSON.
+        Built by joining the per-row fragments encoded at load time.
+        """
+        data = self.data
+        if data.schemes is None or data.jobs is None:
+            return b'{"schemes":[],"jobs":[]}'
+
+        (scheme_order, scheme_scores), (job_order, job_scores) = self._rank(data, user_profile)
+        return b"".join([
+            b'{"schemes":[',
+            _join_fragments(data.schemes.fragments, scheme_order, scheme_scores),
+            b'],"jobs":[',
+            _join_fragments(data.jobs.fragments, job_order, job_scores),
+            b']}'
+        ])
+
+    def get_recommendations_page(self, user_profile: dict, limit=RESULT_LIMIT, cursor=None, fields=None) -> bytes:
+        """
+        One page of the ranking as JSON: {"schemes", "jobs", "next_cursor"}.
+
+        Both lists are sliced at the same offset. next_cursor resumes after
+        this page and is null once both lists are exhausted. fields keeps only
+        the named columns (plus "match_score" if listed) in each row. Raises
+        CursorError for a bad or stale cursor.
+        """
+        data = self.data
+        key = profile_key(user_profile)
+        offset = decode_cursor(cursor, data.catalog_id, key) if cursor else 0
+        if data.schemes is None or data.jobs is None:
+            return b'{"schemes":[],"jobs":[],"next_cursor":null}'
+
+        (scheme_order, scheme_scores), (job_order, job_scores) = self._rank(data, user_profile)
+        end = offset + limit
+        next_cursor = encode_cursor(data.catalog_id, key, end) if end < max(len(scheme_order), len(job_order)) else None
+
+        page = []
+        for table, order, scores in ((data.schemes, scheme_order, scheme_scores), (data.jobs, job_order, job_scores)):
+            order, scores = order[offset:end], scores[offset:end]
+            if fields is None:
+                page.append(_join_fragments(table.fragments, order, scores))
+            else:
+                page.append(_join_projected(table, order, scores, fields))
+        return b"".join([
+            b'{"schemes":[', page[0], b'],"jobs":[', page[1],
+            b'],"next_cursor":', encode_json(next_cursor), b'}'
+        ])
+
+    def _rank(self, data, user_profile: dict):
+        """
+        ((scheme rows, their scores), (job rows, their scores)), best first.
+        Cached per catalog version on the canonical profile.
+        """
+        key = profile_key(user_profile)
+        cache_key = (data.version, key)
+        ranking = self.result_cache.get(cache_key)
+        if ranking is not None:
+            return ranking
+
+        scheme_weights, job_weights, is_student = profile_terms(key)
+
         # --- Scheme Matching ---
-        # Keywords for occupation
-        occ_keywords = []
-        if "student" in occupation or "graduating" in occupation:
-            occ_keywords = ["scholarship", "education", "student", "learning", "skill", "training"]
-        elif "unemployed" in occupation:
-            occ_keywords = ["employment", "loan", "skill", "pension", "livelihood", "guarantee"]
-        elif "employed" in occupation:
-            occ_keywords = ["housing", "insurance", "pension", "tech", "finance"]
-        elif "farmer" in occupation or "agriculture" in occupation:
-            occ_keywords = ["farmer", "agriculture", "kisan", "crop", "loan", "irrigation", "rural"]
-        elif "business" in occupation:
-            occ_keywords = ["business", "loan", "msme", "startup", "credit", "entrepreneur"]
-        elif "retired" in occupation:
-             occ_keywords = ["pension", "senior", "health", "security"]
-        else:
-             # Default generic keywords if occupation is unknown/other
-             occ_keywords = ["citizen", "welfare", "scheme", "financial", "support"]
-
-        # Calculate Score
-        def calculate_score(text, keywords):
-            score = 0
-            for kw in keywords:
-                if kw in text:
-                    score += 1
-            return score
-
-        # Filter Schemes
-        scheme_results = []
-        for _, row in self.schemes_df.iterrows():
-            text = row['combined_text']
-            score = 0
-            
-            # Occupation match (High weight)
-            score += calculate_score(text, occ_keywords) * 2
-            
-            # Interest match
-            score += calculate_score(text, interests)
-            
-            if score > 0:
-                scheme = row.to_dict()
-                # Clean up nan values for JSON serialization
-                cleaned_scheme = {k: (v if pd.notna(v) else "") for k, v in scheme.items()}
-                # Remove internal column
-                if 'combined_text' in cleaned_scheme:
-                    del cleaned_scheme['combined_text']
-                cleaned_scheme['match_score'] = score
-                scheme_results.append(cleaned_scheme)
-        
-        # Sort by score desc
-        scheme_results.sort(key=lambda x: x['match_score'], reverse=True)
+        # Occupation match (High weight) + Interest match, as one matrix-vector product
+        scheme_scores = data.schemes.score(self.ranking, scheme_weights)
+
+        # Top 50 schemes with a positive score, best first (ties keep CSV order)
+        scheme_order = top_k(scheme_scores, RESULT_LIMIT, np.flatnonzero(scheme_scores > 0))
 
         # --- Job Matching ---
-        job_results = []
-        # Job keywords: Skills + Interests + Occupation
-        job_keywords = skills + interests
-        is_student = "student" in occupation or "graduating" in occupation or "fresher" in occupation
-
-        if is_student:
-             job_keywords += ["internship", "fresher", "entry", "scholarship", "training"]
-
-        # heuristic to identify popular/general portals if no specific match
-        # broadly known portals often have low IDs in this dataset (1-10) or specific names
-        major_portals = ["naukri", "indeed", "linkedin", "monster", "glassdoor", "shine"]
-
-        for _, row in self.jobs_df.iterrows():
-            text = row['combined_text']
-            score = 0
-            
+        # Large catalogs: every shard worker ranks its rows, the top 50s are merged
+        jobs_ranked = None
+        if data.job_shards is not None:
+            jobs_ranked = self._rank_sharded(data.jobs, data.job_shards, job_weights, is_student)
+
+        if jobs_ranked is None:
             # 1. Keyword Match
-            score += calculate_score(text, job_keywords)
-            
-            # 2. Occupation Context Boost
-            # If student, boost portals with 'fresher', 'intern', 'entry' in description
-            if is_student and any(k in text for k in ["fresher", "intern", "entry", "training"]):
-                score += 2
-
-            # 3. Popularity/Fallback Boost
-            # If keywords provided but no match found yet, we still want to show meaningful results.
-            # Give a small base score to major portals so they appear if nothing else matches specific skills.
-            if any(p in text for p in major_portals):
-                score += 0.5
-
-            # Always add the job, but sorting determines visibility
-            job = row.to_dict()
-            cleaned_job = {k: (v if pd.notna(v) else "") for k, v in job.items()}
-            if 'combined_text' in cleaned_job:
-                del cleaned_job['combined_text']
-            
-            cleaned_job['match_score'] = score
-            job_results.append(cleaned_job)
-
-        # Sort by score desc
-        job_results.sort(key=lambda x: x['match_score'], reverse=True)
+            job_scores = data.jobs.score(self.ranking, job_weights)
+            data.jobs.add_job_boosts(job_scores, is_student)
 
-        return {
-            "schemes": scheme_results[:50], 
-            "jobs": job_results[:50]
-        }
+            # Every job is ranked, only the top 50 are selected and returned
+            job_order = top_k(job_scores, RESULT_LIMIT, _live_rows(data.jobs, job_scores))
+            jobs_ranked = (job_order, job_scores[job_order])
+
+        ranking = ((scheme_order, scheme_scores[scheme_order]), jobs_ranked)
+        self.result_cache.set(cache_key, ranking)
+        return ranking
+
+    def _rank_sharded(self, jobs, shards, job_weights, is_student):
+        """
+        Top jobs from the shard workers, which score the base rows: asks for
+        enough extra rows to cover the retired ones, drops those, and merges
+        in the admin-added rows scored here. None if the pool is closed.
+        """
+        ranked = shards.score_top_k(job_weights, is_student, RESULT_LIMIT + len(jobs.retired))
+        if ranked is None or not jobs.has_delta:
+            return ranked
+        rows, scores = ranked
+        if jobs.retired:
+            keep = ~np.isin(rows, jobs._retired_rows)
+            rows, scores = rows[keep], scores[keep]
+        if jobs.rows:
+            extra = jobs.delta_score(self.ranking, job_weights)
+            student_boost, portal_boost = jobs.delta_boosts()
+            if is_student:
+                extra += student_boost
+            extra += portal_boost
+            live = np.flatnonzero(np.isfinite(extra))
+            rows = np.concatenate([rows, jobs.base_size + live])
+            scores = np.concatenate([scores, extra[live]])
+        order = np.lexsort((rows, -scores))[:RESULT_LIMIT]
+        return rows[order], scores[order]
+
+    def get_recommendations_batch(self, user_profiles):
+        """
+        Score many profiles and yield one NDJSON line (bytes) per profile, in
+        input order, each shaped like get_recommendations_json plus "index".
+        Profiles are scored a chunk at a time as one matrix product, with the
+        chunk sized so memory stays flat whatever the batch size.
+        """
+        data = self.data
+        profiles = iter(user_profiles)
+        index = 0
+
+        if data.schemes is None or data.jobs is None:
+            for _ in profiles:
+                yield b'{"index":%d,"schemes":[],"jobs":[]}\n' % index
+                index += 1
+            return
+
+        rows = max(data.schemes.size, data.jobs.size, 1)
+        chunk_size = max(1, min(BATCH_CHUNK_SIZE, BATCH_MAX_CELLS // rows))
+
+        while True:
+            chunk = list(itertools.islice(profiles, chunk_size))
+            if not chunk:
+                break
+            terms = [profile_terms(profile_key(p)) for p in chunk]
+
+            # (profiles x schemes) and (profiles x jobs) score matrices
+            scheme_scores = data.schemes.score_many(self.ranking, [t[0] for t in terms])
+            job_scores = data.jobs.score_many(self.ranking, [t[1] for t in terms])
+            data.jobs.add_job_boosts(job_scores, np.array([t[2] for t in terms]))
+
+            for s_scores, j_scores in zip(scheme_scores, job_scores):
+                scheme_order = top_k(s_scores, RESULT_LIMIT, np.flatnonzero(s_scores > 0))
+                job_order = top_k(j_scores, RESULT_LIMIT, _live_rows(data.jobs, j_scores))
+                yield b"".join([
+                    b'{"index":%d,"schemes":[' % index,
+                    _join_fragments(data.schemes.fragments, scheme_order, s_scores[scheme_order]),
+                    b'],"jobs":[',
+                    _join_fragments(data.jobs.fragments, job_order, j_scores[job_order]),
+                    b']}\n'
+                ])
+                index += 1
 
     def analyze_skill_gap(self, user_skills: list, target_role: str):
-        # Force reload data to ensure we have the latest CSV content
-        self.load_data()
-        
-        if self.jobs_df is None:
+        # Catalog changes are picked up by the file watcher, not on the request path
+        skill_gap = self.data.skill_gap
+        if skill_gap is None:
             return {"error": "Job data not loaded"}
 
         # 1. Normalize inputs
         target_role = target_role.lower().strip()
-        user_skills_set = set([s.lower().strip() for s in user_skills if s.strip()])
-        
-        # 2. Extract Keywords & Synonyms
-        import re
-        # Remove punctuation
-        clean_role = re.sub(r'[^\w\s]', ' ', target_role)
-        keywords = set(k for k in clean_role.split() if len(k) > 1) # simple length filter
-        
-        # Add basic synonyms common in tech
-        synonyms = {
-            "developer": "development",
-            "development": "developer",
-            "engineer": "engineering",
-            "engineering": "engineer",
-            "admin": "administration",
-            "administration": "admin",
-            "manager": "management",
-            "management": "manager",
-            "web": "website"
-        }
-        
-        expanded_keywords = set(keywords)
-        for k in keywords:
-            if k in synonyms:
-                expanded_keywords.add(synonyms[k])
-                
-        print(f"DEBUG: Target Role: '{target_role}'")
-        print(f"DEBUG: Search Keywords: {expanded_keywords}")
-
-        # 3. Search for Relevant Jobs (Portals)
-        # A row is relevant if ANY of its text columns contain ANY of the expanded keywords
-        
-        relevant_jobs = pd.DataFrame()
-        
-        if not self.jobs_df.empty:
-            mask = pd.Series([False] * len(self.jobs_df))
-            for kw in expanded_keywords:
-                # Check domains (e.g. "Web Development" matched by "Developer")
-                mask |= self.jobs_df['job_domains'].fillna('').str.lower().str.contains(kw, regex=False)
-                # Check skills (e.g. "Java" matched by "Java")
-                mask |= self.jobs_df['skill_requirements'].fillna('').str.lower().str.contains(kw, regex=False)
-                # Check values like "Google"
-                mask |= self.jobs_df['name'].fillna('').str.lower().str.contains(kw, regex=False)
-            
-            relevant_jobs = self.jobs_df[mask]
-        
-        print(f"DEBUG: Jobs/Portals Matched: {len(relevant_jobs)}")
-
-        if relevant_jobs.empty:
-            print("DEBUG: No relevant jobs found.")
-            return {
-                "role": target_role,
-                "missing_skills": [],
-                "matched_skills": [],
-                "score": 0,
-                "note": "No specific data found for this role."
-            }
-
-        # 4. Aggregate Required Skills
-        required_skills_set = set()
-        for skills_str in relevant_jobs['skill_requirements'].fillna(''):
-            # skills_str is like "Python,Java,C++"
-            skills = [s.strip().lower() for s in skills_str.split(',') if s.strip()]
-            required_skills_set.update(skills)
-            
-        print(f"DEBUG: Required Skills: {required_skills_set}")
-        
-        # 5. Calculate Gap
-        matched_skills = list(required_skills_set.intersection(user_skills_set))
-        
-        # Missing skills are those required but not in user's profile
-        missing_skills = list(required_skills_set - user_skills_set)
-        
-        missing_skills.sort()
-        matched_skills.sort()
-
-        # Calculate Score
-        total_required = len(required_skills_set)
-        score = int((len(matched_skills) / total_required * 100)) if total_required > 0 else 0
-        
-        # Cap results for UI
-        missing_skills_display = missing_skills[:12] # Top 12 missing
-
-        # Generate Links
-        missing_with_links = []
-        for skill in missing_skills_display:
-            query = f"learn {skill} course"
-            link = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-            course_link = f"https://www.classcentral.com/search?q={skill.replace(' ', '+')}"
-            
-            missing_with_links.append({
-                "name": skill.title(), 
-                "link": link,
-                "course_link": course_link
-            })
+        user_skills_set = frozenset(s.lower().strip() for s in user_skills if s.strip())
 
-        return {
-            "role": target_role,
-            "missing_skills": missing_with_links,
-            "matched_skills": [s.title() for s in matched_skills],
-            "score": score
-        }
+        # Memoized per catalog version on (role, skill set)
+        return skill_gap.analyze(target_role, user_skills_set)
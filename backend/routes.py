@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response, Query
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from auth import get_password_hash, verify_password, create_access_token, get_current_user
 from database import users_collection, reviews_collection, activity_collection, feedback_collection, chat_collection, schemes_collection, jobs_collection, applications_collection
 from models import Token, UserResponse, Feedback, Review, ChatMessage
@@ -8,7 +10,8 @@ from pydantic import BaseModel
 import shutil
 import shutil
 import os
-from recommendation_engine import RecommendationEngine
+from recommendation_engine import CursorError, OverrideError, RESULT_LIMIT
+from engine_registry import loaded_engine, engine_info
 
 router = APIRouter()
 
@@ -272,8 +275,25 @@ async def get_admin_activity(admin_user: dict = Depends(get_current_admin)):
     return logs
 
 # --- RECOMMENDATION ENGINE ---
+# Shared with the chat / WhatsApp path through engine_registry, built in the
+# background at startup (see app.py)
 
-recommendation_engine = RecommendationEngine()
+# Seconds clients are told to wait while the engine is still loading
+ENGINE_RETRY_AFTER = "5"
+
+# Most profiles one /recommend/batch request may carry; split larger jobs
+# across requests (each profile is parsed and held before scoring starts)
+BATCH_MAX_PROFILES = int(os.getenv("RECOMMEND_BATCH_MAX_PROFILES", "10000"))
+
+def ready_engine():
+    """The shared engine, or a 503 with Retry-After while it is still loading."""
+    engine = loaded_engine()
+    if engine is None:
+        raise HTTPException(
+            status_code=503, detail="Recommendation engine is loading, try again shortly",
+            headers={"Retry-After": ENGINE_RETRY_AFTER}
+        )
+    return engine
 
 class RecommendationRequest(BaseModel):
     occupation: str = ""
@@ -320,17 +340,18 @@ async def get_job_analytics(admin_user: dict = Depends(get_current_admin)):
 
     return [{"name": r["_id"], "value": r["count"]} for r in results]
 
+# Inventory is the engine's live catalog, admin changes included; each
+# table encodes its rows once. Lowercase column names, as everywhere else.
+async def inventory_response(catalog):
+    try:
+        content = await run_in_threadpool(ready_engine().inventory, catalog)
+    except OverrideError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
 @router.get("/admin/inventory/jobs")
 async def get_job_inventory(admin_user: dict = Depends(get_current_admin)):
-    import pandas as pd
-    CSV_PATH = os.path.join(os.path.dirname(__file__), 'data/job.csv')
-    try:
-        df = pd.read_csv(CSV_PATH)
-        df = df.fillna("")
-        return df.to_dict(orient='records')
-    except Exception as e:
-        print(f"Error reading jobs CSV: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load job inventory")
+    return await inventory_response("jobs")
 
 @router.get("/admin/analytics/usage")
 async def get_usage_analytics(admin_user: dict = Depends(get_current_admin)):
@@ -351,20 +372,86 @@ async def get_usage_analytics(admin_user: dict = Depends(get_current_admin)):
 
 @router.get("/admin/inventory/schemes")
 async def get_scheme_inventory(admin_user: dict = Depends(get_current_admin)):
-    import pandas as pd
-    CSV_PATH = os.path.join(os.path.dirname(__file__), '../scheme/schemes.csv')
-    try:
-        df = pd.read_csv(CSV_PATH)
-        # Fill NaN values with empty string for JSON compatibility
-        df = df.fillna("")
-        return df.to_dict(orient='records')
-    except Exception as e:
-        print(f"Error reading schemes CSV: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load scheme inventory")
+    return await inventory_response("schemes")
 
 @router.post("/recommend")
-async def get_recommendations(request: RecommendationRequest):
-    return recommendation_engine.get_recommendations(request.dict())
+async def get_recommendations(
+    request: RecommendationRequest,
+    limit: Optional[int] = Query(None, ge=1, le=RESULT_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    # Without limit / cursor / fields: the full top 50 of each list, as before.
+    # Response is assembled from pre-encoded row fragments, no per-request dict building
+    # Scoring runs in the threadpool so a large (or sharded) ranking never blocks the event loop
+    engine = ready_engine()
+    if limit is None and cursor is None and fields is None:
+        content = await run_in_threadpool(engine.get_recommendations_json, request.dict())
+    else:
+        # Paged: pass next_cursor back as ?cursor= (same profile) for the next page.
+        # fields=name,website,match_score keeps only those columns in each row
+        field_list = [f.strip().lower() for f in fields.split(",") if f.strip()] if fields else None
+        try:
+            content = await run_in_threadpool(
+                engine.get_recommendations_page, request.dict(), limit or RESULT_LIMIT, cursor, field_list
+            )
+        except CursorError as e:
+            raise HTTPException(status_code=410 if e.stale else 400, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
+@router.post("/recommend/batch")
+async def get_batch_recommendations(profiles: list[RecommendationRequest]):
+    # One NDJSON line per profile, in input order, streamed as each chunk is scored.
+    # The generator is sync so Starlette iterates it off the event loop.
+    if len(profiles) > BATCH_MAX_PROFILES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BATCH_MAX_PROFILES} profiles per batch, got {len(profiles)}"
+        )
+    return StreamingResponse(
+        ready_engine().get_recommendations_batch(p.dict() for p in profiles),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/admin/recommend/stats")
+async def get_recommendation_stats(admin_user: dict = Depends(get_current_admin)):
+    # Load time, memory footprint and cache hit/miss counters
+    return {**ready_engine().stats(), "engine": engine_info()}
+
+# --- Catalog admin: add / update / retire schemes and jobs ---
+# Changes are saved to Mongo and applied to the live indexes at once, no CSV edit or reload
+
+async def apply_catalog_change(change, *args):
+    try:
+        return await run_in_threadpool(change, *args)
+    except OverrideError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+def catalog_change_response(catalog, key, record):
+    return {
+        "status": "ok",
+        "catalog": catalog,
+        "key": key,
+        "catalog_version": ready_engine().version,
+        "record": record
+    }
+
+@router.post("/admin/catalog/{catalog}")
+async def add_catalog_record(catalog: str, record: dict, admin_user: dict = Depends(get_current_admin)):
+    # The key column (scheme_id / id) is assigned when the record doesn't set it
+    key, row = await apply_catalog_change(ready_engine().add_record, catalog, record, admin_user.get("email"))
+    return catalog_change_response(catalog, key, row)
+
+@router.put("/admin/catalog/{catalog}/{key}")
+async def update_catalog_record(catalog: str, key: str, record: dict, admin_user: dict = Depends(get_current_admin)):
+    # Replaces the whole row; columns left out become empty
+    key, row = await apply_catalog_change(ready_engine().update_record, catalog, key, record, admin_user.get("email"))
+    return catalog_change_response(catalog, key, row)
+
+@router.delete("/admin/catalog/{catalog}/{key}")
+async def retire_catalog_record(catalog: str, key: str, admin_user: dict = Depends(get_current_admin)):
+    key = await apply_catalog_change(ready_engine().retire_record, catalog, key, admin_user.get("email"))
+    return catalog_change_response(catalog, key, None)
 
 class SkillGapRequest(BaseModel):
     user_skills: list[str]
@@ -372,7 +459,7 @@ class SkillGapRequest(BaseModel):
 
 @router.post("/analyze-skill-gap")
 async def analyze_skill_gap(request: SkillGapRequest):
-    return recommendation_engine.analyze_skill_gap(request.user_skills, request.target_role)
+    return ready_engine().analyze_skill_gap(request.user_skills, request.target_role)
 
 
 # --- MOCK INTERVIEW BOT ---
@@ -0,0 +1,207 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import numpy as np
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from catalog_snapshot import StringColumn, pack_strings
+from keyword_index import KeywordIndex
+
+# 64-byte alignment for every array in the shared block
+ALIGN = 64
+
+# Requests the workers take at once, each over its own pipe to every worker;
+# more wait for a free channel (reported as channel_wait_ms in stats())
+SHARD_CHANNELS = int(os.getenv("RECOMMEND_SHARD_CHANNELS", "4"))
+
+def _views(buf, layout):
+    return {
+        name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=offset)
+        for name, (dtype, shape, offset) in layout.items()
+    }
+
+def _shard_main(conns, shm_name, layout, vocabulary, start, stop):
+    """
+    Worker process owning rows [start, stop) of the job catalog. Its texts
+    and vocabulary columns are read from the shared block; free-form term
+    columns are built and cached here, so each worker only ever scans its
+    own shard. Requests arrive on any of conns, one per channel, and each
+    answer goes back on the pipe its request came in on.
+    """
+    from recommendation_engine import job_boosts, top_k
+
+    # Spawned children share the parent's resource tracker, which unlinks
+    # the block only if the parent never does
+    shm = SharedMemory(name=shm_name)
+    arrays = _views(shm.buf, layout)
+    blob, offsets = arrays["blob"], arrays["offsets"]
+    # The shard's texts stay encoded in the shared block
+    texts = StringColumn(blob[offsets[start]:offsets[stop]], offsets[start:stop + 1] - offsets[start])
+    pinned = {term: arrays["pinned"][j, start:stop] for j, term in enumerate(vocabulary)}
+    index = KeywordIndex(texts, pinned=pinned)
+    student_boost, portal_boost = job_boosts(index)
+    conns[0].send("ready")
+
+    running = True
+    while running:
+        for conn in wait(conns):
+            try:
+                request = conn.recv()
+            except EOFError:
+                request = None
+            if request is None:
+                running = False
+                break
+            weights, is_student, k = request
+            scores = index.score(weights)
+            if is_student:
+                scores += student_boost
+            scores += portal_boost
+            order = top_k(scores, k)
+            conn.send((order + start, scores[order]))
+
+    del index, pinned, texts, blob, offsets, arrays
+    shm.close()
+
+class ShardPool:
+    """
+    Job scoring split across worker processes, one contiguous shard of rows
+    each.
+
+    The combined texts and vocabulary hit columns are copied once into a
+    shared memory block that every worker maps, so a request only sends the
+    profile's keyword weights. Each worker returns its local top k and the
+    shards are merged here; since the global top k is always contained in
+    the union of the local ones, and ties still break by row order, the
+    result is identical to scoring in one process.
+
+    A request takes one channel (a pipe to every worker) for its round
+    trip, so up to `channels` requests are in flight at once, each worker
+    taking them in arrival order.
+    """
+
+    def __init__(self, index: KeywordIndex, workers, channels=SHARD_CHANNELS):
+        terms, matrix = index.pinned_matrix()
+        texts = index.texts
+        if hasattr(texts, "blob"):
+            # Mapped from a snapshot: already packed
+            blob, offsets = texts.blob, texts.offsets
+        else:
+            blob, offsets = pack_strings(texts)
+        arrays = {"blob": blob, "offsets": offsets, "pinned": matrix}
+
+        layout = {}
+        size = 0
+        for name, arr in arrays.items():
+            layout[name] = (arr.dtype.str, arr.shape, size)
+            size += -(-arr.nbytes // ALIGN) * ALIGN
+        self.shm = SharedMemory(create=True, size=max(size, 1))
+        for name, view in _views(self.shm.buf, layout).items():
+            view[...] = arrays[name]
+            del view
+
+        self.channels = max(1, channels)
+        # Free channels; None once the pool is closed
+        self._free = queue.Queue()
+        self._close_lock = threading.Lock()
+        self.closed = False
+        # Parent ends of every pipe, a list of channels per worker
+        self.conns = []
+        self.processes = []
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        # spawn, not fork: the parent runs threads (watcher, server)
+        ctx = multiprocessing.get_context("spawn")
+        bounds = np.linspace(0, index.size, workers + 1).astype(int)
+        try:
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                pipes = [ctx.Pipe() for _ in range(self.channels)]
+                process = ctx.Process(
+                    target=_shard_main, name=f"job-shard-{start}",
+                    args=([child for _, child in pipes], self.shm.name, layout, terms, int(start), int(stop)),
+                    daemon=True
+                )
+                process.start()
+                self.conns.append([parent for parent, _ in pipes])
+                self.processes.append(process)
+            for conns in self.conns:
+                conns[0].recv()
+        except BaseException:
+            self.closed = True
+            self._shutdown()
+            raise
+        for c in range(self.channels):
+            self._free.put([conns[c] for conns in self.conns])
+        atexit.register(self.close)
+
+    def score_top_k(self, weights: dict, is_student, k):
+        """(rows, scores) of the k best jobs, best first, or None once the pool is closed."""
+        started = time.perf_counter()
+        channel = self._free.get()
+        waited = time.perf_counter() - started
+        if channel is None:
+            # Closed: pass the marker on to the next waiting request
+            self._free.put(None)
+            return None
+        try:
+            for conn in channel:
+                conn.send((weights, is_student, k))
+            parts = [conn.recv() for conn in channel]
+        except (EOFError, OSError) as e:
+            print(f"Job shard worker failed, scoring in-process from now on: {e}")
+            self._free.put(channel)
+            self.close()
+            return None
+        self._free.put(channel)
+        with self._stats_lock:
+            self.requests += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        rows = np.concatenate([p[0] for p in parts])
+        scores = np.concatenate([p[1] for p in parts])
+        order = np.lexsort((rows, -scores))[:k]
+        return rows[order], scores[order]
+
+    def close(self):
+        """Stop the workers and free the shared block; waits for in-flight requests."""
+        with self._close_lock:
+            if self.closed:
+                return
+            self.closed = True
+            # Holding every channel means no request is using the workers
+            for _ in range(self.channels):
+                self._free.get()
+            self._shutdown()
+            self._free.put(None)
+
+    def _shutdown(self):
+        for conns in self.conns:
+            try:
+                conns[0].send(None)
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.shm.close()
+        self.shm.unlink()
+
+    def stats(self) -> dict:
+        """Workers, channels, and how long requests waited for a free channel."""
+        with self._stats_lock:
+            return {
+                "workers": 0 if self.closed else len(self.processes),
+                "channels": self.channels,
+                "requests": self.requests,
+                "channel_wait_ms": {
+                    "mean": round(self._wait_total / self.requests * 1000, 3) if self.requests else 0.0,
+                    "max": round(self._wait_max * 1000, 3)
+                }
+            }
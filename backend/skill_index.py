@@ -0,0 +1,324 @@
+import copy
+import re
+from functools import cached_property, lru_cache
+import numpy as np
+from fuzzy_index import SymSpellIndex
+
+# Add basic synonyms common in tech
+ROLE_SYNONYMS = {
+    "developer": "development",
+    "development": "developer",
+    "engineer": "engineering",
+    "engineering": "engineer",
+    "admin": "administration",
+    "administration": "admin",
+    "manager": "management",
+    "management": "manager",
+    "web": "website"
+}
+
+# Columns a role keyword is searched in
+ROLE_COLUMNS = ['job_domains', 'skill_requirements', 'name']
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Shorter role tokens / skills are never offered as corrections
+MIN_CORRECTION_LENGTH = 3
+
+# A user skill or role word is only corrected to the one catalog word a
+# single edit away: a real word the catalog doesn't list ("coaching") is
+# usually two edits from some other one ("teaching")
+SKILL_CORRECTION_DISTANCE = 1
+ROLE_CORRECTION_DISTANCE = 1
+
+def role_keywords(target_role: str, correct=None):
+    """
+    Keywords (plus synonyms) searched for a normalized target role.
+    correct, if given, maps each keyword to its spelling-corrected form
+    before synonyms are added.
+    """
+    # Remove punctuation
+    clean_role = re.sub(r'[^\w\s]', ' ', target_role)
+    keywords = set(k for k in clean_role.split() if len(k) > 1) # simple length filter
+    if correct is not None:
+        keywords = set(map(correct, keywords))
+
+    expanded_keywords = set(keywords)
+    for k in keywords:
+        if k in ROLE_SYNONYMS:
+            expanded_keywords.add(ROLE_SYNONYMS[k])
+    return expanded_keywords
+
+def with_corrections(result, corrections):
+    # Only present when something was corrected, so other responses don't change
+    if corrections:
+        result["corrections"] = corrections
+    return result
+
+def _offsets(groups):
+    """CSR offsets (int64, len(groups) + 1) for a sequence of lists."""
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    np.cumsum([len(g) for g in groups], out=offsets[1:])
+    return offsets
+
+def parse_skills(skills_str: str):
+    # skills_str is like "Python,Java,C++"
+    return frozenset(s.strip().lower() for s in skills_str.split(',') if s.strip())
+
+class SkillGapIndex:
+    """
+    Inverted index from role tokens to job rows, with each row's required
+    skills already parsed.
+
+    Keywords are made of word characters only, so "keyword is a substring of
+    the column text" is the same as "keyword is a substring of one of the
+    column's word tokens". Lookups therefore only scan the token vocabulary,
+    never the rows.
+
+    Postings and per-row skills are kept as CSR arrays (a flat array of row /
+    skill ids plus offsets), so a compiled snapshot can map them directly.
+    """
+
+    def __init__(self, jobs, cache_size=1024):
+        size = len(jobs)
+        # Domain / skill strings repeat across rows, so tokenize and parse
+        # each distinct value once
+        token_sets = {}
+        def tokens(value):
+            found = token_sets.get(value)
+            if found is None:
+                found = token_sets[value] = frozenset(TOKEN_RE.findall(value.lower()))
+            return found
+
+        postings = {}
+        columns = [jobs.text(col) if col in jobs.columns else [''] * size for col in ROLE_COLUMNS]
+        for row, values in enumerate(zip(*columns)):
+            for token in frozenset().union(*map(tokens, values)):
+                postings.setdefault(token, []).append(row)
+
+        parsed = {}
+        skill_ids = {}
+        skill_column = jobs.text('skill_requirements') if 'skill_requirements' in jobs.columns else [''] * size
+        row_skills = [
+            parsed[v] if v in parsed else parsed.setdefault(v, [skill_ids.setdefault(s, len(skill_ids)) for s in parse_skills(v)])
+            for v in skill_column
+        ]
+
+        self._setup(
+            size,
+            list(postings),
+            _offsets(postings.values()),
+            np.fromiter((row for rows in postings.values() for row in rows), dtype=np.int32),
+            list(skill_ids),
+            _offsets(row_skills),
+            np.fromiter((j for ids in row_skills for j in ids), dtype=np.int32),
+            cache_size
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays, name, tokens, skills, cache_size=1024):
+        """Rebuild from the arrays written by to_arrays (e.g. mapped from a snapshot)."""
+        index = cls.__new__(cls)
+        skill_ptr = arrays[f"{name}.skill_ptr"]
+        index._setup(
+            len(skill_ptr) - 1, list(tokens), arrays[f"{name}.token_ptr"], arrays[f"{name}.token_rows"],
+            list(skills), skill_ptr, arrays[f"{name}.skill_ids"], cache_size
+        )
+        return index
+
+    def to_arrays(self, arrays, name):
+        """Add this index's arrays to `arrays`; returns (tokens, skills) to store alongside."""
+        arrays[f"{name}.token_ptr"] = self.token_ptr
+        arrays[f"{name}.token_rows"] = self.token_row_ids
+        arrays[f"{name}.skill_ptr"] = self.skill_ptr
+        arrays[f"{name}.skill_ids"] = self.skill_ids
+        return self.tokens, self.skills
+
+    def _setup(self, size, tokens, token_ptr, token_row_ids, skills, skill_ptr, skill_ids, cache_size):
+        self.size = size
+        self.cache_size = cache_size
+        # Rows retired and rows added since the index was built (see derive)
+        self.retired = np.zeros(0, dtype=np.int64)
+        self.extra = []
+        self.tokens = tokens
+        self.token_ptr = token_ptr
+        self.token_row_ids = token_row_ids
+        self.skills = skills
+        self.skill_ptr = skill_ptr
+        self.skill_ids = skill_ids
+        # Row of every entry in skill_ids
+        self.skill_row = np.repeat(np.arange(size, dtype=np.int32), np.diff(skill_ptr))
+
+        self.skill_set = frozenset(skills)
+
+        self._reset_caches()
+
+    def _reset_caches(self):
+        # Both caches belong to this catalog version and go away with it on reload
+        self.rows_for = lru_cache(maxsize=self.cache_size * 4)(self._rows_for)
+        self.analyze = lru_cache(maxsize=self.cache_size)(self._analyze)
+
+    def derive(self, retire=None, record=None):
+        """
+        Copy sharing this index's arrays with one job row changed: row
+        `retire` (a base row or an added one) dropped, and `record` (a
+        column -> value dict) appended as row size + len(extra). Only that
+        record is parsed, whatever the catalog or the number of changes.
+        """
+        index = copy.copy(self)
+        if retire is not None:
+            index.retired = np.append(self.retired, retire)
+        if record is not None:
+            index.extra = self.extra + [(
+                frozenset().union(*(TOKEN_RE.findall(str(record.get(col) or '').lower()) for col in ROLE_COLUMNS)),
+                parse_skills(str(record.get('skill_requirements') or ''))
+            )]
+        index._reset_caches()
+        return index
+
+    # Spellers are built on the first lookup that needs one, so loading a
+    # snapshot stays fast; a concurrent first build just builds it twice
+
+    @cached_property
+    def role_speller(self):
+        """
+        Corrects role keywords against the alphabetic role tokens, weighted
+        by row count, plus the synonym words (which expand to tokens).
+        """
+        words = dict.fromkeys(ROLE_SYNONYMS, 0)
+        words.update(
+            (token, rows) for token, rows in zip(self.tokens, np.diff(self.token_ptr).tolist())
+            if token.isalpha() and len(token) >= MIN_CORRECTION_LENGTH
+        )
+        return SymSpellIndex(words)
+
+    @cached_property
+    def skill_speller(self):
+        """Corrects user skills against the required-skill vocabulary, weighted by row count."""
+        counts = np.bincount(self.skill_ids, minlength=len(self.skills)).tolist()
+        return SymSpellIndex({
+            skill: count for skill, count in zip(self.skills, counts) if len(skill) >= MIN_CORRECTION_LENGTH
+        })
+
+    def correct_keyword(self, keyword, corrections):
+        """
+        keyword, or if it matches no row its correction (recorded in
+        corrections): the only role word within ROLE_CORRECTION_DISTANCE
+        edits, if there is exactly one.
+        """
+        if len(self.rows_for(keyword)):
+            return keyword
+        fixed = self.role_speller.lookup(keyword, ROLE_CORRECTION_DISTANCE, unique=True)
+        if fixed is None or fixed == keyword:
+            return keyword
+        corrections[keyword] = fixed
+        return fixed
+
+    def correct_skills(self, skills, corrections):
+        """
+        skills with unknown ones replaced by their correction (recorded in
+        corrections, which the response reports): the only catalog skill
+        within SKILL_CORRECTION_DISTANCE edits, if there is exactly one.
+        """
+        fixed_skills = set()
+        for skill in skills:
+            if skill not in self.skill_set:
+                fixed = self.skill_speller.lookup(skill, SKILL_CORRECTION_DISTANCE, unique=True)
+                if fixed is not None:
+                    corrections[skill] = fixed
+                    skill = fixed
+            fixed_skills.add(skill)
+        return frozenset(fixed_skills)
+
+    def _rows_for(self, keyword: str):
+        # Postings are sliced only for the tokens that match
+        ptr = self.token_ptr
+        parts = [self.token_row_ids[ptr[j]:ptr[j + 1]] for j, token in enumerate(self.tokens) if keyword in token]
+        rows = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int32)
+        extra = [self.size + j for j, (tokens, _) in enumerate(self.extra) if any(keyword in t for t in tokens)]
+        if extra:
+            rows = np.concatenate([rows, np.array(extra, dtype=rows.dtype)])
+        if len(self.retired):
+            rows = np.setdiff1d(rows, self.retired, assume_unique=True)
+        return rows
+
+    def required_skills(self, keywords):
+        """(number of matched rows, union of their required skills)."""
+        parts = [self.rows_for(kw) for kw in keywords]
+        rows = np.unique(np.concatenate(parts)) if parts else ()
+        if not len(rows):
+            return 0, set()
+        base_rows = rows[rows < self.size]
+        selected = np.zeros(self.size, dtype=bool)
+        selected[base_rows] = True
+        ids = np.unique(self.skill_ids[selected[self.skill_row]])
+        required = {self.skills[j] for j in ids.tolist()}
+        for row in rows[len(base_rows):].tolist():
+            required |= self.extra[row - self.size][1]
+        return len(rows), required
+
+    def _analyze(self, target_role: str, user_skills_set: frozenset):
+        # 2. Extract Keywords & Synonyms, fixing typos ("deveeoper") that match nothing
+        corrections = {}
+        expanded_keywords = role_keywords(target_role, lambda k: self.correct_keyword(k, corrections))
+        user_skills_set = self.correct_skills(user_skills_set, corrections)
+
+        print(f"DEBUG: Target Role: '{target_role}'")
+        print(f"DEBUG: Search Keywords: {expanded_keywords}")
+        if corrections:
+            print(f"DEBUG: Spelling Corrections: {corrections}")
+
+        # 3. Search for Relevant Jobs (Portals)
+        # A row is relevant if ANY of its text columns contain ANY of the expanded keywords
+        matched_rows, required_skills_set = self.required_skills(expanded_keywords)
+
+        print(f"DEBUG: Jobs/Portals Matched: {matched_rows}")
+
+        if not matched_rows:
+            print("DEBUG: No relevant jobs found.")
+            return with_corrections({
+                "role": target_role,
+                "missing_skills": [],
+                "matched_skills": [],
+                "score": 0,
+                "note": "No specific data found for this role."
+            }, corrections)
+
+        # 4. Required Skills were aggregated from the pre-parsed rows
+        print(f"DEBUG: Required Skills: {required_skills_set}")
+
+        # 5. Calculate Gap
+        matched_skills = list(required_skills_set.intersection(user_skills_set))
+
+        # Missing skills are those required but not in user's profile
+        missing_skills = list(required_skills_set - user_skills_set)
+
+        missing_skills.sort()
+        matched_skills.sort()
+
+        # Calculate Score
+        total_required = len(required_skills_set)
+        score = int((len(matched_skills) / total_required * 100)) if total_required > 0 else 0
+
+        # Cap results for UI
+        missing_skills_display = missing_skills[:12] # Top 12 missing
+
+        # Generate Links
+        missing_with_links = []
+        for skill in missing_skills_display:
+            query = f"learn {skill} course"
+            link = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
+            course_link = f"https://www.classcentral.com/search?q={skill.replace(' ', '+')}"
+
+            missing_with_links.append({
+                "name": skill.title(),
+                "link": link,
+                "course_link": course_link
+            })
+
+        return with_corrections({
+            "role": target_role,
+            "missing_skills": missing_with_links,
+            "matched_skills": [s.title() for s in matched_skills],
+            "score": score
+        }, corrections)
@@ -0,0 +1,55 @@
+"""
+Checks POST /recommend/batch through the FastAPI router: one NDJSON line
+per profile in input order, each matching /recommend for that profile,
+and 413 above RECOMMEND_BATCH_MAX_PROFILES.
+
+Usage: python test_batch_route.py
+"""
+import json
+import os
+import sys
+import tempfile
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+import engine_registry
+import routes
+from recommendation_engine import RecommendationEngine
+
+def test_batch_route():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 2000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 500, seed=1)
+        engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False)
+        app = FastAPI()
+        app.include_router(routes.router)
+        client = TestClient(app)
+        previous, engine_registry._engine = engine_registry._engine, engine
+        try:
+            # More profiles than one scoring chunk, with repeats
+            profiles = synthetic_catalog.recommendation_profiles(300, seed=2, distinct=40)
+            response = client.post("/recommend/batch", json=profiles)
+            assert response.status_code == 200, response.text
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert [line.pop("index") for line in lines] == list(range(len(profiles)))
+            for line, profile in zip(lines, profiles):
+                single = client.post("/recommend", json=profile)
+                assert line == single.json(), profile
+            print(f"batch: {len(profiles)} NDJSON lines in order, each equal to /recommend")
+
+            limit, routes.BATCH_MAX_PROFILES = routes.BATCH_MAX_PROFILES, 10
+            try:
+                assert client.post("/recommend/batch", json=profiles[:10]).status_code == 200
+                assert client.post("/recommend/batch", json=profiles[:11]).status_code == 413
+            finally:
+                routes.BATCH_MAX_PROFILES = limit
+            print("batch: 413 above the profile limit")
+        finally:
+            engine_registry._engine = previous
+            engine.close()
+
+if __name__ == "__main__":
+    test_batch_route()
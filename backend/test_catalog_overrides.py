@@ -0,0 +1,179 @@
+"""
+Checks admin catalog changes (add, update, retire) on a synthetic catalog
+(benchmarks/synthetic_catalog.py) in a temp directory: rankings with the
+changes applied, the same catalog after a restart, on another worker, and
+on top of a snapshot compiled before some of them, and in the admin
+inventory.
+
+Usage: python test_catalog_overrides.py
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+from recommendation_engine import OverrideError, RecommendationEngine
+
+class MemoryStore:
+    """In-memory stand-in for catalog_overrides.MongoOverrideStore."""
+
+    def __init__(self):
+        self.docs = {}
+        self.saves = 0
+
+    def load(self):
+        overrides = {}
+        for (catalog, key), (_, record) in sorted(self.docs.items(), key=lambda item: item[1][0]):
+            overrides.setdefault(catalog, {})[key] = record
+        return overrides
+
+    def save(self, catalog, key, record, user=None):
+        self.saves += 1
+        self.docs[(catalog, key)] = (self.saves, json.loads(json.dumps(record)))
+
+    def delete(self, catalog, key):
+        self.saves += 1
+        del self.docs[(catalog, key)]
+
+    def stamp(self):
+        return self.saves
+
+def quiet(fn, *args):
+    # The skill gap analysis prints DEBUG lines
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+def check_override_replay(data_dir, profiles):
+    store = MemoryStore()
+    engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store)
+    key, _ = engine.add_record("jobs", {"name": "Zyxwv intern naukri", "skill_requirements": "zyxwv, sql"})
+    engine.update_record("jobs", "1", {"name": "Qwvut developer fresher", "skill_requirements": "python"})
+    engine.retire_record("jobs", "2")
+    engine.retire_record("schemes", "3")
+    engine.update_record("jobs", key, {"name": "Zyxwv developer naukri", "skill_requirements": "zyxwv"})
+
+    jobs = engine.get_recommendations({"occupation": "", "skills": "zyxwv, qwvut", "interest": ""})["jobs"]
+    # 1 for the skill, 0.5 more for the naukri portal
+    assert [(r["id"], r["name"]) for r in jobs[:2]] == [(int(key), "Zyxwv developer naukri"), (1, "Qwvut developer fresher")]
+    assert "Zyxwv intern naukri" not in {r["name"] for r in jobs}
+    for profile in profiles:
+        result = engine.get_recommendations(profile)
+        assert all(r["id"] != 2 for r in result["jobs"]) and all(r["scheme_id"] != 3 for r in result["schemes"])
+
+    # A restart folds the stored changes into the loaded tables
+    restarted = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store)
+    assert restarted.stats()["delta_rows"] == {"schemes": 0, "jobs": 0}
+    assert restarted.data.catalog_id == engine.data.catalog_id
+    for profile in profiles:
+        assert restarted.get_recommendations(profile) == engine.get_recommendations(profile), profile
+    gap = ({"python"}, "zyxwv developer")
+    assert quiet(restarted.analyze_skill_gap, *gap) == quiet(engine.analyze_skill_gap, *gap)
+
+    # Another worker's engine picks the same changes up without a reload
+    engine.retire_record("jobs", "1")
+    assert restarted.reload_if_changed()
+    assert restarted.data.catalog_id == engine.data.catalog_id
+    for profile in profiles:
+        assert restarted.get_recommendations(profile) == engine.get_recommendations(profile), profile
+    print(f"overrides: {store.saves} changes survive a restart and reach other workers")
+
+def check_snapshot_replay(data_dir, profiles):
+    store = MemoryStore()
+    engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store)
+    engine.update_record("jobs", "4", {"name": "Qwvut analyst", "skill_requirements": "sql"})
+    engine.retire_record("schemes", "5")
+    # Compiled like compile_catalog.py does: the stored changes folded in
+    RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store).write_snapshot()
+
+    # Changes stored after the snapshot was compiled go on top of it as delta rows
+    key, _ = engine.add_record("jobs", {"name": "Zyxwv tester naukri", "skill_requirements": "zyxwv"})
+    engine.update_record("jobs", "4", {"name": "Qwvut lead analyst", "skill_requirements": "sql, excel"})
+    engine.retire_record("jobs", "6")
+    started = RecommendationEngine(data_dir, watch_interval=0, store=store)
+    assert started.loaded_from == "snapshot", started.loaded_from
+    assert started.stats()["delta_rows"] == {"schemes": 0, "jobs": 2}
+    assert started.data.catalog_id == engine.data.catalog_id
+    for profile in profiles + [{"occupation": "", "skills": "zyxwv, qwvut", "interest": ""}]:
+        assert started.get_recommendations(profile) == engine.get_recommendations(profile), profile
+    gap = ({"sql"}, "qwvut analyst")
+    assert quiet(started.analyze_skill_gap, *gap) == quiet(engine.analyze_skill_gap, *gap)
+
+    # A change the snapshot folded in, deleted from the store: only the CSVs can undo it
+    store.delete("schemes", "5")
+    assert RecommendationEngine(data_dir, watch_interval=0, store=store).loaded_from == "csv"
+    os.remove(engine.snapshot_path)
+    print(f"overrides: {len(store.docs)} stored changes replayed on a snapshot compiled before some of them")
+
+def check_canonical_keys(data_dir):
+    store = MemoryStore()
+    engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store)
+    # "007" is row 7 of the numeric id column, not a new key
+    try:
+        engine.add_record("jobs", {"id": "007", "name": "Duplicate"})
+        raise AssertionError("duplicate key accepted")
+    except OverrideError as e:
+        assert e.status_code == 409, e
+    key, row = engine.add_record("jobs", {"id": " 090001 ", "name": "Zyxwv welder"})
+    assert key == "90001" and row["id"] == 90001
+    assert engine.update_record("jobs", "090001", {"name": "Zyxwv senior welder"})[0] == "90001"
+    assert engine.retire_record("jobs", "0008") == "8"
+    assert set(engine.overrides["jobs"]) == {"90001", "8"}
+
+    # A change stored under another spelling before keys were canonical
+    store.save("jobs", "09", {"id": "09", "name": "Qwvut fitter"})
+    restarted = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store)
+    jobs = restarted.data.jobs
+    ids = list(jobs.base.frame.values("id"))
+    assert ids.count(9) == 1 and ids.count(90001) == 1 and 8 not in ids
+    assert jobs.record(jobs.locate("9"), 0)["name"] == "Qwvut fitter"
+    assert engine.refresh_overrides() and not engine.refresh_overrides()
+    assert engine.data.catalog_id == restarted.data.catalog_id
+    print("overrides: keys typed like the key column, one row per key")
+
+def check_inventory(data_dir):
+    store = MemoryStore()
+    engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store)
+    before = json.loads(engine.inventory("jobs"))
+    key, _ = engine.add_record("jobs", {"name": "Zyxwv tester", "skill_requirements": "zyxwv"})
+    engine.update_record("jobs", "4", {"name": "Qwvut analyst"})
+    engine.retire_record("jobs", "6")
+    engine.retire_record("schemes", "5")
+
+    jobs = {row["id"]: row for row in json.loads(engine.inventory("jobs"))}
+    assert len(jobs) == len(before) and 6 not in jobs
+    assert jobs[int(key)]["name"] == "Zyxwv tester" and jobs[4]["name"] == "Qwvut analyst"
+    assert jobs[4]["description"] == "" and set(jobs[4]) == set(before[0])
+    assert 5 not in {row["scheme_id"] for row in json.loads(engine.inventory("schemes"))}
+
+    # Same rows when the changes are folded in on load, from the CSVs or a snapshot
+    by_id = lambda rows: sorted(rows, key=lambda row: row["id"])
+    restarted = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, store=store)
+    restarted.write_snapshot()
+    started = RecommendationEngine(data_dir, watch_interval=0, store=store)
+    assert started.loaded_from == "snapshot", started.loaded_from
+    for other in (restarted, started):
+        assert by_id(json.loads(other.inventory("jobs"))) == by_id(jobs.values())
+    try:
+        engine.inventory("users")
+        raise AssertionError("unknown catalog served")
+    except OverrideError as e:
+        assert e.status_code == 404, e
+    os.remove(engine.snapshot_path)
+    print(f"overrides: inventory of {len(jobs)} live jobs, admin changes included")
+
+def test_catalog_overrides():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 3000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 1000, seed=1)
+        profiles = synthetic_catalog.recommendation_profiles(40, seed=1, distinct=40)
+        check_override_replay(data_dir, profiles)
+        check_snapshot_replay(data_dir, profiles)
+        check_canonical_keys(data_dir)
+        check_inventory(data_dir)
+
+if __name__ == "__main__":
+    test_catalog_overrides()
@@ -0,0 +1,73 @@
+"""
+Checks the compiled catalog snapshot: an engine mapped from it ranks,
+pages and analyzes skill gaps exactly like one parsed from the CSVs, its
+texts stay encoded, and a mapped string column finds the same rows as a
+substring scan.
+
+Usage: python test_catalog_snapshot.py
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+from catalog_snapshot import StringColumn, pack_strings
+from recommendation_engine import RecommendationEngine
+
+def quiet(fn, *args):
+    # The skill gap analysis prints DEBUG lines
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+def test_rows_containing():
+    rng = random.Random(4)
+    values = ["".join(rng.choice("ab é") for _ in range(rng.randint(0, 8))) for _ in range(500)]
+    column = StringColumn(*pack_strings(values))
+    assert list(column) == values
+    # Short terms match across value boundaries in the blob; those must not count
+    for term in ["a", "ab", "ba b", "é", "éa", "abab", "", "zz"]:
+        expected = [i for i, value in enumerate(values) if term in value]
+        assert column.rows_containing(term).tolist() == expected, term
+    print("StringColumn: blob search matches a per-value substring scan")
+
+def test_snapshot():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 3000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 1000, seed=1)
+        profiles = synthetic_catalog.recommendation_profiles(40, seed=1, distinct=40)
+        gap_requests = synthetic_catalog.skill_gap_requests(20, seed=1, distinct=20)
+
+        csv_engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False)
+        csv_engine.write_snapshot()
+        engine = RecommendationEngine(data_dir, watch_interval=0)
+        assert engine.loaded_from == "snapshot", engine.loaded_from
+        assert isinstance(engine.data.jobs.base.index.texts, StringColumn)
+        assert csv_engine.mapped_bytes == 0 and engine.mapped_bytes > 0
+        for profile in profiles:
+            assert engine.get_recommendations_json(profile) == csv_engine.get_recommendations_json(profile), profile
+            page = engine.get_recommendations_page(profile, 7, None, ["name", "match_score"])
+            assert page == csv_engine.get_recommendations_page(profile, 7, None, ["name", "match_score"])
+        for skills, role in gap_requests:
+            assert quiet(engine.analyze_skill_gap, skills, role) == quiet(csv_engine.analyze_skill_gap, skills, role)
+        assert np.array_equal(
+            engine.data.jobs.base.index.score({"python": 1, "sql": 2}),
+            csv_engine.data.jobs.base.index.score({"python": 1, "sql": 2})
+        )
+        print(f"snapshot: same rankings and skill gaps as the CSVs, {engine.mapped_bytes} bytes mapped")
+
+        # A changed CSV makes the snapshot stale
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 3000, seed=2)
+        stale = RecommendationEngine(data_dir, watch_interval=0)
+        assert stale.loaded_from == "csv"
+        print("snapshot: ignored once a CSV changes")
+        for e in (csv_engine, engine, stale):
+            e.close()
+
+if __name__ == "__main__":
+    test_rows_containing()
+    test_snapshot()
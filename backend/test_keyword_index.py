@@ -0,0 +1,87 @@
+"""
+Checks the keyword hit-matrix scoring against the old per-row loop, both
+for the index alone and for whole recommendation rankings, on a synthetic
+catalog (benchmarks/synthetic_catalog.py) in a temp directory.
+
+Usage: python test_keyword_index.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+from keyword_index import MATCHER_MIN_TERMS, KeywordIndex
+from recommendation_engine import (
+    MAJOR_PORTALS, RESULT_LIMIT, STUDENT_BOOST_KEYWORDS, RecommendationEngine, profile_key, profile_terms
+)
+
+def reference_scores(texts, weights):
+    """The old per-row loop: every keyword's weight for each row whose text contains it."""
+    scores = []
+    for text in texts:
+        score = 0
+        for term, weight in weights.items():
+            if term in text:
+                score += weight
+        scores.append(score)
+    return scores
+
+def reference_ranking(data, user_profile):
+    """(scheme rows, job rows) with their scores, ranked by the old loop."""
+    scheme_weights, job_weights, is_student = profile_terms(profile_key(user_profile))
+    scheme_texts = list(data.schemes.base.index.texts)
+    scheme_scores = reference_scores(scheme_texts, scheme_weights)
+    schemes = [i for i in sorted(range(len(scheme_scores)), key=lambda i: -scheme_scores[i]) if scheme_scores[i] > 0]
+
+    job_texts = list(data.jobs.base.index.texts)
+    job_scores = reference_scores(job_texts, job_weights)
+    for i, text in enumerate(job_texts):
+        if is_student and any(kw in text for kw in STUDENT_BOOST_KEYWORDS):
+            job_scores[i] += 2
+        if any(portal in text for portal in MAJOR_PORTALS):
+            job_scores[i] += 0.5
+    jobs = sorted(range(len(job_scores)), key=lambda i: -job_scores[i])
+    return (
+        [(i, scheme_scores[i]) for i in schemes[:RESULT_LIMIT]],
+        [(i, job_scores[i]) for i in jobs[:RESULT_LIMIT]]
+    )
+
+def check_keyword_index(texts):
+    rng = random.Random(1)
+    words = sorted({w for text in texts for w in text.split()})
+    index = KeywordIndex(texts)
+    # Below and above MATCHER_MIN_TERMS: per-term scan, then the Aho-Corasick matcher
+    for count in (5, MATCHER_MIN_TERMS + 8):
+        weights = {w: rng.choice([1, 2, 0.5]) for w in rng.sample(words, min(count, len(words)))}
+        assert np.allclose(index.score(weights), reference_scores(texts, weights)), count
+        many = index.score_many([weights, {}])
+        assert np.allclose(many[0], reference_scores(texts, weights)) and not many[1].any(), count
+    print(f"keyword index: {len(texts)} rows match the per-row loop")
+
+def check_recommendations(engine, profiles):
+    data = engine.data
+    for profile in profiles:
+        schemes, jobs = reference_ranking(data, profile)
+        result = engine.get_recommendations(profile)
+        got_schemes = [(r["scheme_id"], r["match_score"]) for r in result["schemes"]]
+        got_jobs = [(r["id"], r["match_score"]) for r in result["jobs"]]
+        assert got_schemes == [(data.schemes.base.frame.value("scheme_id", i), s) for i, s in schemes], profile
+        assert got_jobs == [(data.jobs.base.frame.value("id", i), s) for i, s in jobs], profile
+        assert json.loads(engine.get_recommendations_json(profile)) == json.loads(json.dumps(result, default=str))
+    print(f"recommendations: {len(profiles)} profiles match the per-row loop")
+
+def test_keyword_index():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 3000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 1000, seed=1)
+        engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False)
+        check_keyword_index(list(engine.data.jobs.base.index.texts))
+        check_recommendations(engine, synthetic_catalog.recommendation_profiles(40, seed=1, distinct=40))
+        engine.close()
+
+if __name__ == "__main__":
+    test_keyword_index()
@@ -0,0 +1,29 @@
+"""
+Checks the Aho-Corasick keyword matcher against `kw in text` per keyword,
+on overlapping keywords, repeats and the empty keyword.
+
+Usage: python test_keyword_matcher.py
+"""
+import random
+from keyword_matcher import KeywordMatcher, get_matcher
+
+def test_find_matches_substring_checks():
+    rng = random.Random(3)
+    # Small alphabet so keywords overlap and share suffixes
+    keywords = ["".join(rng.choice("abcd ") for _ in range(rng.randint(1, 5))) for _ in range(60)]
+    keywords += ["he", "she", "his", "hers", ""]
+    matcher = KeywordMatcher(keywords)
+    texts = ["".join(rng.choice("abcd ") for _ in range(rng.randint(0, 40))) for _ in range(300)]
+    texts += ["ushers", "ahishers", ""]
+    for text in texts:
+        assert matcher.find(text) == {kw for kw in keywords if kw in text}, text
+    assert matcher.count("ushers", ["she", "he", "he", "his"]) == 3
+    print(f"matcher: {len(texts)} texts match the per-keyword scan")
+
+def test_get_matcher_is_cached():
+    assert get_matcher(["python", "java"]) is get_matcher(("java", "python", "java"))
+    print("matcher: one compiled automaton per keyword set")
+
+if __name__ == "__main__":
+    test_find_matches_substring_checks()
+    test_get_matcher_is_cached()
@@ -0,0 +1,63 @@
+"""
+Checks cursor pagination and field projection: concatenated pages equal
+the full ranking, projected rows keep only the requested fields, and a
+cursor is refused for another profile or after the catalog changes.
+
+Usage: python test_pagination.py
+"""
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+from recommendation_engine import CursorError, RecommendationEngine
+
+def check_pages(engine, profiles):
+    for profile in profiles:
+        full = json.loads(engine.get_recommendations_json(profile))
+        schemes, jobs, cursor = [], [], None
+        while True:
+            page = json.loads(engine.get_recommendations_page(profile, 7, cursor))
+            schemes += page["schemes"]
+            jobs += page["jobs"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert (schemes, jobs) == (full["schemes"], full["jobs"]), profile
+
+        page = json.loads(engine.get_recommendations_page(profile, 5, None, ["name", "match_score"]))
+        assert page["jobs"] == [{"name": r["name"], "match_score": r["match_score"]} for r in full["jobs"][:5]]
+    print(f"pages: {len(profiles)} profiles, concatenated pages equal the full list")
+
+def check_cursor_errors(engine, profiles):
+    first, other = profiles[0], profiles[1]
+    cursor = json.loads(engine.get_recommendations_page(first, 7))["next_cursor"]
+    for bad, stale in ((lambda: engine.get_recommendations_page(other, 7, cursor), False),
+                       (lambda: engine.get_recommendations_page(first, 7, "not-a-cursor"), False)):
+        try:
+            bad()
+            raise AssertionError("cursor accepted")
+        except CursorError as e:
+            assert e.stale == stale
+    engine.retire_record("jobs", "1")
+    try:
+        engine.get_recommendations_page(first, 7, cursor)
+        raise AssertionError("stale cursor accepted")
+    except CursorError as e:
+        assert e.stale
+    print("pages: cursors refused for another profile or a changed catalog")
+
+def test_pagination():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 2000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 500, seed=1)
+        profiles = synthetic_catalog.recommendation_profiles(10, seed=1, distinct=10)
+        engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False)
+        check_pages(engine, profiles)
+        check_cursor_errors(engine, profiles)
+        engine.close()
+
+if __name__ == "__main__":
+    test_pagination()
@@ -0,0 +1,58 @@
+"""
+Checks the recommendation result cache: TTL expiry, LRU eviction, hits
+for differently spelled copies of one profile, and invalidation when the
+catalog reloads.
+
+Usage: python test_result_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+from recommendation_engine import RecommendationEngine
+from ttl_cache import TTLCache
+
+def test_ttl_cache():
+    cache = TTLCache(maxsize=2, ttl=0.1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    # "b" is least recently used now
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    time.sleep(0.15)
+    assert cache.get("a", "expired") == "expired"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 2, 1), stats
+    assert stats["size"] == 1
+    assert TTLCache(maxsize=0).set("a", 1) is None
+    print("TTLCache: expiry, LRU eviction and counters")
+
+def test_result_cache():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 1000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 300, seed=1)
+        engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False)
+        profile = {"occupation": "Student", "skills": "python, sql", "interest": "education"}
+        first = engine.get_recommendations_json(profile)
+
+        # Same canonical profile: case, order, spacing and repeats don't matter
+        same = {"occupation": "student", "skills": " SQL,python,python ", "interest": "Education"}
+        assert engine.get_recommendations_json(same) == first
+        stats = engine.stats()["result_cache"]
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1), stats
+
+        # A reload drops the rankings of the old catalog
+        assert engine.load_data()
+        assert engine.stats()["result_cache"]["size"] == 0
+        assert engine.get_recommendations_json(profile) == first
+        assert engine.stats()["result_cache"]["misses"] == 2
+        print("result cache: canonical profile hits, cleared on reload")
+        engine.close()
+
+if __name__ == "__main__":
+    test_ttl_cache()
+    test_result_cache()
@@ -0,0 +1,55 @@
+"""
+Checks process-sharded job scoring: the same rankings as scoring in one
+process, from concurrent requests sharing the channels, and a fallback to
+in-process scoring once a worker dies.
+
+Usage: python test_sharded_scoring.py
+"""
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+import recommendation_engine
+from recommendation_engine import RecommendationEngine
+
+def test_sharded_scoring():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 5000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 500, seed=1)
+        profiles = synthetic_catalog.recommendation_profiles(60, seed=3, distinct=60)
+
+        local = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False)
+        min_rows, recommendation_engine.SHARD_MIN_ROWS = recommendation_engine.SHARD_MIN_ROWS, 1000
+        try:
+            sharded = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False, shard_workers=3)
+        finally:
+            recommendation_engine.SHARD_MIN_ROWS = min_rows
+        shards = sharded.data.job_shards
+        assert shards is not None and shards.stats()["workers"] == 3
+        expected = [local.get_recommendations(p) for p in profiles]
+
+        # More concurrent requests than channels, with result caching off so
+        # every request reaches the workers
+        sharded.result_cache.maxsize = 0
+        with ThreadPoolExecutor(max_workers=2 * shards.channels) as pool:
+            results = list(pool.map(sharded.get_recommendations, profiles))
+        assert results == expected
+        stats = sharded.stats()["job_shards"]
+        assert stats["requests"] == len(profiles), stats
+        print(f"shards: {len(profiles)} concurrent rankings match in-process scoring, "
+              f"channel wait max {stats['channel_wait_ms']['max']} ms")
+
+        # A dead worker closes the pool; requests carry on in-process
+        shards.processes[1].kill()
+        shards.processes[1].join()
+        assert [sharded.get_recommendations(p) for p in profiles[:10]] == expected[:10]
+        assert shards.closed and sharded.stats()["job_shards"]["workers"] == 0
+        print("shards: a dead worker falls back to in-process scoring")
+        local.close()
+        sharded.close()
+
+if __name__ == "__main__":
+    test_sharded_scoring()
@@ -0,0 +1,52 @@
+"""
+Checks spelling corrections in the skill gap analysis: one-edit typos in
+skills and role words are fixed, while words further off or equally
+close to several catalog words are left alone.
+
+Usage: python test_skill_corrections.py
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import synthetic_catalog
+from fuzzy_index import SymSpellIndex
+from recommendation_engine import RecommendationEngine
+
+def quiet(fn, *args):
+    # The skill gap analysis prints DEBUG lines
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+def test_speller():
+    speller = SymSpellIndex({"python": 9, "java": 5, "teaching": 4, "reaching": 3})
+    assert speller.lookup("pyhton") == "python"
+    assert speller.lookup("coaching") == "teaching"
+    assert speller.lookup("peaching", 1, unique=True) is None and speller.lookup("peaching") == "teaching"
+    assert speller.lookup("coaching", 1, unique=True) is None
+    assert speller.lookup("jav") is None
+    print("speller: bounded and unique lookups")
+
+def test_corrections():
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), 2000, seed=1)
+        synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), 300, seed=1)
+        engine = RecommendationEngine(data_dir, watch_interval=0, use_snapshot=False)
+
+        result = quiet(engine.analyze_skill_gap, ["pyhton", "coaching"], "software deveeoper")
+        corrections = result.get("corrections", {})
+        assert corrections == {"pyhton": "python", "deveeoper": "developer"}, corrections
+        assert "Python" in result["matched_skills"]
+
+        # Two edits from "teaching": a real role the catalog lacks, not a typo
+        result = quiet(engine.analyze_skill_gap, ["python"], "coaching")
+        assert "corrections" not in result, result.get("corrections")
+        print("corrections: one-edit typos fixed, distant or ambiguous words left alone")
+        engine.close()
+
+if __name__ == "__main__":
+    test_speller()
+    test_corrections()
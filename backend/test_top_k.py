@@ -0,0 +1,21 @@
+"""
+Checks the argpartition top-k selection against a stable full sort.
+
+Usage: python test_top_k.py
+"""
+import numpy as np
+from recommendation_engine import RESULT_LIMIT, top_k
+
+def test_top_k():
+    rng = np.random.default_rng(2)
+    for k in (1, 7, RESULT_LIMIT, 500):
+        # Few distinct scores, so ties have to break by row order
+        scores = rng.integers(0, 5, 300).astype(float)
+        candidates = np.flatnonzero(scores > 0)
+        expected = sorted(candidates.tolist(), key=lambda i: (-scores[i], i))[:k]
+        assert top_k(scores, k, candidates).tolist() == expected, k
+        assert top_k(scores, k).tolist() == sorted(range(300), key=lambda i: (-scores[i], i))[:k], k
+    print("top_k: matches a stable full sort")
+
+if __name__ == "__main__":
+    test_top_k()
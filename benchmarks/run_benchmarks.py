@@ -0,0 +1,357 @@
+"""
+Recommendation benchmark suite.
+
+For each catalog size, generates synthetic schemes.csv / job.csv (see
+synthetic_catalog.py) and runs every operation in a fresh subprocess, so
+peak RSS is measured per size. The operations are:
+
+- backend RecommendationEngine: CSV load, snapshot load,
+  get_recommendations, get_recommendations_json, a projected 6-row page,
+  batch scoring and analyze_skill_gap
+- scheme service (scheme/main.py): startup (import plus the warmup
+  phases: catalog, model, embeddings, index, dummy inference) and
+  the /recommend work (recommend_user, without the executor hop)
+
+Each operation runs in its own subprocess (the engine is loaded from the
+snapshot first) and reports p50 / p99 / mean / max latency in ms,
+sequential throughput, and memory: the RSS once set up (baseline_rss_mb),
+the peak RSS while the operation ran (peak_rss_mb; the whole process's
+peak where it can't be reset, see peak_rss_scope) and the difference
+(rss_increase_mb). The batch operation is timed as a whole, so it only
+reports throughput. Results are written as JSON so runs can be diffed or
+plotted.
+
+Runs offline: by default the scheme service gets the hashing stub in
+benchmarks/stubs instead of the real sentence-transformer (--encoder real
+uses the installed model).
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 100,10000,1000000 --requests 1000 --cold
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+SCHEME_DIR = os.path.join(ROOT_DIR, "scheme")
+STUB_DIR = os.path.join(BENCH_DIR, "stubs")
+
+sys.path.insert(0, BENCH_DIR)
+import synthetic_catalog
+
+DEFAULT_SIZES = "100,1000,10000,100000"
+
+# Calls made before timing starts, to fill lazily built structures
+WARMUP_CALLS = 5
+
+# --- Measurement ---
+
+def _proc_status_mb(field):
+    """A kB field of /proc/self/status (Linux) in MB, None elsewhere."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def rss_mb():
+    """Current resident set size of this process, None if the platform can't tell."""
+    rss = _proc_status_mb("VmRSS")
+    if rss is not None:
+        return rss
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+def reset_peak_rss():
+    """Restart the peak RSS count from the current RSS; False where the platform can't."""
+    try:
+        # Linux: "5" resets VmHWM
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """Peak resident set size of this process (since the last reset), None if the platform can't tell."""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KiB on Linux, bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+class MemoryWatch:
+    """RSS before an operation and the peak while it ran, for one subprocess per operation."""
+
+    def __init__(self):
+        gc.collect()
+        self.baseline = rss_mb()
+        self.scope = "operation" if reset_peak_rss() else "process"
+
+    def report(self):
+        peak = peak_rss_mb()
+        return {
+            "baseline_rss_mb": self.baseline,
+            "peak_rss_mb": peak,
+            "peak_rss_scope": self.scope,
+            "rss_increase_mb": round(peak - self.baseline, 1) if None not in (peak, self.baseline) else None
+        }
+
+def summarize(op, samples, wall=None):
+    ms = np.array(samples) * 1000
+    wall = wall if wall is not None else float(np.sum(samples))
+    return {
+        "op": op,
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "max_ms": round(float(ms.max()), 4),
+        "throughput_per_s": round(len(samples) / wall, 2) if wall > 0 else None
+    }
+
+def timed(op, fn, items, warmup=WARMUP_CALLS):
+    for item in items[:warmup]:
+        fn(item)
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return summarize(op, samples)
+
+def timed_once(op, fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, summarize(op, [time.perf_counter() - start])
+
+# --- Workers (one subprocess per operation) ---
+
+def load_engine(args, **kwargs):
+    sys.path.insert(0, BACKEND_DIR)
+    from recommendation_engine import RecommendationEngine
+    return RecommendationEngine(args.data, watch_interval=0, **kwargs)
+
+def engine_stats(engine):
+    stats = engine.stats()
+    return {"result_cache": stats["result_cache"], "skill_gap_cache": stats["skill_gap_cache"]}
+
+def engine_worker(args):
+    if args.op == "load_csv":
+        memory = MemoryWatch()
+        engine, result = timed_once("engine.load_csv", lambda: load_engine(args, use_snapshot=False))
+        result.update(memory.report())
+        # Mapped by every operation after this one
+        engine.write_snapshot()
+        return result
+    if args.op == "load_snapshot":
+        memory = MemoryWatch()
+        engine, result = timed_once("engine.load_snapshot", lambda: load_engine(args))
+        return {**result, **memory.report()}
+
+    engine = load_engine(args)
+    profiles = synthetic_catalog.recommendation_profiles(args.requests, args.seed)
+    if args.cold:
+        # Every call computes its ranking from scratch
+        engine.result_cache.maxsize = 0
+    memory = MemoryWatch()
+
+    if args.op == "get_recommendations":
+        result = timed("engine.get_recommendations", engine.get_recommendations, profiles)
+    elif args.op == "get_recommendations_json":
+        result = timed("engine.get_recommendations_json", engine.get_recommendations_json, profiles)
+    elif args.op == "get_recommendations_page":
+        result = timed(
+            "engine.get_recommendations_page(limit=6,fields)",
+            lambda p: engine.get_recommendations_page(p, 6, None, ["name", "scheme_name", "website", "match_score"]),
+            profiles
+        )
+    elif args.op == "get_recommendations_batch":
+        # Lines stream out of one call, so there are no per-profile latencies
+        start = time.perf_counter()
+        lines = sum(1 for _ in engine.get_recommendations_batch(profiles))
+        wall = time.perf_counter() - start
+        result = {
+            "op": "engine.get_recommendations_batch(per profile)",
+            "count": lines,
+            "mean_ms": round(wall / lines * 1000, 4) if lines else None,
+            "throughput_per_s": round(lines / wall, 2) if wall > 0 else None
+        }
+    elif args.op == "analyze_skill_gap":
+        gaps = synthetic_catalog.skill_gap_requests(args.requests, args.seed)
+        def analyze(gap):
+            if args.cold:
+                skill_gap = engine.data.skill_gap
+                skill_gap.analyze.cache_clear()
+                skill_gap.rows_for.cache_clear()
+            return engine.analyze_skill_gap(*gap)
+        # analyze_skill_gap prints debug lines, keep them out of the timings' output
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = timed("engine.analyze_skill_gap", analyze, gaps)
+    else:
+        raise ValueError(f"Unknown engine operation {args.op!r}")
+    return {**result, **memory.report(), "caches": engine_stats(engine)}
+
+def scheme_worker(args):
+    # main.py reads schemes.csv from the working directory
+    os.chdir(args.data)
+    sys.path.insert(0, SCHEME_DIR)
+    def startup():
+        main = __import__("main")
+        # The server warms up in the background; run the phases here instead
+        if not main.warmup.run():
+            raise RuntimeError(f"scheme warmup failed: {main.warmup.error}")
+        return main
+
+    if args.op == "startup":
+        memory = MemoryWatch()
+        main, result = timed_once("scheme.startup", startup)
+        result["phases"] = {p["name"]: p["seconds"] for p in main.warmup.status()["phases"]}
+        return {**result, **memory.report()}
+    if args.op != "recommend":
+        raise ValueError(f"Unknown scheme operation {args.op!r}")
+    main = startup()
+    users = [main.UserInput(**body) for body in synthetic_catalog.scheme_users(args.requests, args.seed)]
+    memory = MemoryWatch()
+    return {**timed("scheme.recommend", main.recommend_user, users), **memory.report()}
+
+WORKERS = {"engine": engine_worker, "scheme": scheme_worker}
+
+# Operations of each worker, in the order they run (load_csv writes the snapshot the others map)
+OPERATIONS = {
+    "engine": ["load_csv", "load_snapshot", "get_recommendations", "get_recommendations_json",
+               "get_recommendations_page", "get_recommendations_batch", "analyze_skill_gap"],
+    "scheme": ["startup", "recommend"]
+}
+
+# --- Driver ---
+
+def run_worker(kind, op, data_dir, args):
+    env = dict(os.environ)
+    if kind == "scheme" and args.encoder == "stub":
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [STUB_DIR, env.get("PYTHONPATH")]))
+    with tempfile.NamedTemporaryFile("r", suffix=".json", delete=False) as out:
+        result_path = out.name
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--worker", kind, "--op", op, "--data", data_dir,
+        "--requests", str(args.requests), "--seed", str(args.seed), "--result-file", result_path
+    ] + (["--cold"] if args.cold else [])
+    try:
+        proc = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            return {"op": f"{kind}.{op}", "error": proc.stderr.strip().splitlines()[-1:] or ["failed"]}
+        with open(result_path) as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+def print_table(runs):
+    print(f"{'rows':>8}  {'operation':<48} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'peak MB':>8} {'+MB':>7}")
+    for run in runs:
+        for r in run["results"]:
+            if "error" in r:
+                print(f"{run['rows']:>8}  {r['op']:<48} {r['error']}")
+                continue
+            # The batch row has throughput only
+            p50 = f"{r['p50_ms']:>10.3f}" if "p50_ms" in r else f"{'-':>10}"
+            p99 = f"{r['p99_ms']:>10.3f}" if "p99_ms" in r else f"{'-':>10}"
+            print(f"{run['rows']:>8}  {r['op']:<48} {p50} {p99} {r['throughput_per_s'] or 0:>10.1f} "
+                  f"{r['peak_rss_mb'] or 0:>8.1f} {r['rss_increase_mb'] or 0:>7.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation engines on synthetic catalogs")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated catalog row counts (up to 1000000)")
+    parser.add_argument("--requests", type=int, default=500, help="timed calls per operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cold", action="store_true", help="disable the result caches")
+    parser.add_argument("--encoder", choices=["stub", "real"], default="stub", help="sentence-transformer for scheme/main.py")
+    parser.add_argument("--targets", default="engine,scheme", help="comma separated: engine, scheme")
+    parser.add_argument("--output", help="results JSON path (default benchmarks/results/bench-<time>.json)")
+    # Internal: run one worker in this process
+    parser.add_argument("--worker", choices=list(WORKERS), help=argparse.SUPPRESS)
+    parser.add_argument("--op", help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        results = WORKERS[args.worker](args)
+        with open(args.result_file, "w") as f:
+            json.dump(results, f)
+        return
+
+    sizes = [int(float(s)) for s in args.sizes.split(",") if s.strip()]
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    runs = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{size}-") as data_dir:
+            start = time.perf_counter()
+            synthetic_catalog.write_jobs_csv(os.path.join(data_dir, "job.csv"), size, args.seed)
+            synthetic_catalog.write_schemes_csv(os.path.join(data_dir, "schemes.csv"), size, args.seed)
+            print(f"[{size} rows] catalogs generated in {time.perf_counter() - start:.1f}s")
+            results = []
+            for target in targets:
+                results += [run_worker(target, op, data_dir, args) for op in OPERATIONS[target]]
+            runs.append({"rows": size, "results": results})
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {k: getattr(args, k) for k in ("requests", "seed", "cold", "encoder", "targets")},
+        "runs": runs
+    }
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"bench-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_table(runs)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Offline stand-in for sentence_transformers used by the benchmarks.
+
+SentenceTransformer.encode hashes each word into one of 384 buckets (the
+all-MiniLM-L6-v2 width), so shapes, dtypes and the scoring code downstream
+behave as with the real model, without downloading it or running torch.
+Only put this on PYTHONPATH for benchmarks; the scores it gives are not
+meaningful.
+"""
+import zlib
+import numpy as np
+
+DIMENSIONS = 384
+
+class SentenceTransformer:
+    def __init__(self, model_name_or_path=None, device=None, **kwargs):
+        self.model_name = model_name_or_path
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSIONS
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in str(text).lower().split():
+                out[i, zlib.crc32(word.encode("utf-8")) % DIMENSIONS] += 1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.where(norms == 0, 1, norms)
+        return out[0] if single else out
@@ -0,0 +1,117 @@
+"""
+Synthetic scheme / job catalogs and request mixes for the benchmarks.
+
+Catalogs use the same columns as the real CSVs and draw their text from
+the keywords the engines score on, so hit rates look like production data.
+Everything is seeded, so a (size, seed) pair always produces the same files.
+"""
+import csv
+import random
+
+OCCUPATIONS = [
+    ("Student", 30), ("graduating student", 5), ("fresher", 5), ("unemployed", 15),
+    ("Employed", 15), ("farmer", 12), ("Business owner", 8), ("retired", 6), ("", 4)
+]
+SKILLS = [
+    "Python", "Java", "C++", "React", "Node.js", "SQL", "AWS", "Docker", "Excel", "Driving",
+    "Sales", "Figma", "Kubernetes", "Go", "Tally", "Accounting", "Teaching", "Nursing", "Welding", "Tailoring"
+]
+INTERESTS = [
+    "web", "data", "cloud", "ai", "loan", "health", "education", "agriculture", "startup",
+    "pension", "housing", "design", "marketing", "social work", "finance"
+]
+DOMAINS = [
+    "Web Development", "Software Engineering", "Data Science", "AI/ML", "Cloud", "Marketing",
+    "Administration", "Management", "Design", "Healthcare", "Agriculture", "Finance"
+]
+ROLES = [
+    "software developer", "web developer", "data scientist", "cloud engineer", "manager",
+    "full stack developer", "marketing executive", "nurse", "accountant", "designer"
+]
+JOB_WORDS = (
+    "python java web developer engineer data cloud ai ml fresher intern entry training naukri "
+    "indeed linkedin monster glassdoor shine social work driving design sales marketing admin "
+    "management react node sql remote hiring jobs portal careers graduate"
+).split()
+JOB_NAMES = ["Naukri", "Indeed", "LinkedIn", "Acme", "Shine", "TechCorp", "Internshala", "Monster", "Glassdoor", "Foo"]
+SCHEME_WORDS = (
+    "scholarship education student learning skill training employment loan pension livelihood "
+    "guarantee housing insurance tech finance farmer agriculture kisan crop irrigation rural "
+    "business msme startup credit entrepreneur senior health security citizen welfare scheme "
+    "financial support medical vidya women youth subsidy bank account"
+).split()
+SCHEME_TYPES = ["Government", "State", "Central", "Private", ""]
+NEEDS = [
+    "loan for crops", "scholarship for college", "health insurance", "pension after retirement",
+    "skill training", "housing support", "startup funding", "medical help"
+]
+
+def write_jobs_csv(path, size, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["ID", "Name", "Type", "Description", "Website", "Job_Domains", "Skill_Requirements"])
+        for i in range(1, size + 1):
+            desc = " ".join(rng.choice(JOB_WORDS) for _ in range(rng.randint(0, 14)))
+            w.writerow([
+                i, f"{rng.choice(JOB_NAMES)} {i}", rng.choice(["Portal", "Company", ""]), desc,
+                f"https://jobs{i}.example.com", ",".join(rng.sample(DOMAINS, rng.randint(0, 3))),
+                ",".join(rng.sample(SKILLS, rng.randint(0, 6)))
+            ])
+
+def write_schemes_csv(path, size, seed=0):
+    rng = random.Random(seed + 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["scheme_id", "scheme_name", "scheme_type", "description", "official_link"])
+        for i in range(1, size + 1):
+            name = " ".join(rng.choice(SCHEME_WORDS) for _ in range(rng.randint(1, 4))).title()
+            desc = " ".join(rng.choice(SCHEME_WORDS) for _ in range(rng.randint(4, 16)))
+            w.writerow([i, f"{name} Yojana {i}", rng.choice(SCHEME_TYPES), desc, f"https://scheme{i}.gov.in"])
+
+def _weighted(rng, pairs):
+    return rng.choices([v for v, _ in pairs], weights=[w for _, w in pairs])[0]
+
+def _zipf_stream(rng, pool, count):
+    """count draws from pool with Zipf-like popularity, like real repeat traffic."""
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    return rng.choices(pool, weights=weights, k=count)
+
+def recommendation_profiles(count, seed=0, distinct=None):
+    """Profiles for RecommendationEngine.get_recommendations; distinct bounds the pool of unique ones."""
+    rng = random.Random(seed + 2)
+    pool = [
+        {
+            "occupation": _weighted(rng, OCCUPATIONS),
+            "skills": ", ".join(rng.sample(SKILLS, rng.randint(0, 5))),
+            "qualification": "",
+            "interest": ",".join(rng.sample(INTERESTS, rng.randint(0, 3))),
+            "location": "India"
+        }
+        for _ in range(distinct or max(1, count // 4))
+    ]
+    return _zipf_stream(rng, pool, count)
+
+def skill_gap_requests(count, seed=0, distinct=None):
+    """(user_skills, target_role) pairs for RecommendationEngine.analyze_skill_gap."""
+    rng = random.Random(seed + 3)
+    pool = [
+        (rng.sample(SKILLS, rng.randint(0, 6)), rng.choice(ROLES))
+        for _ in range(distinct or max(1, count // 4))
+    ]
+    return _zipf_stream(rng, pool, count)
+
+def scheme_users(count, seed=0):
+    """Bodies for the scheme service's POST /recommend."""
+    rng = random.Random(seed + 4)
+    return [
+        {
+            "first_name": f"user{i}",
+            "age": rng.randint(16, 85),
+            "occupation": rng.choice(["farmer", "student", "senior", "health", "worker", "other"]),
+            "income": rng.randint(0, 1_000_000),
+            "health": rng.choice(["yes", "no"]),
+            "need": rng.choice(NEEDS)
+        }
+        for i in range(count)
+    ]
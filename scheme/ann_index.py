@@ -0,0 +1,144 @@
+# ======================================================
+# ann_index.py
+# Nearest-neighbour search over one block of normalized
+# embeddings: IVF (k-means inverted lists, numpy only)
+# for large blocks, exact search for small ones
+#
+# Build the scheme index and report recall:
+#     python ann_index.py [k]
+# ======================================================
+
+import os
+import sys
+import time
+import numpy as np
+
+# Blocks with fewer rows are searched exactly
+ANN_MIN_ROWS = int(os.getenv("SCHEME_ANN_MIN_ROWS", "20000"))
+# Inverted lists scanned per query: the recall / latency knob
+ANN_NPROBE = int(os.getenv("SCHEME_ANN_NPROBE", "8"))
+
+KMEANS_ITERATIONS = 10
+# k-means trains on at most this many rows per list
+KMEANS_SAMPLE_PER_LIST = 64
+# Rows scored per chunk while assigning, bounds the (rows x lists) matrix
+ASSIGN_CHUNK = 16384
+
+class ExactIndex:
+    """Every vector scored; the fallback for small blocks."""
+
+    kind = "exact"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def search(self, query, nprobe=None):
+        """(positions in the block, cosine scores)"""
+        return np.arange(len(self.vectors)), self.vectors @ query
+
+    def to_arrays(self, arrays, name):
+        pass
+
+class IVFIndex:
+    """
+    Inverted file index. The block's vectors are ordered by their
+    nearest k-means centroid, so every list is a contiguous slice; a query
+    scores the centroids, then only the vectors of the nprobe best lists.
+    nprobe >= the number of lists is an exact search.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, vectors, centroids, list_ptr):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_ptr = list_ptr
+
+    @staticmethod
+    def build(vectors, nlist=None, seed=0):
+        """(order, centroids, list_ptr): vectors[order] is the layout the index expects."""
+        n = len(vectors)
+        nlist = max(1, min(n, nlist or int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, min(n, nlist * KMEANS_SAMPLE_PER_LIST), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assign = _nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            # Empty lists restart from a random sample row
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            # Spherical k-means: centroids stay unit length, like the vectors
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = (sums / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+        assign = _nearest(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        list_ptr = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=list_ptr[1:])
+        return order, centroids, list_ptr
+
+    def search(self, query, nprobe=ANN_NPROBE):
+        nlist = len(self.centroids)
+        if nprobe >= nlist:
+            return np.arange(len(self.vectors)), self.vectors @ query
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        spans = [(self.list_ptr[j], self.list_ptr[j + 1]) for j in np.sort(probe)]
+        return (
+            np.concatenate([np.arange(start, stop) for start, stop in spans]),
+            np.concatenate([self.vectors[start:stop] @ query for start, stop in spans])
+        )
+
+    def to_arrays(self, arrays, name):
+        arrays[f"{name}.centroids"] = self.centroids
+        arrays[f"{name}.list_ptr"] = self.list_ptr
+
+    @classmethod
+    def from_arrays(cls, vectors, arrays, name):
+        return cls(vectors, arrays[f"{name}.centroids"], arrays[f"{name}.list_ptr"])
+
+def _nearest(vectors, centroids):
+    """Index of the highest-scoring centroid for each vector."""
+    return np.concatenate([
+        np.argmax(vectors[i:i + ASSIGN_CHUNK] @ centroids.T, axis=1)
+        for i in range(0, len(vectors), ASSIGN_CHUNK)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+def recall_at_k(index, queries, k, categories=None, **search_args):
+    """
+    Mean share of the exact top k (by cosine) that index.search also puts
+    in its top k, over the query vectors. search_args go to index.search.
+    """
+    found = []
+    for query in queries:
+        rows, scores = index.search(query, categories, **search_args)
+        exact_rows, exact_scores = index.search(query, categories, exact=True)
+        top = set(rows[np.argsort(-scores, kind="stable")[:k]].tolist())
+        truth = exact_rows[np.argsort(-exact_scores, kind="stable")[:k]].tolist()
+        if truth:
+            found.append(len(top.intersection(truth)) / len(truth))
+    return float(np.mean(found)) if found else 1.0
+
+if __name__ == "__main__":
+    # main's warmup loads the catalog and the embeddings, and builds and
+    # saves the index next to the embedding cache if it is missing or stale
+    import main
+
+    if not main.warmup.run():
+        sys.exit(f"Scheme warmup failed: {main.warmup.error}")
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    index = main.scheme_index
+    print(f"Scheme index: {len(index)} {index.dtype} rows, blocks: "
+          + ", ".join(f"{c}={s.kind}" for c, s in index.searchers.items()))
+    if index.quantization_recall is not None:
+        print(f"int8 recall@20 vs float32: {index.quantization_recall:.3f}")
+    queries = index.vectors[np.random.default_rng(0).choice(len(index), min(len(index), 200), replace=False)]
+    for nprobe in (1, 2, 4, 8, 16, 32, 64):
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, nprobe=nprobe)
+        elapsed = (time.perf_counter() - start) / max(len(queries), 1) * 1000
+        recall = recall_at_k(index, queries, k, nprobe=nprobe)
+        print(f"nprobe={nprobe:<3} recall@{k}={recall:.3f}  {elapsed:.3f} ms per query")
@@ -0,0 +1,87 @@
+# ======================================================
+# embedding_cache.py
+# Scheme embeddings cached on disk per model, keyed by a
+# hash of each row's text. Only new or changed rows are
+# encoded on start; the rest are mapped from the file.
+# ======================================================
+
+import hashlib
+import os
+import re
+import numpy as np
+from shared import catalog_snapshot
+
+# Bytes of blake2b digest kept per row
+HASH_SIZE = 16
+
+def cache_path_for(csv_path, model_name, kind="emb"):
+    """schemes.csv + all-MiniLM-L6-v2 -> schemes.all-MiniLM-L6-v2.emb.snap"""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return f"{os.path.splitext(csv_path)[0]}.{slug}.{kind}.snap"
+
+def text_hashes(texts):
+    """(rows, HASH_SIZE) uint8 content hash of each text."""
+    digests = b"".join(hashlib.blake2b(t.encode("utf-8"), digest_size=HASH_SIZE).digest() for t in texts)
+    return np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), HASH_SIZE)
+
+def embeddings_id(model_name, texts):
+    """Identifies the embeddings of texts under a model, for files derived from them."""
+    digest = hashlib.blake2b(text_hashes(list(texts)).tobytes(), digest_size=16).hexdigest()
+    return f"{model_name}:{digest}"
+
+def _read_cache(cache_path, model_name):
+    """(hashes, vectors) mapped from the cache file, or None if missing or for another model."""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        meta, arrays = catalog_snapshot.read_snapshot(cache_path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring embedding cache: {e}")
+        return None
+    if meta.get("model") != model_name:
+        return None
+    return arrays["hashes"], arrays["vectors"]
+
+def load_embeddings(model, model_name, texts, cache_path):
+    """
+    model.encode(texts) as a float32 matrix, one row per text.
+
+    Rows whose text hash is already in the cache are copied from it and
+    only the others are encoded, then the cache is rewritten. When every
+    row is cached in order the mapped file is returned as is, so all
+    workers on a node share its pages instead of holding a copy each.
+    """
+    texts = list(texts)
+    hashes = text_hashes(texts)
+    cached = _read_cache(cache_path, model_name)
+    if cached is not None and np.array_equal(cached[0], hashes):
+        return cached[1]
+
+    known = {}
+    if cached is not None:
+        known = {row.tobytes(): i for i, row in enumerate(cached[0])}
+    reuse = [known.get(row.tobytes()) for row in hashes]
+    missing = [i for i, j in enumerate(reuse) if j is None]
+
+    print(f"Encoding {len(missing)} of {len(texts)} scheme texts ({len(texts) - len(missing)} cached)")
+    encoded = np.asarray(model.encode([texts[i] for i in missing]), dtype=np.float32) if missing else None
+    if encoded is not None:
+        dim = encoded.shape[1]
+    elif cached is not None:
+        dim = cached[1].shape[1]
+    else:
+        dim = model.get_sentence_embedding_dimension()
+
+    vectors = np.empty((len(texts), dim), dtype=np.float32)
+    if missing:
+        vectors[missing] = encoded
+    have = [i for i, j in enumerate(reuse) if j is not None]
+    if have:
+        vectors[have] = cached[1][[reuse[i] for i in have]]
+
+    try:
+        catalog_snapshot.write_snapshot(cache_path, {"hashes": hashes, "vectors": vectors}, {"model": model_name})
+        return _read_cache(cache_path, model_name)[1]
+    except OSError as e:
+        print(f"Could not write embedding cache, keeping embeddings in memory: {e}")
+        return vectors
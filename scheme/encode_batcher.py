@@ -0,0 +1,103 @@
+# ======================================================
+# encode_batcher.py
+# Micro-batching for transformer encodes: texts from
+# concurrent requests are gathered for a few ms (or up to
+# a batch size) and encoded with one model.encode call
+# ======================================================
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+BATCH_MAX_SIZE = int(os.getenv("SCHEME_BATCH_MAX_SIZE", "32"))
+# How long the first text of a batch waits for others to join it
+BATCH_MAX_WAIT_MS = float(os.getenv("SCHEME_BATCH_MAX_WAIT_MS", "2"))
+
+class EncodeBatcher:
+    """
+    One background thread owns the model's encode calls. encode(text)
+    queues the text and blocks until its batch has been encoded; the
+    thread takes the first waiting text, collects more for up to max_wait
+    seconds or until max_batch are queued, encodes the distinct texts in
+    one call and hands each caller its own row. While a batch is encoding
+    new texts keep queueing, so under load batches fill without waiting.
+
+    The wait only applies while requests are arriving together (the last
+    batch held several texts): a lone request is encoded straight away.
+    """
+
+    def __init__(self, encode, max_batch=BATCH_MAX_SIZE, max_wait=BATCH_MAX_WAIT_MS / 1000):
+        self._encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.largest_batch = 0
+        self._last_batch_size = 0
+        self._thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, text: str):
+        """Embedding of one text (1-D float32)."""
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        # Idle traffic: don't make a single request wait for company
+        wait = self.max_wait if self._last_batch_size > 1 else 0
+        deadline = time.monotonic() + wait
+        while len(batch) < self.max_batch:
+            try:
+                # Take whatever is already queued, then wait out the window
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._last_batch_size = len(batch)
+            # Same text from several requests is encoded once
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = np.asarray(self._encode(texts), dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            rows = {text: vectors[i] for i, text in enumerate(texts)}
+            for text, future in batch:
+                future.set_result(rows[text].copy())
+            with self._lock:
+                self.batches += 1
+                self.texts += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "texts": self.texts,
+                "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "max_batch_size": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "queued": self._queue.qsize()
+            }
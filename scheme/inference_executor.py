@@ -0,0 +1,118 @@
+# ======================================================
+# inference_executor.py
+# Size-bounded executor for the recommendation work, with
+# a queue-depth limit (callers are turned away once it is
+# full) and queue-wait / run-time metrics
+# ======================================================
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+INFERENCE_WORKERS = int(os.getenv("SCHEME_INFERENCE_WORKERS", str(2 * (os.cpu_count() or 1))))
+# Requests allowed to wait for a worker; beyond that they are rejected
+INFERENCE_MAX_QUEUE = int(os.getenv("SCHEME_INFERENCE_MAX_QUEUE", "64"))
+# Samples kept for the latency percentiles
+LATENCY_WINDOW = 2048
+
+class Saturated(Exception):
+    """Every worker is busy and the queue is full."""
+
+class LatencyStats:
+    """Count and total of every sample, percentiles over the most recent ones."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        with self._lock:
+            self._recent.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = np.array(self._recent) * 1000
+            count, total = self.count, self.total
+        return {
+            "count": count,
+            "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(float(np.percentile(recent, 50)), 3) if len(recent) else 0.0,
+            "p99_ms": round(float(np.percentile(recent, 99)), 3) if len(recent) else 0.0,
+            "max_ms": round(float(recent.max()), 3) if len(recent) else 0.0
+        }
+
+class BoundedExecutor:
+    """
+    A fixed pool of worker threads plus at most max_queue waiting calls.
+    submit raises Saturated straight away when both are used up, so a
+    burst is shed with a fast error instead of piling up threads that
+    fight over the CPU and blow up tail latency.
+    """
+
+    def __init__(self, workers=INFERENCE_WORKERS, max_queue=INFERENCE_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+        self.run_time = LatencyStats()
+
+    def submit(self, fn, *args):
+        """concurrent.futures.Future of fn(*args); raises Saturated when full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise Saturated(f"{self.workers} workers busy and {self.max_queue} requests queued")
+        with self._lock:
+            self.in_flight += 1
+        queued = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            self.queue_wait.add(started - queued)
+            try:
+                return fn(*args)
+            finally:
+                self.run_time.add(time.perf_counter() - started)
+
+        try:
+            future = self._pool.submit(run)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn, *args):
+        """Await fn(*args) on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight, rejected = self.in_flight, self.rejected
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.workers),
+            "rejected": rejected,
+            "queue_wait": self.queue_wait.stats(),
+            "run_time": self.run_time.stats()
+        }
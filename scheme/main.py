@@ -8,22 +8,36 @@ import os
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-import pandas as pd
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from scheme_catalog import load_catalog
+from encode_batcher import EncodeBatcher
+from inference_executor import BoundedExecutor, Saturated
+from embedding_cache import cache_path_for, embeddings_id, load_embeddings
+from query_cache import QueryCache
+from vector_index import load_category_index
+from warmup import Warmup
 
 # ======================================================
 # FASTAPI APP INIT
 # ======================================================
 
+@asynccontextmanager
+async def lifespan(app):
+    # Bind right away; the catalog, model and embeddings load in the
+    # background and /ready reports when they are done
+    warmup.start()
+    yield
+
 app = FastAPI(
     title="AI Scheme Recommendation API",
     description="Hybrid AI using Transformer + Backpropagation with strict category filtering",
-    version="3.0"
+    version="3.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -37,59 +51,87 @@ app.add_middleware(
 # LOAD CSV DATASET (SAFE)
 # ======================================================
 
-df = pd.read_csv("schemes.csv", engine="python")
-df.columns = df.columns.str.strip().str.lower()
+# Set by the warmup phases below
+catalog = categories = scheme_texts = None
+model = scheme_embeddings = scheme_index = encode_batcher = None
 
-# Ensure required columns exist
-required_columns = [
+# Columns returned for each recommendation
+RESULT_COLUMNS = [
     "scheme_name",
     "description",
-    "eligibility",
     "benefits",
     "official_link"
 ]
 
-for col in required_columns:
-    if col not in df.columns:
-        df[col] = ""
+def load_catalog_phase():
+    global catalog, categories, scheme_texts
+    # Columnar catalog (no pandas on the serving path), column names normalized
+    # and required columns added; mapped from schemes.snap when it matches the CSV
+    catalog, categories = load_catalog("schemes.csv")
+
+    # Missing cells read as "nan", like the old astype(str), so texts and embeddings don't change
+    scheme_names = catalog.text("scheme_name", missing="nan")
+    descriptions = catalog.text("description", missing="nan")
+    benefits = catalog.text("benefits", missing="nan")
+    scheme_texts = [
+        f"{name}. {desc}. {benefit}"
+        for name, desc, benefit in zip(scheme_names, descriptions, benefits)
+    ]
 
 # ======================================================
-# RULE-BASED CATEGORY DETECTION
+# TRANSFORMER ENCODER (OFFLINE SAFE)
 # ======================================================
 
-def detect_category(text: str) -> str:
-    text = str(text).lower()
-    if "kisan" in text or "farmer" in text or "crop" in text or "agriculture" in text:
-        return "farmer"
-    elif "student" in text or "education" in text or "scholar" in text or "vidya" in text:
-        return "student"
-    elif "pension" in text or "senior" in text or "old age" in text:
-        return "senior"
-    elif "health" in text or "insurance" in text or "medical" in text:
-        return "health"
-    else:
-        return "general"
+MODEL_NAME = "all-MiniLM-L6-v2"
 
-# Use both name and description for better context
-df["text_context"] = df["scheme_name"].astype(str) + " " + df["description"].astype(str)
-df["category"] = df["text_context"].apply(detect_category)
+def load_model_phase():
+    global model, encode_batcher
+    # Imported here: torch alone takes seconds to import
+    from sentence_transformers import SentenceTransformer
 
-# ======================================================
-# TRANSFORMER ENCODER (OFFLINE SAFE)
-# ======================================================
+    model = SentenceTransformer(
+        MODEL_NAME,
+        device="cpu"
+    )
 
-model = SentenceTransformer(
-    "all-MiniLM-L6-v2",
-    device="cpu"
-)
+    # Cache misses from concurrent requests are encoded together, one
+    # model.encode call per micro-batch (SCHEME_BATCH_MAX_SIZE / _MAX_WAIT_MS)
+    encode_batcher = EncodeBatcher(model.encode)
+
+def load_embeddings_phase():
+    global scheme_embeddings
+    # Mapped from schemes.<model>.emb.snap; only rows whose text changed are re-encoded
+    scheme_embeddings = load_embeddings(model, MODEL_NAME, scheme_texts, cache_path_for("schemes.csv", MODEL_NAME))
+
+def load_index_phase():
+    global scheme_index
+    # Normalized once and grouped into one contiguous block per category,
+    # so a request's cosine similarity is a dot product over its blocks.
+    # Large categories are searched through an IVF index (SCHEME_ANN_MIN_ROWS,
+    # SCHEME_ANN_NPROBE), and SCHEME_EMBEDDING_DTYPE=int8 stores the vectors
+    # quantized; mapped from schemes.<model>.index.snap once built
+    scheme_index = load_category_index(
+        scheme_embeddings, categories, cache_path_for("schemes.csv", MODEL_NAME, "index"),
+        embeddings_id(MODEL_NAME, scheme_texts)
+    )
 
-df["text"] = (
-    df["scheme_name"].astype(str) + ". " +
-    df["description"].astype(str) + ". " +
-    df["benefits"].astype(str)
-)
+def dummy_inference_phase():
+    # One request through the whole path, so the first real one doesn't
+    # pay for lazy initialization inside the model and the index
+    recommend_user(UserInput(first_name="warmup", age=30, occupation="general", income=0, health="no", need="warmup"))
+
+# Query embeddings, cached on the normalized user text (SCHEME_QUERY_CACHE_SIZE,
+# SCHEME_QUERY_CACHE_TTL); encode_batcher is set by the model phase
+query_cache = QueryCache(lambda text: encode_batcher.encode(text))
 
-scheme_embeddings = model.encode(df["text"].tolist())
+# Recommendation work runs on its own bounded pool, not FastAPI's
+# threadpool; requests past SCHEME_INFERENCE_WORKERS running plus
+# SCHEME_INFERENCE_MAX_QUEUE waiting get a 503 right away
+inference_executor = BoundedExecutor()
+
+def encode_query(text: str):
+    """Embedding of one user text (1-D, read-only), encoded once per normalized text."""
+    return query_cache.encode(text)
 
 # ======================================================
 # BACKPROPAGATION (SIMULATED NEURAL NETWORK)
@@ -155,12 +197,42 @@ class UserInput(BaseModel):
 def root():
     return {"status": "AI Scheme Recommendation API running (FIXED)"}
 
+@app.get("/ready")
+def ready():
+    # Readiness probe: 200 once every warmup phase is done, 503 before
+    # (or if one failed), with each phase's status and timing
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+@app.get("/metrics")
+def metrics():
+    # Hit rate of the query embedding cache, to size it from real traffic,
+    # how full the encode micro-batches get, and queue wait / inference time
+    return {
+        "query_embedding_cache": query_cache.stats(),
+        "encode_batches": encode_batcher.stats() if encode_batcher is not None else None,
+        "inference": inference_executor.stats(),
+        "scheme_index": {
+            "rows": len(scheme_index),
+            "dtype": scheme_index.dtype,
+            "vector_bytes": scheme_index.vectors.nbytes,
+            "quantization_recall": scheme_index.quantization_recall
+        } if scheme_index is not None else None
+    }
+
 # ======================================================
 # MAIN RECOMMENDATION API (FIXED LOGIC)
 # ======================================================
 
 @app.post("/recommend")
-def recommend(user: UserInput):
+async def recommend(user: UserInput):
+    if not warmup.ready:
+        raise HTTPException(status_code=503, detail="Recommender is warming up", headers={"Retry-After": "5"})
+    try:
+        return await inference_executor.run(recommend_user, user)
+    except Saturated:
+        raise HTTPException(status_code=503, detail="Recommender is busy, retry shortly", headers={"Retry-After": "1"})
+
+def recommend_user(user: UserInput):
 
     occupation = user.occupation.lower()
     health = user.health.lower()
@@ -169,9 +241,9 @@ def recommend(user: UserInput):
     # 1. HARD CATEGORY FILTER  ✅ FIX
     # -------------------------------
     if occupation in ["farmer", "student", "senior", "health"]:
-        data = df[df["category"].isin([occupation, "general"])].copy()
+        allowed = [occupation, "general"]
     else:
-        data = df.copy()
+        allowed = None
 
     # -------------------------------
     # 2. BACKPROPAGATION SCORE
@@ -192,46 +264,47 @@ def recommend(user: UserInput):
         f"Need: {user.need}"
     )
 
-    user_embedding = model.encode([user_text])
-    transformer_scores = cosine_similarity(
-        user_embedding,
-        scheme_embeddings[data.index]
-    )[0]
+    user_embedding = encode_query(user_text)
+    # Cosine similarity against the allowed categories' blocks only
+    rows, transformer_scores = scheme_index.search(user_embedding, allowed)
 
     # -------------------------------
     # 4. FINAL HYBRID SCORE
     # -------------------------------
-    data["transformer_score"] = transformer_scores
-    data["bp_score"] = bp_score
-
-    data["final_score"] = (
-        0.6 * data["transformer_score"] +
-        0.4 * data["bp_score"]
+    final_scores = (
+        0.6 * transformer_scores +
+        0.4 * bp_score
     )
 
     # -------------------------------
     # 5. TOP RESULTS WITH SHUFFLE (To show different 6 on refresh)
     # -------------------------------
-    # Get top 20 candidates first
-    candidates = data.sort_values(
-        by="final_score",
-        ascending=False
-    ).head(20).copy()
+    # Get top 20 candidates first (ties in catalog order)
+    candidates = rows[np.lexsort((rows, -final_scores))[:20]]
 
     # Shuffle the top candidates
-    shuffled = candidates.sample(frac=1).reset_index(drop=True)
+    shuffled = np.random.permutation(candidates)
     
     # Take top 6
-    top6 = shuffled.head(6)
+    top6 = shuffled[:6]
 
     return {
         "user": user.first_name,
         "occupation": occupation,
         "model": "Hybrid AI (Transformer + Backpropagation)",
-        "recommendations": top6[[
-            "scheme_name",
-            "description",
-            "benefits",
-            "official_link"
-        ]].to_dict(orient="records")
+        "recommendations": [
+            {col: catalog.value(col, i) for col in RESULT_COLUMNS} for i in top6
+        ]
     }
+
+# ======================================================
+# WARMUP
+# ======================================================
+
+warmup = Warmup([
+    ("catalog", load_catalog_phase),
+    ("model", load_model_phase),
+    ("embeddings", load_embeddings_phase),
+    ("index", load_index_phase),
+    ("dummy_inference", dummy_inference_phase),
+])
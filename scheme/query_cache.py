@@ -0,0 +1,40 @@
+# ======================================================
+# query_cache.py
+# Query embeddings, LRU-cached on the normalized user
+# text: form presets repeat the same age / occupation /
+# income / need combinations
+# ======================================================
+
+import os
+from shared import TTLCache
+
+QUERY_CACHE_SIZE = int(os.getenv("SCHEME_QUERY_CACHE_SIZE", "4096"))
+QUERY_CACHE_TTL = float(os.getenv("SCHEME_QUERY_CACHE_TTL", "3600"))
+
+def normalize_query(text: str) -> str:
+    # The model is uncased and splits on whitespace, so this doesn't change the embedding
+    return " ".join(text.lower().split())
+
+class QueryCache:
+    """
+    encode(text) for user texts, called once per normalized text while
+    it stays cached. The vectors handed out are shared between requests,
+    so they are read-only.
+    """
+
+    def __init__(self, encode, maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL):
+        self._encode = encode
+        self.cache = TTLCache(maxsize, ttl)
+
+    def encode(self, text: str):
+        """Embedding of one user text (1-D, read-only)."""
+        key = normalize_query(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self._encode(key)
+            vector.setflags(write=False)
+            self.cache.set(key, vector)
+        return vector
+
+    def stats(self) -> dict:
+        return self.cache.stats()
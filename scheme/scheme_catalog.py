@@ -0,0 +1,101 @@
+# ======================================================
+# scheme_catalog.py
+# Scheme catalog + rule-based categories, loaded from a
+# compiled snapshot when one matches schemes.csv
+#
+# Compile:  python scheme_catalog.py [schemes.csv]
+# ======================================================
+
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+from shared import catalog_snapshot, get_matcher, read_catalog_csv
+
+SCHEMES_CSV = "schemes.csv"
+
+# Ensure required columns exist
+REQUIRED_COLUMNS = [
+    "scheme_name",
+    "description",
+    "eligibility",
+    "benefits",
+    "official_link"
+]
+
+# ======================================================
+# RULE-BASED CATEGORY DETECTION
+# ======================================================
+
+# Checked in order, first category with a keyword hit wins
+CATEGORY_KEYWORDS = [
+    ("farmer", ["kisan", "farmer", "crop", "agriculture"]),
+    ("student", ["student", "education", "scholar", "vidya"]),
+    ("senior", ["pension", "senior", "old age"]),
+    ("health", ["health", "insurance", "medical"]),
+]
+
+category_matcher = get_matcher(kw for _, keywords in CATEGORY_KEYWORDS for kw in keywords)
+
+def detect_category(text: str) -> str:
+    found = category_matcher.find(str(text).lower())
+    for category, keywords in CATEGORY_KEYWORDS:
+        if not found.isdisjoint(keywords):
+            return category
+    return "general"
+
+# ======================================================
+# BUILD / SNAPSHOT
+# ======================================================
+
+def snapshot_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + ".snap"
+
+def snapshot_key(csv_path):
+    """sha256 of the CSV plus a digest of the rules the categories came from."""
+    rules = json.dumps([REQUIRED_COLUMNS, CATEGORY_KEYWORDS]).encode("utf-8")
+    return {"csv": catalog_snapshot.file_sha256(csv_path), "rules": hashlib.sha256(rules).hexdigest()}
+
+def build_catalog(csv_path):
+    """(catalog frame, category per row) parsed from the CSV."""
+    catalog = read_catalog_csv(csv_path)
+    for col in REQUIRED_COLUMNS:
+        if col not in catalog.columns:
+            catalog.add_column(col, [""] * len(catalog))
+
+    # Use both name and description for better context
+    categories = np.array([
+        detect_category(f"{name} {desc}")
+        for name, desc in zip(catalog.text("scheme_name", missing="nan"), catalog.text("description", missing="nan"))
+    ])
+    return catalog, categories
+
+def write_catalog_snapshot(csv_path=SCHEMES_CSV, snapshot_path=None):
+    catalog, categories = build_catalog(csv_path)
+    arrays = {}
+    frame_meta = catalog_snapshot.put_frame(arrays, "schemes", catalog)
+    catalog_snapshot.put_strings(arrays, "categories", categories.tolist())
+    catalog_snapshot.write_snapshot(
+        snapshot_path or snapshot_path_for(csv_path), arrays,
+        {"key": snapshot_key(csv_path), "frame": frame_meta}
+    )
+
+def load_catalog(csv_path=SCHEMES_CSV):
+    """(catalog frame, categories): mapped from the snapshot if it is current, else built from the CSV."""
+    snapshot_path = snapshot_path_for(csv_path)
+    if os.path.exists(snapshot_path):
+        try:
+            meta, arrays = catalog_snapshot.read_snapshot(snapshot_path)
+            if meta.get("key") == snapshot_key(csv_path):
+                catalog = catalog_snapshot.get_frame(arrays, "schemes", meta["frame"])
+                return catalog, np.array(list(catalog_snapshot.get_strings(arrays, "categories")))
+            print("Scheme snapshot is stale, loading CSV (run scheme_catalog.py to refresh it)")
+        except (OSError, ValueError) as e:
+            print(f"Ignoring scheme snapshot: {e}")
+    return build_catalog(csv_path)
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else SCHEMES_CSV
+    write_catalog_snapshot(csv_path)
+    print(f"Wrote {snapshot_path_for(csv_path)}")
@@ -0,0 +1,25 @@
+# ======================================================
+# shared.py
+# The helpers this service shares with the backend
+# (catalog snapshots, CSV loading, keyword matcher, TTL
+# cache). They live in ../backend; this is the one place
+# that puts it on the import path.
+#
+# Set SCHEME_SHARED_DIR when the backend is elsewhere.
+# ======================================================
+
+import os
+import sys
+
+SHARED_DIR = os.getenv(
+    "SCHEME_SHARED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+import catalog_snapshot
+from catalog_store import read_catalog_csv
+from keyword_matcher import get_matcher
+from ttl_cache import TTLCache
+
+__all__ = ["catalog_snapshot", "read_catalog_csv", "get_matcher", "TTLCache"]
@@ -0,0 +1,75 @@
+# ======================================================
+# test_ann_index.py
+# Checks the IVF scheme index against exact search on
+# clustered random embeddings, and that a saved index
+# maps back with the same results.
+#
+#     python test_ann_index.py
+# ======================================================
+
+import os
+import tempfile
+import numpy as np
+from ann_index import IVFIndex, recall_at_k
+from vector_index import CategoryIndex, l2_normalize, load_category_index
+
+def clustered_embeddings(rows, dim=64, clusters=40, seed=0):
+    """Unit vectors scattered around random centres, like sentence embeddings of similar schemes."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    vectors = centres[rng.integers(0, clusters, rows)] + 0.35 * rng.normal(size=(rows, dim))
+    return l2_normalize(vectors)
+
+def test_ivf():
+    vectors = clustered_embeddings(8000)
+    order, centroids, list_ptr = IVFIndex.build(vectors)
+    index = IVFIndex(vectors[order], centroids, list_ptr)
+    query = vectors[7]
+
+    # Probing every list is an exact search
+    rows, scores = index.search(query, nprobe=len(centroids))
+    assert np.allclose(scores, vectors[order] @ query)
+
+    rows, scores = index.search(query, nprobe=8)
+    assert len(rows) < len(vectors)
+    assert np.allclose(scores, vectors[order][rows] @ query)
+    print(f"IVF: {len(centroids)} lists, nprobe=8 scores {len(rows)} of {len(vectors)} rows")
+
+def test_category_recall():
+    vectors = clustered_embeddings(12000, seed=1)
+    categories = np.where(np.arange(len(vectors)) % 4 == 0, "education", "health")
+    index = CategoryIndex(vectors, categories, ann_min_rows=2000)
+    assert {s.kind for s in index.searchers.values()} == {"ivf"}
+    queries = clustered_embeddings(50, seed=2)
+
+    recall = recall_at_k(index, queries, 10)
+    assert recall >= 0.9, recall
+    # A category filter only returns that category's rows
+    rows, _ = index.search(queries[0], ["education"])
+    assert (categories[rows] == "education").all()
+    print(f"CategoryIndex: IVF recall@10 {recall:.3f}")
+
+def test_saved_index():
+    vectors = clustered_embeddings(6000, seed=4)
+    categories = np.where(np.arange(len(vectors)) % 3 == 0, "education", "health")
+    queries = clustered_embeddings(10, seed=5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.bin")
+        built = load_category_index(vectors, categories, path, "embeddings-1", ann_min_rows=2000, dtype="float32")
+        assert os.path.exists(path)
+        mapped = load_category_index(vectors, categories, path, "embeddings-1", ann_min_rows=2000, dtype="float32")
+        assert mapped is not built and {s.kind for s in mapped.searchers.values()} == {"ivf"}
+        for query in queries:
+            for got, want in zip(mapped.search(query), built.search(query)):
+                assert np.array_equal(got, want)
+        # Other embeddings: rebuilt, not mapped
+        other = load_category_index(vectors[::-1].copy(), categories, path, "embeddings-2", ann_min_rows=2000,
+                                    dtype="float32")
+        assert not np.array_equal(other.search(queries[0])[0], built.search(queries[0])[0])
+    print("CategoryIndex: saved IVF index maps back with the same results")
+
+if __name__ == "__main__":
+    test_ivf()
+    test_category_recall()
+    test_saved_index()
+    print("All ANN index checks passed")
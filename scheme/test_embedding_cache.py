@@ -0,0 +1,67 @@
+# ======================================================
+# test_embedding_cache.py
+# Checks that scheme embeddings come back from the disk
+# cache, with only new or changed texts re-encoded.
+#
+#     python test_embedding_cache.py
+# ======================================================
+
+import os
+import tempfile
+import numpy as np
+from embedding_cache import cache_path_for, embeddings_id, load_embeddings
+
+class CountingModel:
+    """Stand-in for a SentenceTransformer: a fixed vector per text, counting what it encodes."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.array([self.vector(t) for t in texts])
+
+    def vector(self, text):
+        seed = int.from_bytes(text.encode("utf-8")[:8].ljust(8, b"\0"), "little") + len(text)
+        return np.random.default_rng(seed).normal(size=self.dim).astype(np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+def test_partial_reencode():
+    model = CountingModel()
+    texts = [f"scheme {i} for farmers" for i in range(50)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = cache_path_for(os.path.join(tmp, "schemes.csv"), "test/model v1")
+        assert os.path.basename(path) == "schemes.test_model_v1.emb.snap"
+
+        first = load_embeddings(model, "test/model v1", texts, path)
+        assert len(model.encoded) == 50 and os.path.exists(path)
+        assert np.array_equal(first, [model.vector(t) for t in texts])
+
+        # Unchanged: mapped from the file, nothing encoded
+        model.encoded.clear()
+        again = load_embeddings(model, "test/model v1", texts, path)
+        assert model.encoded == [] and not again.flags.owndata
+        assert np.array_equal(again, first)
+
+        # Reordered, one text changed and one added: only those two are encoded
+        changed = texts[::-1] + ["scheme 50 for students"]
+        changed[3] = "scheme 46 for fishermen"
+        model.encoded.clear()
+        vectors = load_embeddings(model, "test/model v1", changed, path)
+        assert sorted(model.encoded) == sorted(["scheme 46 for fishermen", "scheme 50 for students"])
+        assert np.array_equal(vectors, [model.vector(t) for t in changed])
+
+        # Another model never reuses the cache
+        model.encoded.clear()
+        load_embeddings(model, "test/model v2", changed, path)
+        assert len(model.encoded) == len(changed)
+    assert embeddings_id("m", texts) == embeddings_id("m", list(texts))
+    assert embeddings_id("m", texts) != embeddings_id("m", changed)
+    print("embedding cache: only new or changed texts re-encoded")
+
+if __name__ == "__main__":
+    test_partial_reencode()
+    print("All embedding cache checks passed")
@@ -0,0 +1,80 @@
+# ======================================================
+# test_encode_batcher.py
+# Checks that concurrent encodes are gathered into one
+# model call, repeated texts encoded once, and a failed
+# call reaches every caller of its batch.
+#
+#     python test_encode_batcher.py
+# ======================================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from encode_batcher import EncodeBatcher
+
+class SlowModel:
+    """encode() blocks until released, so texts queue up behind the first call."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.fail = False
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        self.release.wait()
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+def encode_all(batcher, model, texts):
+    """Encode texts from as many threads while the model is busy with a first text."""
+    with ThreadPoolExecutor(len(texts) + 1) as pool:
+        first = pool.submit(batcher.encode, "first")
+        while not model.calls:
+            time.sleep(0.001)
+        futures = [pool.submit(batcher.encode, t) for t in texts]
+        while batcher.stats()["queued"] < len(texts):
+            time.sleep(0.001)
+        model.release.set()
+        return first, futures
+
+def test_batches():
+    model = SlowModel()
+    batcher = EncodeBatcher(model.encode, max_batch=8, max_wait=0.05)
+    texts = ["loan", "pension", "loan", "scholarship", "loan", "health cover"]
+    first, futures = encode_all(batcher, model, texts)
+    assert first.result()[0] == len("first")
+    vectors = [f.result() for f in futures]
+    # One call after the first, each distinct text once
+    assert len(model.calls) == 2 and sorted(model.calls[1]) == sorted(set(texts)), model.calls
+    for text, vector in zip(texts, vectors):
+        assert vector[0] == len(text)
+    # Callers get their own copies
+    vectors[0][0] = -1
+    assert vectors[2][0] == len("loan")
+    stats = batcher.stats()
+    assert stats["batches"] == 2 and stats["texts"] == 7 and stats["largest_batch"] == 6, stats
+    print(f"encode batcher: {len(texts)} concurrent texts in one call of {len(model.calls[1])}")
+
+def test_errors():
+    model = SlowModel()
+    model.fail = True
+    batcher = EncodeBatcher(model.encode, max_batch=8, max_wait=0.05)
+    first, futures = encode_all(batcher, model, ["a", "b", "c"])
+    for future in [first] + futures:
+        try:
+            future.result()
+            raise AssertionError("error not propagated")
+        except RuntimeError as e:
+            assert str(e) == "model crashed"
+    # The batcher keeps serving after a failed call
+    model.fail = False
+    assert batcher.encode("d")[0] == 1
+    print("encode batcher: a failed call reaches every caller in its batch")
+
+if __name__ == "__main__":
+    test_batches()
+    test_errors()
+    print("All encode batcher checks passed")
@@ -0,0 +1,52 @@
+# ======================================================
+# test_inference_executor.py
+# Checks that the bounded executor turns callers away
+# once its workers and queue are full, frees a slot for
+# every finished call, and reports its metrics.
+#
+#     python test_inference_executor.py
+# ======================================================
+
+import asyncio
+import threading
+import time
+from inference_executor import BoundedExecutor, Saturated
+
+def wait_idle(executor, timeout=5):
+    # Slots are freed by a done callback, which can run just after result() returns
+    deadline = time.monotonic() + timeout
+    while executor.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return executor.stats()
+
+def test_saturation():
+    executor = BoundedExecutor(workers=2, max_queue=1)
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(3)]
+    try:
+        executor.submit(release.wait)
+        raise AssertionError("submit past workers + max_queue accepted")
+    except Saturated:
+        pass
+    stats = executor.stats()
+    assert stats["in_flight"] == 3 and stats["queued"] == 1 and stats["rejected"] == 1, stats
+
+    release.set()
+    assert all(f.result() for f in futures)
+    wait_idle(executor)
+    # A call that raises frees its slot too
+    failed = executor.submit(lambda: 1 / 0)
+    try:
+        failed.result()
+        raise AssertionError("error not propagated")
+    except ZeroDivisionError:
+        pass
+    assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+    stats = wait_idle(executor)
+    assert stats["in_flight"] == 0 and stats["rejected"] == 1, stats
+    assert stats["run_time"]["count"] == 5 and stats["queue_wait"]["count"] == 5, stats
+    print(f"inference executor: 1 of 4 rejected, p99 run {stats['run_time']['p99_ms']} ms")
+
+if __name__ == "__main__":
+    test_saturation()
+    print("All inference executor checks passed")
@@ -0,0 +1,42 @@
+# ======================================================
+# test_query_cache.py
+# Checks that user texts differing only in case and
+# whitespace are encoded once, and that the shared
+# vectors can't be changed by a request.
+#
+#     python test_query_cache.py
+# ======================================================
+
+import numpy as np
+from query_cache import QueryCache, normalize_query
+
+def test_query_cache():
+    encoded = []
+
+    def encode(text):
+        encoded.append(text)
+        return np.full(4, len(encoded), dtype=np.float32)
+
+    queries = QueryCache(encode, maxsize=2, ttl=60)
+    first = queries.encode("Age 30  Farmer\tneeds LOAN")
+    assert normalize_query("Age 30  Farmer\tneeds LOAN") == "age 30 farmer needs loan"
+    assert queries.encode(" age 30 farmer needs loan ") is first
+    assert encoded == ["age 30 farmer needs loan"]
+    try:
+        first[0] = 0
+        raise AssertionError("cached vector is writable")
+    except ValueError:
+        pass
+
+    # Least recently used text is evicted past maxsize
+    queries.encode("student scholarship")
+    queries.encode("senior pension")
+    assert queries.encode("age 30 farmer needs loan") is not first
+    assert len(encoded) == 4
+    stats = queries.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 4 and stats["evictions"] == 2, stats
+    print(f"query cache: {stats['hits']} hit, {stats['misses']} encodes")
+
+if __name__ == "__main__":
+    test_query_cache()
+    print("All query cache checks passed")
@@ -0,0 +1,48 @@
+# ======================================================
+# test_vector_index.py
+# Checks the int8 scheme index against exact float32
+# search on clustered random embeddings, and that it
+# maps back from disk with its scales.
+#
+#     python test_vector_index.py
+# ======================================================
+
+import os
+import tempfile
+import numpy as np
+from test_ann_index import clustered_embeddings
+from vector_index import CategoryIndex, QuantizedMatrix, load_category_index
+
+def test_int8():
+    vectors = clustered_embeddings(6000, seed=3)
+    quantized = QuantizedMatrix.quantize(vectors)
+    assert quantized.nbytes < vectors.nbytes / 3
+    query = vectors[11]
+    assert np.abs(quantized @ query - vectors @ query).max() < 0.02
+    assert np.allclose(quantized[5:9] @ query, (vectors @ query)[5:9], atol=0.02)
+
+    index = CategoryIndex(vectors, np.zeros(len(vectors), dtype=int), dtype="int8")
+    assert index.dtype == "int8" and index.quantization_recall >= 0.95, index.quantization_recall
+    print(f"int8: {quantized.nbytes / vectors.nbytes:.2f}x the float32 bytes, "
+          f"top-20 recall {index.quantization_recall}")
+
+def test_saved_int8():
+    vectors = clustered_embeddings(3000, seed=6)
+    categories = np.where(np.arange(len(vectors)) % 2 == 0, "education", "health")
+    query = clustered_embeddings(1, seed=7)[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.bin")
+        built = load_category_index(vectors, categories, path, "embeddings-1", dtype="int8")
+        mapped = load_category_index(vectors, categories, path, "embeddings-1", dtype="int8")
+        assert mapped is not built and mapped.dtype == "int8"
+        assert mapped.quantization_recall == built.quantization_recall
+        for got, want in zip(mapped.search(query), built.search(query)):
+            assert np.array_equal(got, want)
+        # The dtype is part of the key: asking for float32 rebuilds it
+        assert load_category_index(vectors, categories, path, "embeddings-1", dtype="float32").dtype == "float32"
+    print("int8: saved index maps back with its scales")
+
+if __name__ == "__main__":
+    test_int8()
+    test_saved_int8()
+    print("All vector index checks passed")
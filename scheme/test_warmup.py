@@ -0,0 +1,55 @@
+# ======================================================
+# test_warmup.py
+# Checks that warmup phases run once, in order, on a
+# background thread, and that /ready's status reports
+# each phase and a failure stops the ones after it.
+#
+#     python test_warmup.py
+# ======================================================
+
+import threading
+from warmup import Warmup
+
+def test_phases():
+    ran = []
+    gate = threading.Event()
+    warmup = Warmup([
+        ("catalog", lambda: ran.append("catalog")),
+        ("model", lambda: (gate.wait(5), ran.append("model"))),
+        ("index", lambda: ran.append("index"))
+    ])
+    assert not warmup.ready and warmup.status()["phases"][0]["status"] == "pending"
+
+    warmup.start()
+    warmup.start()
+    assert not warmup.wait(0.05)
+    phases = {p["name"]: p["status"] for p in warmup.status()["phases"]}
+    assert phases == {"catalog": "done", "model": "running", "index": "pending"}, phases
+
+    gate.set()
+    assert warmup.wait(5) and warmup.run()
+    status = warmup.status()
+    assert ran == ["catalog", "model", "index"]
+    assert status["ready"] and status["error"] is None
+    assert all(p["status"] == "done" and p["seconds"] is not None for p in status["phases"])
+    print(f"warmup: 3 phases in {status['total_seconds']} s")
+
+def test_failure():
+    ran = []
+
+    def load_model():
+        raise OSError("model files missing")
+
+    warmup = Warmup([("catalog", lambda: ran.append("catalog")), ("model", load_model),
+                     ("index", lambda: ran.append("index"))])
+    assert not warmup.run()
+    status = warmup.status()
+    assert ran == ["catalog"] and not status["ready"]
+    assert status["error"] == "model: model files missing"
+    assert [p["status"] for p in status["phases"]] == ["done", "failed", "pending"]
+    print("warmup: a failed phase stops the rest and is reported")
+
+if __name__ == "__main__":
+    test_phases()
+    test_failure()
+    print("All warmup checks passed")
@@ -0,0 +1,253 @@
+# ======================================================
+# vector_index.py
+# Scheme embeddings grouped by category, L2-normalized
+# once, so cosine similarity is a plain dot product.
+# Large categories get an IVF index (ann_index.py), and
+# the vectors can be kept as int8 with a scale per row.
+# ======================================================
+
+import hashlib
+import os
+import numpy as np
+from shared import catalog_snapshot
+from ann_index import ANN_MIN_ROWS, ANN_NPROBE, ExactIndex, IVFIndex
+
+# "float32", or "int8" for a quarter of the memory (scores within ~1e-3)
+EMBEDDING_DTYPE = os.getenv("SCHEME_EMBEDDING_DTYPE", "float32")
+EMBEDDING_DTYPES = ("float32", "int8")
+# Rows dequantized per step when scoring int8 vectors
+DEQUANTIZE_CHUNK = 1024
+# Top k and sample queries for the int8 vs float32 recall check
+QUANTIZATION_RECALL_K = 20
+QUANTIZATION_RECALL_QUERIES = 100
+
+def l2_normalize(vectors):
+    """Rows scaled to unit length (float32); all-zero rows stay zero, like sklearn's normalize."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+class QuantizedMatrix:
+    """
+    int8 rows with one float32 scale each: row i is about values[i] * scales[i].
+
+    Stands in for the float matrix wherever the index uses one: slicing
+    gives a QuantizedMatrix view, `@ query` scores straight from the int8
+    rows, dequantizing a chunk at a time so no float copy of the whole
+    block is ever made.
+    """
+
+    __slots__ = ("values", "scales")
+
+    def __init__(self, values, scales):
+        self.values = values
+        self.scales = scales
+
+    @classmethod
+    def quantize(cls, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127 if len(vectors) else np.zeros(0, dtype=np.float32)
+        scales = np.where(scales == 0, 1, scales).astype(np.float32)
+        values = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return cls(values, scales)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.scales.nbytes
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return QuantizedMatrix(self.values[key], self.scales[key])
+        # Rows picked by index come back as floats
+        return self.values[key].astype(np.float32) * self.scales[key][..., None]
+
+    def __matmul__(self, query):
+        scores = np.empty(len(self.values), dtype=np.float32)
+        chunk = np.empty((min(DEQUANTIZE_CHUNK, len(self.values)), self.values.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.values), DEQUANTIZE_CHUNK):
+            stop = min(start + DEQUANTIZE_CHUNK, len(self.values))
+            rows = chunk[:stop - start]
+            rows[...] = self.values[start:stop]
+            np.dot(rows, query, out=scores[start:stop])
+        scores *= self.scales
+        return scores
+
+def quantization_recall(vectors, quantized, k=QUANTIZATION_RECALL_K, queries=QUANTIZATION_RECALL_QUERIES, seed=0):
+    """
+    Mean share of the float32 top k that the quantized matrix also ranks
+    in its top k, with sample rows of the catalog as queries.
+    """
+    if not len(vectors):
+        return 1.0
+    sample = np.random.default_rng(seed).choice(len(vectors), min(queries, len(vectors)), replace=False)
+    found = []
+    for query in vectors[sample]:
+        truth = np.argsort(-(vectors @ query), kind="stable")[:k]
+        approx = np.argsort(-(quantized @ query), kind="stable")[:k]
+        found.append(len(np.intersect1d(truth, approx)) / len(truth))
+    return round(float(np.mean(found)), 4)
+
+class CategoryIndex:
+    """
+    Normalized embeddings stored category by category: each category's
+    vectors form one contiguous block, with the catalog row of every
+    vector alongside. Scoring a category filter is one matrix-vector
+    product per block, without copying or fancy-indexing the matrix.
+
+    Blocks of at least ann_min_rows vectors are searched with an IVF
+    index instead, which scores only the nprobe nearest lists.
+
+    With dtype "int8" the vectors are held as a QuantizedMatrix, and
+    quantization_recall records how well it keeps the float32 top k.
+    """
+
+    def __init__(self, embeddings, categories, ann_min_rows=ANN_MIN_ROWS, dtype=EMBEDDING_DTYPE):
+        if dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unknown embedding dtype {dtype!r}, expected one of {EMBEDDING_DTYPES}")
+        categories = np.asarray(categories)
+        # Stable, so rows stay in catalog order within a block
+        order = np.argsort(categories, kind="stable")
+        self.row_ids = order
+        self.vectors = l2_normalize(np.asarray(embeddings)[order])
+        names, starts = np.unique(categories[order], return_index=True)
+        stops = np.append(starts[1:], len(order))
+        self.blocks = {str(name): (int(start), int(stop)) for name, start, stop in zip(names, starts, stops)}
+
+        self.searchers = {}
+        for name, (start, stop) in self.blocks.items():
+            if stop - start >= ann_min_rows:
+                # Lay the block out list by list, so each IVF list is a slice
+                block_order, centroids, list_ptr = IVFIndex.build(self.vectors[start:stop])
+                self.vectors[start:stop] = self.vectors[start:stop][block_order]
+                self.row_ids[start:stop] = self.row_ids[start:stop][block_order]
+                self.searchers[name] = IVFIndex(self.vectors[start:stop], centroids, list_ptr)
+            else:
+                self.searchers[name] = ExactIndex(self.vectors[start:stop])
+
+        self.quantization_recall = None
+        if dtype == "int8":
+            quantized = QuantizedMatrix.quantize(self.vectors)
+            self.quantization_recall = quantization_recall(self.vectors, quantized)
+            self._use_vectors(quantized)
+
+    def _use_vectors(self, vectors):
+        """Point the index and every block searcher at vectors."""
+        self.vectors = vectors
+        for name, (start, stop) in self.blocks.items():
+            self.searchers[name].vectors = vectors[start:stop]
+
+    @property
+    def dtype(self):
+        return "int8" if isinstance(self.vectors, QuantizedMatrix) else "float32"
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @property
+    def exact_only(self):
+        return all(s.kind == "exact" for s in self.searchers.values())
+
+    def search(self, query, categories=None, nprobe=ANN_NPROBE, exact=False):
+        """
+        (catalog rows, cosine scores) of the vectors in the given
+        categories, or in the whole index when categories is None. IVF
+        blocks only return the vectors of the lists they probed, unless
+        exact is set.
+        """
+        query = l2_normalize(query)
+        if categories is None:
+            if exact or self.exact_only:
+                return self.row_ids, self.vectors @ query
+            categories = list(self.blocks)
+        found = [c for c in categories if c in self.blocks]
+        if not found:
+            return self.row_ids[:0], np.zeros(0, dtype=np.float32)
+
+        rows, scores = [], []
+        for name in found:
+            start, stop = self.blocks[name]
+            if exact:
+                rows.append(self.row_ids[start:stop])
+                scores.append(self.vectors[start:stop] @ query)
+            else:
+                positions, block_scores = self.searchers[name].search(query, nprobe)
+                rows.append(self.row_ids[start + positions])
+                scores.append(block_scores)
+        return np.concatenate(rows), np.concatenate(scores)
+
+    # --- Persistence ---
+
+    def to_arrays(self, arrays):
+        """Add the index's arrays; returns the JSON meta needed to map it back."""
+        arrays["row_ids"] = self.row_ids
+        if isinstance(self.vectors, QuantizedMatrix):
+            arrays["vectors"] = self.vectors.values
+            arrays["scales"] = self.vectors.scales
+        else:
+            arrays["vectors"] = self.vectors
+        for j, (name, searcher) in enumerate(self.searchers.items()):
+            searcher.to_arrays(arrays, f"block{j}")
+        return {
+            "blocks": [[name, start, stop, self.searchers[name].kind] for name, (start, stop) in self.blocks.items()],
+            "quantization_recall": self.quantization_recall
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        index = cls.__new__(cls)
+        index.row_ids = arrays["row_ids"]
+        index.vectors = arrays["vectors"]
+        if "scales" in arrays:
+            index.vectors = QuantizedMatrix(arrays["vectors"], arrays["scales"])
+        index.quantization_recall = meta.get("quantization_recall")
+        index.blocks = {}
+        index.searchers = {}
+        for j, (name, start, stop, kind) in enumerate(meta["blocks"]):
+            index.blocks[name] = (start, stop)
+            block = index.vectors[start:stop]
+            if kind == "ivf":
+                index.searchers[name] = IVFIndex.from_arrays(block, arrays, f"block{j}")
+            else:
+                index.searchers[name] = ExactIndex(block)
+        return index
+
+def index_key(embeddings_id, categories, ann_min_rows=ANN_MIN_ROWS, dtype=EMBEDDING_DTYPE):
+    """What a saved index must have been built from: embeddings, categories and settings."""
+    digest = hashlib.blake2b(digest_size=16)
+    for category in categories:
+        digest.update(str(category).encode("utf-8") + b"\0")
+    return {"embeddings": embeddings_id, "categories": digest.hexdigest(), "ann_min_rows": ann_min_rows, "dtype": dtype}
+
+def load_category_index(embeddings, categories, index_path, embeddings_id, ann_min_rows=ANN_MIN_ROWS,
+                        dtype=EMBEDDING_DTYPE):
+    """
+    CategoryIndex mapped from index_path if it was built from the same
+    embeddings, categories and settings; otherwise built and saved there,
+    so the k-means clustering runs once, not on every start.
+    """
+    key = index_key(embeddings_id, categories, ann_min_rows, dtype)
+    if os.path.exists(index_path):
+        try:
+            meta, arrays = catalog_snapshot.read_snapshot(index_path)
+            if meta.get("key") == key:
+                return CategoryIndex.from_arrays(arrays, meta["index"])
+        except (OSError, ValueError) as e:
+            print(f"Ignoring scheme index: {e}")
+
+    index = CategoryIndex(embeddings, categories, ann_min_rows, dtype)
+    if index.quantization_recall is not None:
+        print(f"int8 scheme embeddings: recall@{QUANTIZATION_RECALL_K} vs float32 = {index.quantization_recall:.3f}")
+    arrays = {}
+    meta = {"key": key, "index": index.to_arrays(arrays)}
+    try:
+        catalog_snapshot.write_snapshot(index_path, arrays, meta)
+    except OSError as e:
+        print(f"Could not write scheme index: {e}")
+    return index
@@ -0,0 +1,79 @@
+# ======================================================
+# warmup.py
+# Startup work split into named phases, run on a
+# background thread so the server binds immediately;
+# status() feeds the /ready probe
+# ======================================================
+
+import threading
+import time
+
+class Warmup:
+    """
+    Runs phases (name, fn) in order, once, recording each one's status
+    ("pending", "running", "done", "failed") and wall time. A failed
+    phase stops the ones after it; ready only turns true after all
+    of them are done.
+    """
+
+    def __init__(self, phases):
+        self.phases = list(phases)
+        self.status_by_phase = {name: {"status": "pending", "seconds": None} for name, _ in self.phases}
+        self.error = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._done = threading.Event()
+        self._ready = False
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def start(self):
+        """Run the phases on a background thread (no-op if already started)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def run(self):
+        """Run the phases on this thread and wait for them; True once ready."""
+        with self._lock:
+            started, self._started = self._started, True
+        if not started:
+            self._run()
+        return self.wait()
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self._ready
+
+    def _run(self):
+        try:
+            for name, fn in self.phases:
+                entry = self.status_by_phase[name]
+                entry["status"] = "running"
+                start = time.perf_counter()
+                try:
+                    fn()
+                except Exception as e:
+                    entry["status"] = "failed"
+                    entry["seconds"] = round(time.perf_counter() - start, 4)
+                    self.error = f"{name}: {e}"
+                    print(f"Warmup failed in phase {name}: {e}")
+                    return
+                entry["status"] = "done"
+                entry["seconds"] = round(time.perf_counter() - start, 4)
+            self._ready = True
+        finally:
+            self._done.set()
+
+    def status(self) -> dict:
+        timings = [p["seconds"] for p in self.status_by_phase.values() if p["seconds"] is not None]
+        return {
+            "ready": self._ready,
+            "error": self.error,
+            "total_seconds": round(sum(timings), 4),
+            "phases": [{"name": name, **self.status_by_phase[name]} for name, _ in self.phases]
+        }